@@ -12,6 +12,7 @@ def patch_django_for_gevent():
     if os.environ.get('GUNICORN_WORKER_CLASS') == 'gevent':
         
         # Parche 1: Deshabilitar thread checking en conexiones DB
+        # (la cantidad de conexiones la acota el pool de core.db.mysql_pool)
         from django.db import connection
         from django.db.backends.base.base import BaseDatabaseWrapper
         
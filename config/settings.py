@@ -1,7 +1,6 @@
 # settings.py
 import os
 import sys
-import logging
 from pathlib import Path
 from django.contrib.messages import constants as messages
 from dotenv import load_dotenv
@@ -70,7 +69,6 @@ INSTALLED_APPS = [
     "health_check",
     "health_check.db",
     "health_check.cache",
-    "silk",  # Performance profiling
     # Apps propias
     "users",
     "core",
@@ -89,7 +87,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",  # Seguridad primero
     "core.middleware_concurrency.ConcurrencyLimitMiddleware",  # Limitar antes de medir
-    "silk.middleware.SilkyMiddleware",  # Performance profiling
+    "core.sampling_profiler.SamplingProfilerMiddleware",  # Profiling por muestreo
     "django.middleware.gzip.GZipMiddleware",
     "core.middleware_concurrency.RequestMetricsMiddleware",    # Métricas en tiempo real
     "core.monitoring.MonitoringMiddleware",  # Sistema de monitoreo avanzado
@@ -111,6 +109,11 @@ MIDDLEWARE = [
     "config.middlewares.query_counter.QueryCountMiddleware",
 ]
 
+# Silk instrumenta cada llamada: solo en desarrollo
+if DEBUG:
+    INSTALLED_APPS.insert(INSTALLED_APPS.index("users"), "silk")
+    MIDDLEWARE.insert(MIDDLEWARE.index("django.middleware.gzip.GZipMiddleware"), "silk.middleware.SilkyMiddleware")
+
 # --- URLs / WSGI / ASGI ---
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
@@ -179,7 +182,7 @@ MESSAGE_TAGS = {
 # --- DB ---
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "core.db.mysql_pool",  # MySQL con pool acotado por worker
         "NAME": os.environ.get("DATABASE_NAME"),
         "USER": os.environ.get("DATABASE_USER"),
         "PASSWORD": os.environ.get("DATABASE_PASSWORD"),
@@ -194,8 +197,14 @@ DATABASES = {
             "read_timeout": 10,
             "write_timeout": 10,
         },
-        "CONN_MAX_AGE": 60,  # Reusar conexiones por 60 segundos
-        "CONN_HEALTH_CHECKS": True,  # Verificar salud de conexión antes de reusar
+        "CONN_MAX_AGE": 0,  # La conexión vuelve al pool al terminar cada request
+        "POOL": {
+            "SIZE": int(os.environ.get("DB_POOL_SIZE", "10")),  # Conexiones máximas por worker
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", "10")),  # Espera máxima de checkout
+            "MAX_AGE": 1800,  # Reciclar conexiones cada 30 minutos
+            "CHECK_INTERVAL": 30,  # Ping a conexiones libres hace más de 30s
+            "LEASE_TIMEOUT": 600,  # Recuperar conexiones prestadas sin actividad hace 10 minutos
+        },
     }
 }
 
@@ -205,15 +214,30 @@ if "pytest" in sys.argv or os.environ.get("PYTEST_RUNNING") == "1":
 # --- Cache ---
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "core.cache_dos_niveles.CacheDosNiveles",
         "LOCATION": "redis://sedronar-redis:6379/1",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+            "SERIALIZER": "core.cache_codec.SerializadorCache",
+            "COMPRESSOR": "core.cache_codec.CompresorAdaptativo",
+            "COMPRESION_UMBRAL": 1024,
             "CONNECTION_POOL_KWARGS": {"max_connections": 200},
         },
         "KEY_PREFIX": "sedronar",
         "TIMEOUT": 300,
+        # Claves calientes servidas desde memoria del proceso (prefijo: TTL local)
+        "LOCAL": {
+            "CLAVES": {
+                "active_requests": 1,
+                "contar_usuarios": 5,
+                "contar_ciudadanos": 5,
+                "permisos:version": 5,
+                "catalogos:version": 5,
+                "lexico_riesgo:version": 5,
+            },
+            "SIN_AVISO": ["active_requests"],
+            "MAX_ENTRADAS": 2000,
+        },
     },
     "sessions": {
         "BACKEND": "django_redis.cache.RedisCache",
@@ -276,27 +300,17 @@ os.makedirs(LOG_DIR, exist_ok=True)
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "filters": {
-        "info_only": {"()": "django.utils.log.CallbackFilter", "callback": lambda r: r.levelno == logging.INFO},
-        "error_only": {"()": "django.utils.log.CallbackFilter", "callback": lambda r: r.levelno == logging.ERROR},
-        "warning_only": {"()": "django.utils.log.CallbackFilter", "callback": lambda r: r.levelno == logging.WARNING},
-        "critical_only": {"()": "django.utils.log.CallbackFilter", "callback": lambda r: r.levelno == logging.CRITICAL},
-        "data_only": {"()": "django.utils.log.CallbackFilter", "callback": lambda r: hasattr(r, "data")},
-    },
     "formatters": {
         "verbose": {"format": "[{asctime}] {module} {levelname} {name}: {message}", "style": "{"},
         "simple": {"format": "[{asctime}] {levelname} {message}", "style": "{"},
         "json_data": {"()": "core.utils.JSONDataFormatter"},
     },
+    # Un solo manejador: encola y un hilo por proceso escribe por nivel en LOG_DIR/<fecha>/ (ver core.log_asincrono)
     "handlers": {
-        "info_file": {"level": "INFO", "filters": ["info_only"], "class": "core.utils.DailyFileHandler", "filename": str(LOG_DIR / "info.log"), "formatter": "verbose"},
-        "error_file": {"level": "ERROR", "filters": ["error_only"], "class": "core.utils.DailyFileHandler", "filename": str(LOG_DIR / "error.log"), "formatter": "verbose"},
-        "warning_file": {"level": "WARNING", "filters": ["warning_only"], "class": "core.utils.DailyFileHandler", "filename": str(LOG_DIR / "warning.log"), "formatter": "verbose"},
-        "critical_file": {"level": "CRITICAL", "filters": ["critical_only"], "class": "core.utils.DailyFileHandler", "filename": str(LOG_DIR / "critical.log"), "formatter": "verbose"},
-        "data_file": {"level": "INFO", "filters": ["data_only"], "class": "core.utils.DailyFileHandler", "filename": str(LOG_DIR / "data.log"), "formatter": "json_data"},
+        "archivos": {"()": "core.log_asincrono.ManejadorCola", "directorio": str(LOG_DIR), "formato": "[{asctime}] {module} {levelname} {name}: {message}"},
     },
-    "root": {"handlers": ["info_file", "error_file", "warning_file", "critical_file", "data_file"], "level": "DEBUG" if DEBUG else "INFO"},
-    "loggers": {"django": {"handlers": [], "level": "DEBUG" if DEBUG else "INFO", "propagate": True}, "django.request": {"handlers": ["error_file"], "level": "ERROR", "propagate": False}},
+    "root": {"handlers": ["archivos"], "level": "DEBUG" if DEBUG else "INFO"},
+    "loggers": {"django": {"handlers": [], "level": "DEBUG" if DEBUG else "INFO", "propagate": True}, "django.request": {"handlers": ["archivos"], "level": "ERROR", "propagate": False}},
 }
 
 # --- Password validators ---
@@ -331,7 +345,27 @@ SILKY_AUTHENTICATION = True
 SILKY_AUTHORISATION = True
 SILKY_MAX_REQUEST_BODY_SIZE = 1024  # 1KB
 SILKY_MAX_RESPONSE_BODY_SIZE = 1024  # 1KB
-SILKY_INTERCEPT_PERCENT = 100 if DEBUG else 10  # 100% en dev, 10% en prod
+SILKY_INTERCEPT_PERCENT = 100  # Silk solo se instala con DEBUG
+
+# --- Actividad de sesiones (core.session_activity) ---
+SESIONES_ACTIVIDAD_RESOLUCION = 30  # segundos mínimos entre registros de una misma sesión
+SESIONES_ACTIVIDAD_INTERVALO_VOLCADO = 30  # volcado local cuando no hay Redis
+
+# --- Descargas de archivos (core.descargas) ---
+DESCARGAS_X_ACCEL = os.environ.get("DESCARGAS_X_ACCEL", str(not DEBUG)) == "True"  # nginx envía el archivo
+DESCARGAS_PREFIJO_INTERNO = "/protected-media/"  # location internal de nginx sobre MEDIA_ROOT
+DESCARGAS_URL_MAX_AGE = 600  # vigencia de los enlaces firmados (segundos)
+DESCARGAS_MASIVAS_UMBRAL = 10  # descargas dentro de la ventana que disparan alerta
+DESCARGAS_MASIVAS_VENTANA = 300  # segundos
+
+# --- Profiler por muestreo (core.sampling_profiler) ---
+PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "True") == "True"
+PROFILER_INTERVAL = float(os.environ.get("PROFILER_INTERVAL", "0.005"))  # segundos entre muestras
+PROFILER_SAMPLE_RATE = float(os.environ.get("PROFILER_SAMPLE_RATE", "0"))  # fracción de requests sin token
+PROFILER_FLUSH_INTERVAL = 60  # segundos entre volcados a disco
+PROFILER_MAX_DEPTH = 64
+PROFILER_TOKEN_MAX_AGE = 3600
+PROFILER_DIR = LOG_DIR / "profiles"
 
 # --- Seguridad por entorno ---
 if ENVIRONMENT == "prd":
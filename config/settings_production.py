@@ -8,7 +8,7 @@ ALLOWED_HOSTS = ['*']  # Configurar dominios específicos en producción
 # Base de datos con replicación
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'core.db.mysql_pool',
         'NAME': os.environ.get('DATABASE_NAME'),
         'USER': os.environ.get('DATABASE_USER'),
         'PASSWORD': os.environ.get('DATABASE_PASSWORD'),
@@ -18,11 +18,11 @@ DATABASES = {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
         },
-        'CONN_MAX_AGE': 3600,  # 1 hora
-        'CONN_HEALTH_CHECKS': True,
+        'CONN_MAX_AGE': 0,  # Devolver al pool al final de cada request
+        'POOL': {'SIZE': int(os.environ.get('DB_POOL_SIZE', '20')), 'TIMEOUT': 10, 'MAX_AGE': 1800},
     },
     'replica': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'core.db.mysql_pool',
         'NAME': os.environ.get('DATABASE_NAME'),
         'USER': os.environ.get('DATABASE_USER'),
         'PASSWORD': os.environ.get('DATABASE_PASSWORD'),
@@ -32,7 +32,8 @@ DATABASES = {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
         },
-        'CONN_MAX_AGE': 3600,
+        'CONN_MAX_AGE': 0,
+        'POOL': {'SIZE': int(os.environ.get('DB_POOL_SIZE', '20')), 'TIMEOUT': 10, 'MAX_AGE': 1800},
     }
 }
 
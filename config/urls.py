@@ -39,11 +39,12 @@ urlpatterns = [
     
     # Health Check
     path("health/", include('health_check.urls')),
-    
-    # Performance Profiling (solo en desarrollo/staging)
-    path("silk/", include('silk.urls', namespace='silk')),
 ]
 
+# Performance Profiling (Silk solo se instala con DEBUG)
+if "silk" in settings.INSTALLED_APPS:
+    urlpatterns += [path("silk/", include('silk.urls', namespace='silk'))]
+
 # URLs de desarrollo se pueden agregar aquí si es necesario
 
 urlpatterns += staticfiles_urlpatterns()
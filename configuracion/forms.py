@@ -1,4 +1,5 @@
 from django import forms
+from core.catalogos import asignar_opciones, obtener_catalogos
 from core.models import Provincia, Municipio, Localidad, Institucion
 from legajos.models import PersonalInstitucion, StaffActividad, PlanFortalecimiento
 
@@ -32,6 +33,10 @@ class MunicipioForm(forms.ModelForm):
             })
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        asignar_opciones(self.fields['provincia'], obtener_catalogos().provincias)
+
 
 class LocalidadForm(forms.ModelForm):
     class Meta:
@@ -47,6 +52,10 @@ class LocalidadForm(forms.ModelForm):
             })
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        asignar_opciones(self.fields['municipio'], obtener_catalogos().municipios)
+
 
 class InstitucionForm(forms.ModelForm):
     class Meta:
@@ -124,6 +133,13 @@ class InstitucionForm(forms.ModelForm):
             })
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        catalogos = obtener_catalogos()
+        asignar_opciones(self.fields['provincia'], catalogos.provincias)
+        asignar_opciones(self.fields['municipio'], catalogos.municipios)
+        asignar_opciones(self.fields['localidad'], catalogos.localidades)
+
 
 # Alias para compatibilidad
 DispositivoForm = InstitucionForm
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Conversacion, Mensaje
+from .models import Conversacion, Mensaje, TerminoRiesgo
 
 
 @admin.register(Conversacion)
@@ -25,4 +25,12 @@ class MensajeAdmin(admin.ModelAdmin):
     
     def contenido_corto(self, obj):
         return obj.contenido[:50] + "..." if len(obj.contenido) > 50 else obj.contenido
-    contenido_corto.short_description = 'Contenido'
\ No newline at end of file
+    contenido_corto.short_description = 'Contenido'
+
+
+@admin.register(TerminoRiesgo)
+class TerminoRiesgoAdmin(admin.ModelAdmin):
+    list_display = ['termino', 'severidad', 'palabra_completa', 'activo', 'modificado']
+    list_filter = ['severidad', 'activo', 'palabra_completa']
+    search_fields = ['termino']
+    list_editable = ['severidad', 'activo']
@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.utils import timezone
 from datetime import timedelta
+from core.permisos import GRUPOS_CONVERSACIONES, grupos_usuario
 from .models import Conversacion, Mensaje
 
 
@@ -11,7 +12,7 @@ from .models import Conversacion, Mensaje
 @api_view(['GET'])
 def alertas_conversaciones_count(request):
     """Contador de conversaciones con mensajes no leídos"""
-    if not request.user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists():
+    if grupos_usuario(request.user).isdisjoint(GRUPOS_CONVERSACIONES):
         return JsonResponse({'count': 0})
     
     # Contar alertas no vistas en el historial
@@ -31,7 +32,7 @@ def alertas_conversaciones_count(request):
 @api_view(['GET'])
 def alertas_conversaciones_preview(request):
     """Preview de mensajes no leídos para el dropdown"""
-    if not request.user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists():
+    if grupos_usuario(request.user).isdisjoint(GRUPOS_CONVERSACIONES):
         return JsonResponse({'results': []})
     
     # Obtener últimos mensajes no leídos
@@ -87,11 +88,7 @@ def marcar_mensajes_leidos(request, conversacion_id):
         )
         
         # Marcar mensajes del ciudadano como leídos
-        Mensaje.objects.filter(
-            conversacion=conversacion,
-            remitente='ciudadano',
-            leido=False
-        ).update(leido=True)
+        conversacion.marcar_mensajes_leidos()
         
         return JsonResponse({'success': True})
     except Conversacion.DoesNotExist:
@@ -10,4 +10,5 @@ class ConversacionesConfig(AppConfig):
     
     def ready(self):
         import conversaciones.signals_alertas
+        import conversaciones.signals_contadores
     verbose_name = 'Conversaciones'
\ No newline at end of file
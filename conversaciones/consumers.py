@@ -2,6 +2,7 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import User
+from core import permisos
 from .models import Conversacion, Mensaje
 
 
@@ -70,8 +71,7 @@ class ConversacionConsumer(AsyncWebsocketConsumer):
             return False
         
         # Verificar si tiene permisos de conversaciones
-        return (user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists() 
-                or user.is_superuser)
+        return permisos.tiene_permiso_conversaciones(user)
     
     @database_sync_to_async
     def crear_mensaje(self, contenido):
@@ -220,8 +220,7 @@ class ConversacionesListConsumer(AsyncWebsocketConsumer):
         if not user.is_authenticated:
             return False
         
-        return (user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists() 
-                or user.is_superuser)
+        return permisos.tiene_permiso_conversaciones(user)
 
 
 class AlertasConsumer(AsyncWebsocketConsumer):
@@ -232,21 +231,30 @@ class AlertasConsumer(AsyncWebsocketConsumer):
             return
         
         self.room_group_name = 'alertas_sistema'
+        self.agenda_group_name = f"agenda_usuario_{self.scope['user'].id}"
         
-        # Unirse al grupo
+        # Unirse al grupo general y a los recordatorios de agenda del usuario
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
+        await self.channel_layer.group_add(
+            self.agenda_group_name,
+            self.channel_name
+        )
         
         await self.accept()
     
     async def disconnect(self, close_code):
-        # Salir del grupo
+        # Salir de los grupos
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
+        await self.channel_layer.group_discard(
+            self.agenda_group_name,
+            self.channel_name
+        )
     
     async def nueva_alerta(self, event):
         # Notificar nueva alerta
@@ -269,14 +277,20 @@ class AlertasConsumer(AsyncWebsocketConsumer):
             'alerta_id': event['alerta_id']
         }))
     
+    async def recordatorio_agenda(self, event):
+        # Próximo contacto que vence hoy
+        await self.send(text_data=json.dumps({
+            'type': 'recordatorio_agenda',
+            'item': event['item']
+        }))
+    
     @database_sync_to_async
     def tiene_permiso_alertas(self):
         user = self.scope['user']
         if not user.is_authenticated:
             return False
         
-        return (user.groups.filter(name__in=['Legajos', 'Supervisores', 'Coordinadores']).exists() 
-                or user.is_superuser)
+        return permisos.tiene_grupo(user, 'Legajos', 'Supervisores', 'Coordinadores')
 
 
 class AlertasConversacionesConsumer(AsyncWebsocketConsumer):
@@ -317,5 +331,4 @@ class AlertasConversacionesConsumer(AsyncWebsocketConsumer):
         if not user.is_authenticated:
             return False
         
-        return (user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists() 
-                or user.is_superuser)
\ No newline at end of file
+        return permisos.tiene_permiso_conversaciones(user)
\ No newline at end of file
@@ -1,7 +1,10 @@
+from core.permisos import grupos_usuario
+
+
 def user_groups(request):
     """Context processor para pasar los grupos del usuario al template"""
     if request.user.is_authenticated:
-        groups = list(request.user.groups.values_list('name', flat=True))
+        groups = sorted(grupos_usuario(request.user))
         return {
             'user_groups_list': groups,
             'user_groups_json': str(groups).replace("'", '"')
@@ -2,6 +2,7 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
+from core.permisos import tiene_permiso_conversaciones
 from .models import Conversacion
 
 
@@ -9,7 +10,7 @@ from .models import Conversacion
 @api_view(['GET'])
 def conversacion_detalle(request, conversacion_id):
     """Devuelve datos mínimos de una conversación para actualizar la lista en vivo"""
-    if not request.user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists() and not request.user.is_superuser:
+    if not tiene_permiso_conversaciones(request.user):
         return JsonResponse({'error': 'No autorizado'}, status=403)
 
     try:
@@ -26,8 +27,8 @@ def conversacion_detalle(request, conversacion_id):
         'dni': conv.dni_ciudadano or '',
         'sexo': conv.sexo_ciudadano or '',
         'fecha': conv.fecha_inicio.strftime('%d/%m/%Y %H:%M'),
-        'mensajes': conv.mensajes.count(),
-        'no_leidos': conv.mensajes.filter(remitente='ciudadano', leido=False).count(),
+        'mensajes': conv.total_mensajes,
+        'no_leidos': conv.mensajes_no_leidos,
     }
     return Response({'conversacion': data})
 
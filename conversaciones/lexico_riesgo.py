@@ -0,0 +1,296 @@
+"""
+Detección de términos de riesgo en mensajes de ciudadanos.
+
+Los términos se administran en ``TerminoRiesgo`` y se compilan en un
+autómata Aho-Corasick sobre texto normalizado (minúsculas, sin acentos ni
+signos), así que el costo de analizar un mensaje es lineal en su largo sin
+importar el tamaño del léxico. El autómata se cachea por proceso y se
+reconstruye cuando cambia la versión del léxico en cache.
+
+El análisis no corre dentro del ``post_save`` del mensaje: se encola al
+confirmar la transacción y lo procesa un hilo del worker.
+"""
+import html
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CLAVE_VERSION = 'lexico_riesgo:version'
+INTERVALO_VERIFICACION = 10  # segundos entre chequeos de versión por proceso
+MAX_PENDIENTES = 1000
+
+ORDEN_SEVERIDAD = {'baja': 0, 'media': 1, 'alta': 2, 'critica': 3}
+PRIORIDAD_POR_SEVERIDAD = {'media': 'alta', 'alta': 'alta', 'critica': 'urgente'}
+ORDEN_PRIORIDAD = {'baja': 0, 'normal': 1, 'alta': 2, 'urgente': 3}
+
+_NO_ALFANUMERICO = re.compile(r'[\W_]+')
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con signos/espacios colapsados a un espacio"""
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(' ', sin_acentos).strip()
+
+
+class AutomataRiesgo:
+    """Autómata Aho-Corasick sobre los términos normalizados del léxico"""
+
+    def __init__(self, terminos):
+        # terminos: iterable de (termino, severidad, palabra_completa)
+        self.patrones = []
+        self._transiciones = [{}]
+        self._fallo = [0]
+        self._salidas = [[]]
+
+        for termino, severidad, palabra_completa in terminos:
+            normalizado = normalizar(termino)
+            if not normalizado:
+                continue
+            self._agregar(normalizado, len(self.patrones))
+            self.patrones.append((termino, normalizado, severidad, palabra_completa))
+        self._construir_fallos()
+
+    def _agregar(self, patron, indice):
+        estado = 0
+        for caracter in patron:
+            siguiente = self._transiciones[estado].get(caracter)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[estado][caracter] = siguiente
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append([])
+            estado = siguiente
+        self._salidas[estado].append(indice)
+
+    def _construir_fallos(self):
+        pendientes = deque(self._transiciones[0].values())
+        while pendientes:
+            estado = pendientes.popleft()
+            for caracter, siguiente in self._transiciones[estado].items():
+                pendientes.append(siguiente)
+                fallo = self._fallo[estado]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallo[siguiente] = destino if destino != siguiente else 0
+                self._salidas[siguiente].extend(self._salidas[self._fallo[siguiente]])
+
+    def buscar(self, texto):
+        """Devuelve los términos encontrados como lista de (termino, severidad)"""
+        if not self.patrones:
+            return []
+        texto = normalizar(texto)
+        encontrados = {}
+        estado = 0
+        for posicion, caracter in enumerate(texto):
+            while estado and caracter not in self._transiciones[estado]:
+                estado = self._fallo[estado]
+            estado = self._transiciones[estado].get(caracter, 0)
+            for indice in self._salidas[estado]:
+                if indice in encontrados:
+                    continue
+                termino, normalizado, severidad, palabra_completa = self.patrones[indice]
+                inicio = posicion - len(normalizado) + 1
+                if inicio > 0 and texto[inicio - 1] != ' ':
+                    continue
+                if palabra_completa and posicion + 1 < len(texto) and texto[posicion + 1] != ' ':
+                    continue
+                encontrados[indice] = (termino, severidad)
+        return list(encontrados.values())
+
+
+_automata = None
+_version = None
+_verificado = 0.0
+_lock = threading.Lock()
+
+
+def _version_actual():
+    return cache.get(CLAVE_VERSION, 0)
+
+
+def obtener_automata():
+    """Autómata del proceso, reconstruido si cambió la versión del léxico"""
+    global _automata, _version, _verificado
+    ahora = time.monotonic()
+    if _automata is not None and ahora - _verificado < INTERVALO_VERIFICACION:
+        return _automata
+
+    version = _version_actual()
+    with _lock:
+        if _automata is None or version != _version:
+            from .models import TerminoRiesgo
+            terminos = TerminoRiesgo.objects.filter(activo=True).values_list(
+                'termino', 'severidad', 'palabra_completa'
+            )
+            _automata = AutomataRiesgo(terminos)
+            _version = version
+            logger.info(f"Léxico de riesgo compilado: {len(_automata.patrones)} términos (v{version})")
+        _verificado = ahora
+    return _automata
+
+
+def invalidar_lexico():
+    """Marca el léxico como modificado para que todos los procesos lo recompilen"""
+    global _verificado
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, 1, None)
+    _verificado = 0.0
+
+
+def detectar(texto):
+    return obtener_automata().buscar(texto)
+
+
+# --- Análisis de mensajes ---
+
+def analizar_mensaje(mensaje_id):
+    """Busca términos de riesgo en el mensaje y dispara las alertas correspondientes"""
+    from .models import Mensaje
+
+    mensaje = Mensaje.objects.select_related('conversacion__operador_asignado').filter(pk=mensaje_id).first()
+    if mensaje is None:
+        return []
+
+    hallazgos = detectar(html.unescape(mensaje.contenido))
+    if not hallazgos:
+        return []
+
+    severidad = max((s for _, s in hallazgos), key=lambda s: ORDEN_SEVERIDAD.get(s, 0))
+    conversacion = mensaje.conversacion
+    _escalar_prioridad(conversacion, severidad)
+    if ORDEN_SEVERIDAD.get(severidad, 0) >= ORDEN_SEVERIDAD['alta']:
+        _notificar_operador(conversacion, mensaje, hallazgos, severidad)
+        _alertar_ciudadano(conversacion, severidad)
+    logger.info(
+        f"Términos de riesgo en conversación #{conversacion.id}: "
+        f"{', '.join(t for t, _ in hallazgos)} (severidad {severidad})"
+    )
+    return hallazgos
+
+
+def _escalar_prioridad(conversacion, severidad):
+    prioridad = PRIORIDAD_POR_SEVERIDAD.get(severidad)
+    if not prioridad or ORDEN_PRIORIDAD[prioridad] <= ORDEN_PRIORIDAD.get(conversacion.prioridad, 0):
+        return
+    from .models import Conversacion
+    menores = [p for p, orden in ORDEN_PRIORIDAD.items() if orden < ORDEN_PRIORIDAD[prioridad]]
+    Conversacion.objects.filter(pk=conversacion.pk, prioridad__in=menores).update(prioridad=prioridad)
+
+
+def _notificar_operador(conversacion, mensaje, hallazgos, severidad):
+    operador = conversacion.operador_asignado
+    if operador is None:
+        return
+    from .models import HistorialAlertaConversacion
+
+    terminos = ', '.join(t for t, _ in hallazgos)
+    texto = f'Riesgo {severidad} en conversación #{conversacion.id}: {terminos}'[:200]
+    HistorialAlertaConversacion.objects.create(
+        conversacion=conversacion,
+        operador=operador,
+        tipo='RIESGO_CRITICO',
+        mensaje=texto,
+    )
+    try:
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        channel_layer = get_channel_layer()
+        async_to_sync(channel_layer.group_send)(
+            f'conversaciones_operador_{operador.id}',
+            {
+                'type': 'nueva_alerta_conversacion',
+                'alerta': {
+                    'id': f'riesgo_{conversacion.id}_{mensaje.id}',
+                    'conversacion_id': conversacion.id,
+                    'tipo': 'RIESGO_CRITICO',
+                    'prioridad': 'CRITICA' if severidad == 'critica' else 'ALTA',
+                    'mensaje': texto,
+                    'fecha': mensaje.fecha_envio.strftime('%d/%m/%Y %H:%M'),
+                    'operador_id': operador.id,
+                },
+            }
+        )
+    except Exception as e:
+        logger.warning(f"No se pudo notificar riesgo de conversación #{conversacion.id}: {e}")
+
+
+def _alertar_ciudadano(conversacion, severidad):
+    if not conversacion.dni_ciudadano:
+        return
+    from legajos.models import AlertaCiudadano, Ciudadano
+    from legajos.services_alertas import AlertasService
+
+    ciudadano = Ciudadano.objects.filter(dni=conversacion.dni_ciudadano).first()
+    if ciudadano is None:
+        return
+    prioridad = AlertaCiudadano.Prioridad.CRITICA if severidad == 'critica' else AlertaCiudadano.Prioridad.ALTA
+    # _crear_alerta reutiliza la alerta activa del ciudadano: un mensaje marcado
+    # más en la misma conversación no genera otra alerta ni otra notificación
+    alerta = AlertasService._crear_alerta(
+        ciudadano, None, AlertaCiudadano.TipoAlerta.RIESGO_ALTO, prioridad,
+        f'Términos de riesgo detectados en conversación #{conversacion.id}',
+    )
+    if prioridad == AlertaCiudadano.Prioridad.CRITICA and alerta.prioridad != prioridad:
+        AlertaCiudadano.objects.filter(pk=alerta.pk).update(prioridad=prioridad)
+
+
+class AnalizadorRiesgo:
+    """Cola en memoria procesada por un hilo del worker (un greenlet bajo gevent)"""
+
+    def __init__(self):
+        self._cola = None
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def encolar(self, mensaje_id):
+        self._asegurar_hilo()
+        try:
+            self._cola.put_nowait(mensaje_id)
+        except queue.Full:
+            # No se descarta: con la cola llena se analiza en línea
+            logger.warning(f"Cola de análisis de riesgo llena; mensaje {mensaje_id} analizado en línea")
+            analizar_mensaje(mensaje_id)
+
+    def _asegurar_hilo(self):
+        pid = os.getpid()
+        if self._pid == pid and self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._hilo is not None and self._hilo.is_alive():
+                return
+            if self._pid != pid:
+                # Tras un fork la cola del padre no se comparte
+                self._cola = queue.Queue(maxsize=MAX_PENDIENTES)
+                self._pid = pid
+            self._hilo = threading.Thread(target=self._procesar, daemon=True)
+            self._hilo.start()
+
+    def _procesar(self):
+        from django.db import close_old_connections
+        while True:
+            mensaje_id = self._cola.get()
+            try:
+                analizar_mensaje(mensaje_id)
+            except Exception as e:
+                logger.error(f"Error analizando riesgo del mensaje {mensaje_id}: {e}", exc_info=True)
+            finally:
+                close_old_connections()
+
+
+analizador_riesgo = AnalizadorRiesgo()
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.20 on 2026-10-19 10:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def poblar_contadores(apps, schema_editor):
+    """Inicializa los contadores desde los mensajes y la carga de cada cola"""
+    from django.db.models import Count, F, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+
+    Conversacion = apps.get_model('conversaciones', 'Conversacion')
+    Mensaje = apps.get_model('conversaciones', 'Mensaje')
+    ColaAsignacion = apps.get_model('conversaciones', 'ColaAsignacion')
+
+    mensajes = Mensaje.objects.filter(conversacion=OuterRef('pk')).order_by().values('conversacion')
+    Conversacion.objects.update(
+        total_mensajes=Coalesce(Subquery(mensajes.annotate(n=Count('id')).values('n')), 0),
+        mensajes_no_leidos=Coalesce(Subquery(
+            mensajes.filter(remitente='ciudadano', leido=False).annotate(n=Count('id')).values('n')
+        ), 0),
+        fecha_ultimo_mensaje=Coalesce(
+            Subquery(mensajes.annotate(ultima=models.Max('fecha_envio')).values('ultima')),
+            F('fecha_inicio'),
+        ),
+    )
+
+    activas = (
+        Conversacion.objects.filter(estado='activa', operador_asignado_id=OuterRef('operador_id'))
+        .order_by().values('operador_asignado_id')
+    )
+    ColaAsignacion.objects.update(
+        conversaciones_actuales=Coalesce(Subquery(activas.annotate(n=Count('id')).values('n')), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conversaciones', '0006_alter_colaasignacion_activo_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversacion',
+            name='total_mensajes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversacion',
+            name='mensajes_no_leidos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversacion',
+            name='fecha_ultimo_mensaje',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='conversacion',
+            index=models.Index(fields=['-fecha_ultimo_mensaje', '-id'], name='conversacio_fecha_u_e30467_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversacion',
+            index=models.Index(fields=['operador_asignado', '-fecha_ultimo_mensaje', '-id'], name='conversacio_operado_08f01d_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+TERMINOS_INICIALES = [
+    ('suicidio', 'critica'),
+    ('suicidar', 'critica'),
+    ('matarme', 'critica'),
+    ('quiero morir', 'critica'),
+    ('lastimar', 'alta'),
+    ('violencia', 'alta'),
+    ('matar', 'alta'),
+    ('morir', 'alta'),
+    ('drogas', 'media'),
+]
+
+
+def cargar_terminos(apps, schema_editor):
+    TerminoRiesgo = apps.get_model('conversaciones', 'TerminoRiesgo')
+    TerminoRiesgo.objects.bulk_create(
+        [TerminoRiesgo(termino=termino, severidad=severidad) for termino, severidad in TERMINOS_INICIALES],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conversaciones', '0007_conversacion_contadores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoRiesgo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=100, unique=True)),
+                ('severidad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta'), ('critica', 'Crítica')], db_index=True, default='alta', max_length=10)),
+                ('palabra_completa', models.BooleanField(default=False, help_text='Si está marcado, solo coincide como palabra completa (no como prefijo o parte de otra palabra)')),
+                ('activo', models.BooleanField(db_index=True, default=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('modificado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Término de riesgo',
+                'verbose_name_plural': 'Léxico de riesgo',
+                'ordering': ['termino'],
+            },
+        ),
+        migrations.RunPython(cargar_terminos, migrations.RunPython.noop),
+    ]
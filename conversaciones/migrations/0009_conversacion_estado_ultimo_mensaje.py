@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conversaciones', '0008_terminoriesgo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conversacion',
+            index=models.Index(fields=['estado', 'fecha_ultimo_mensaje'], name='conversacio_estado_952dd8_idx'),
+        ),
+    ]
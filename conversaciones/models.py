@@ -1,9 +1,23 @@
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
 
 
+def restar_sin_negativos(campo, cantidad):
+    """``campo - cantidad`` con piso en 0 para contadores sin signo.
+
+    En MySQL ``PositiveIntegerField`` es INT UNSIGNED: la resta se evalúa antes
+    que un GREATEST y falla (error 1690), así que se compara primero.
+    """
+    return Case(
+        When(**{f'{campo}__gte': cantidad}, then=F(campo) - cantidad),
+        default=Value(0),
+    )
+
+
 class Conversacion(models.Model):
     TIPO_CHOICES = [
         ('anonima', 'Anónima'),
@@ -22,7 +36,9 @@ class Conversacion(models.Model):
         ('alta', 'Alta'),
         ('urgente', 'Urgente'),
     ]
-    
+
+    CAMPOS_CONTADORES = ('total_mensajes', 'mensajes_no_leidos', 'fecha_ultimo_mensaje')
+
     tipo = models.CharField(max_length=10, choices=TIPO_CHOICES, db_index=True)
     estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente', db_index=True)
     prioridad = models.CharField(max_length=10, choices=PRIORIDAD_CHOICES, default='normal', db_index=True)
@@ -36,12 +52,19 @@ class Conversacion(models.Model):
     tiempo_espera_segundos = models.IntegerField(default=0)
     tiempo_respuesta_segundos = models.IntegerField(blank=True, null=True, db_index=True)
     satisfaccion = models.IntegerField(blank=True, null=True, choices=[(i, i) for i in range(1, 6)], db_index=True)
+    # Contadores desnormalizados (los mantiene conversaciones.signals_contadores)
+    total_mensajes = models.PositiveIntegerField(default=0)
+    mensajes_no_leidos = models.PositiveIntegerField(default=0)
+    fecha_ultimo_mensaje = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-fecha_inicio']
         indexes = [
+            models.Index(fields=['-fecha_ultimo_mensaje', '-id']),
+            models.Index(fields=['operador_asignado', '-fecha_ultimo_mensaje', '-id']),
             models.Index(fields=['estado', 'prioridad']),
             models.Index(fields=['operador_asignado', 'estado']),
+            models.Index(fields=['estado', 'fecha_ultimo_mensaje']),
             models.Index(fields=['fecha_inicio']),
             models.Index(fields=['tipo', 'estado']),
             models.Index(fields=['dni_ciudadano']),
@@ -49,6 +72,31 @@ class Conversacion(models.Model):
             models.Index(fields=['fecha_cierre']),
         ]
         
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado cargado de la base: permite calcular el delta de carga al guardar
+        cargados = dict(zip(field_names, values))
+        instance._carga_original = {
+            campo: cargados[campo]
+            for campo in ('estado', 'operador_asignado_id')
+            if campo in cargados
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Los contadores solo se escriben con UPDATE atómicos: el save() de una
+        # instancia cargada antes de un mensaje nuevo no debe pisarlos
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferidos = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key
+                and campo.name not in self.CAMPOS_CONTADORES
+                and campo.attname not in deferidos
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         if self.tipo == 'personal' and self.dni_ciudadano:
             return f"Conversación {self.tipo} - DNI: {self.dni_ciudadano}"
@@ -101,6 +149,16 @@ class Conversacion(models.Model):
         if not self.fecha_primera_respuesta:
             self.fecha_primera_respuesta = timezone.now()
             self.calcular_metricas()
+    
+    def marcar_mensajes_leidos(self):
+        """Marca como leídos los mensajes del ciudadano y descuenta el contador"""
+        marcados = self.mensajes.filter(remitente='ciudadano', leido=False).update(leido=True)
+        if marcados:
+            Conversacion.objects.filter(pk=self.pk).update(
+                mensajes_no_leidos=restar_sin_negativos('mensajes_no_leidos', marcados)
+            )
+            self.mensajes_no_leidos = max(self.mensajes_no_leidos - marcados, 0)
+        return marcados
 
 
 class Mensaje(models.Model):
@@ -168,12 +226,31 @@ class ColaAsignacion(models.Model):
         return self.activo and self.conversaciones_actuales < self.max_conversaciones
     
     def actualizar_contador(self):
-        """Actualiza el contador de conversaciones actuales"""
+        """Recalcula el contador de conversaciones actuales (reconciliación)"""
         self.conversaciones_actuales = Conversacion.objects.filter(
             operador_asignado=self.operador,
             estado='activa'
         ).count()
-        self.save()
+        self.save(update_fields=['conversaciones_actuales'])
+    
+    @staticmethod
+    def ajustar_carga(operador_id, delta):
+        """Suma ``delta`` al contador del operador con un UPDATE atómico"""
+        if operador_id and delta:
+            ColaAsignacion.objects.filter(operador_id=operador_id).update(
+                conversaciones_actuales=Greatest(F('conversaciones_actuales') + delta, Value(0))
+            )
+
+    @staticmethod
+    def recalcular_cargas():
+        """Recalcula el contador de todas las colas con un único UPDATE agrupado"""
+        activas = (
+            Conversacion.objects.filter(estado='activa', operador_asignado_id=OuterRef('operador_id'))
+            .order_by().values('operador_asignado_id')
+        )
+        return ColaAsignacion.objects.update(
+            conversaciones_actuales=Coalesce(Subquery(activas.annotate(n=Count('id')).values('n')), 0)
+        )
 
 
 class MetricasOperador(models.Model):
@@ -264,4 +341,31 @@ class HistorialAlertaConversacion(models.Model):
         ]
         
     def __str__(self):
-        return f'{self.tipo} - Conv #{self.conversacion.id} - {self.operador.username}'
\ No newline at end of file
+        return f'{self.tipo} - Conv #{self.conversacion.id} - {self.operador.username}'
+
+class TerminoRiesgo(models.Model):
+    """Término del léxico de riesgo buscado en los mensajes de ciudadanos"""
+    SEVERIDAD_CHOICES = [
+        ('baja', 'Baja'),
+        ('media', 'Media'),
+        ('alta', 'Alta'),
+        ('critica', 'Crítica'),
+    ]
+    
+    termino = models.CharField(max_length=100, unique=True)
+    severidad = models.CharField(max_length=10, choices=SEVERIDAD_CHOICES, default='alta', db_index=True)
+    palabra_completa = models.BooleanField(
+        default=False,
+        help_text='Si está marcado, solo coincide como palabra completa (no como prefijo o parte de otra palabra)'
+    )
+    activo = models.BooleanField(default=True, db_index=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    modificado = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['termino']
+        verbose_name = 'Término de riesgo'
+        verbose_name_plural = 'Léxico de riesgo'
+        
+    def __str__(self):
+        return f'{self.termino} ({self.get_severidad_display()})'
@@ -1,7 +1,14 @@
+import heapq
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.utils import timezone
 from django.db import models
-from .models import Conversacion, ColaAsignacion, MetricasOperador
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import Coalesce
+from .models import Conversacion, ColaAsignacion, HistorialAsignacion, MetricasOperador
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,23 +16,29 @@ logger = logging.getLogger(__name__)
 
 class AsignadorAutomatico:
     """Servicio para asignación automática de conversaciones"""
+
+    VENTANA_CONECTADO = getattr(settings, 'CONVERSACIONES_VENTANA_CONECTADO', 15 * 60)
+
+    @classmethod
+    def operadores_conectados(cls):
+        """
+        Ids de los usuarios con actividad reciente. Las sesiones viven en la
+        cache, así que se usa ``SesionUsuario``: su ``ultima_actividad`` se
+        vuelca cada 30 segundos desde core.session_activity.
+        """
+        from core.models_auditoria import SesionUsuario
+
+        desde = timezone.now() - timedelta(seconds=cls.VENTANA_CONECTADO)
+        return list(
+            SesionUsuario.objects.filter(activa=True, ultima_actividad__gte=desde)
+            .values_list('usuario_id', flat=True).distinct()
+        )
     
     @staticmethod
     def obtener_operador_disponible():
         """Obtiene el operador más adecuado para asignar una conversación (solo operadores logueados)"""
         try:
-            from django.contrib.sessions.models import Session
-            from django.utils import timezone
-            
-            # Obtener usuarios actualmente logueados
-            sesiones_activas = Session.objects.filter(expire_date__gte=timezone.now())
-            usuarios_logueados = []
-            
-            for sesion in sesiones_activas:
-                data = sesion.get_decoded()
-                user_id = data.get('_auth_user_id')
-                if user_id:
-                    usuarios_logueados.append(int(user_id))
+            usuarios_logueados = AsignadorAutomatico.operadores_conectados()
             
             # Buscar operadores disponibles que estén logueados
             cola_disponible = ColaAsignacion.objects.filter(
@@ -58,14 +71,14 @@ class AsignadorAutomatico:
             if operador:
                 conversacion.asignar_operador(operador)
                 
-                # Actualizar cola del operador
+                # El contador de carga ya lo ajustó la señal de Conversacion
                 cola, created = ColaAsignacion.objects.get_or_create(
                     operador=operador,
                     defaults={'max_conversaciones': 5}
                 )
-                cola.actualizar_contador()
-                cola.ultima_asignacion = timezone.now()
-                cola.save()
+                if created:
+                    cola.actualizar_contador()
+                ColaAsignacion.objects.filter(pk=cola.pk).update(ultima_asignacion=timezone.now())
                 
                 logger.info(f"Conversación {conversacion.id} asignada automáticamente a {operador.username}")
                 return True
@@ -91,16 +104,258 @@ class AsignadorAutomatico:
         if not created:
             cola.max_conversaciones = max_conversaciones
             cola.activo = activo
-            cola.save()
+            cola.save(update_fields=['max_conversaciones', 'activo'])
         
         cola.actualizar_contador()
         return cola
     
     @staticmethod
     def actualizar_todas_las_colas():
-        """Actualiza los contadores de todas las colas"""
-        for cola in ColaAsignacion.objects.select_related('operador'):
-            cola.actualizar_contador()
+        """Recalcula los contadores de todas las colas (reconciliación)"""
+        return ColaAsignacion.recalcular_cargas()
+    
+    @staticmethod
+    def asignar_pendientes(anteriores=None):
+        """
+        Reparte las conversaciones pendientes o activas sin operador según la
+        capacidad libre de las colas, leída una sola vez. ``anteriores`` ({conversacion_id:
+        operador_id}) evita devolver una conversación al operador que la dejó.
+        """
+        anteriores = anteriores or {}
+        colas = ColaAsignacion.objects.filter(
+            activo=True,
+            operador_id__in=AsignadorAutomatico.operadores_conectados(),
+            conversaciones_actuales__lt=models.F('max_conversaciones')
+        ).select_related('operador')
+        # Mismo orden que obtener_operador_disponible: menos cargada, asignada hace más tiempo
+        disponibles = [
+            (cola.conversaciones_actuales, cola.ultima_asignacion.timestamp() if cola.ultima_asignacion else 0, cola.pk, cola)
+            for cola in colas
+        ]
+        capacidad = sum(cola.max_conversaciones - carga for carga, _, _, cola in disponibles)
+        if not capacidad:
+            return 0
+        heapq.heapify(disponibles)
+        
+        ahora = timezone.now()
+        asignadas = set()
+        pendientes = Conversacion.objects.filter(
+            estado__in=('pendiente', 'activa'), operador_asignado__isnull=True
+        ).order_by('fecha_inicio')[:capacidad]
+        for conversacion in pendientes:
+            if not disponibles:
+                break
+            elegida = heapq.heappop(disponibles)
+            if elegida[3].operador_id == anteriores.get(conversacion.pk):
+                if not disponibles:
+                    heapq.heappush(disponibles, elegida)
+                    continue
+                elegida, apartada = heapq.heappop(disponibles), elegida
+                heapq.heappush(disponibles, apartada)
+            carga, _, pk, cola = elegida
+            # La señal de Conversacion suma la carga en la base
+            conversacion.asignar_operador(cola.operador)
+            asignadas.add(pk)
+            if carga + 1 < cola.max_conversaciones:
+                heapq.heappush(disponibles, (carga + 1, ahora.timestamp(), pk, cola))
+        
+        if asignadas:
+            ColaAsignacion.objects.filter(pk__in=asignadas).update(ultima_asignacion=ahora)
+        return len(asignadas)
+
+
+class DepuradorInactivas:
+    """
+    Cierra o devuelve a la cola las conversaciones sin mensajes recientes.
+
+    Con una consulta sobre el índice (estado, fecha_ultimo_mensaje):
+
+    - sin mensajes sin leer durante ``INACTIVIDAD_CIERRE``, o sin ningún
+      mensaje durante ``INACTIVIDAD_ABANDONO``: se cierran.
+    - con mensajes del ciudadano sin leer durante ``INACTIVIDAD_REASIGNAR``:
+      se le quitan al operador y vuelven a la cola como 'pendiente' (lista
+      de espera, alertas y contador de pendientes de la bandeja).
+
+    Los cambios son UPDATE en bloque que repiten las condiciones (un mensaje
+    que llega en el medio saca a la conversación), así que la carga de los
+    operadores se recalcula después con un único UPDATE agrupado. En cada
+    pasada se asignan las conversaciones en espera, haya habido cambios o no:
+    una que no entró antes toma la capacidad que se libere después.
+    """
+
+    INACTIVIDAD_REASIGNAR = getattr(settings, 'CONVERSACIONES_INACTIVIDAD_REASIGNAR', 30 * 60)
+    INACTIVIDAD_CIERRE = getattr(settings, 'CONVERSACIONES_INACTIVIDAD_CIERRE', 2 * 60 * 60)
+    INACTIVIDAD_ABANDONO = getattr(settings, 'CONVERSACIONES_INACTIVIDAD_ABANDONO', 48 * 60 * 60)
+    LOTE = 1000
+    ABIERTAS = ('pendiente', 'activa')
+
+    @classmethod
+    def _condiciones(cls, ahora):
+        abandonada = Q(fecha_ultimo_mensaje__lt=ahora - timedelta(seconds=cls.INACTIVIDAD_ABANDONO))
+        cerrar = Q(estado__in=cls.ABIERTAS) & (
+            abandonada
+            | Q(mensajes_no_leidos=0, fecha_ultimo_mensaje__lt=ahora - timedelta(seconds=cls.INACTIVIDAD_CIERRE))
+        )
+        reasignar = Q(
+            estado='activa',
+            operador_asignado__isnull=False,
+            mensajes_no_leidos__gt=0,
+            fecha_ultimo_mensaje__lt=ahora - timedelta(seconds=cls.INACTIVIDAD_REASIGNAR),
+        ) & ~abandonada
+        return cerrar, reasignar
+
+    @classmethod
+    def depurar(cls, ahora=None):
+        """Aplica cierres y reasignaciones. Devuelve un resumen"""
+        ahora = ahora or timezone.now()
+        cerrar, reasignar = cls._condiciones(ahora)
+        minimo = min(cls.INACTIVIDAD_REASIGNAR, cls.INACTIVIDAD_CIERRE, cls.INACTIVIDAD_ABANDONO)
+
+        candidatas = list(
+            Conversacion.objects.filter(
+                estado__in=cls.ABIERTAS,
+                fecha_ultimo_mensaje__lt=ahora - timedelta(seconds=minimo),
+            ).filter(cerrar | reasignar)
+            .order_by('fecha_ultimo_mensaje')
+            .values_list('id', 'operador_asignado_id')[:cls.LOTE]
+        )
+        ids = [fila[0] for fila in candidatas]
+
+        cerradas = Conversacion.objects.filter(cerrar, pk__in=ids).update(estado='cerrada', fecha_cierre=ahora)
+
+        operadores = {fila[0]: fila[1] for fila in candidatas if fila[1]}
+        reasignadas = Conversacion.objects.filter(reasignar, pk__in=list(operadores)).update(
+            estado='pendiente', operador_asignado=None, fecha_asignacion=None
+        )
+        devueltas = {}
+        if reasignadas:
+            devueltas = {
+                pk: operadores[pk]
+                for pk in Conversacion.objects.filter(
+                    pk__in=list(operadores), estado='pendiente', operador_asignado__isnull=True
+                ).values_list('id', flat=True)
+            }
+            HistorialAsignacion.objects.bulk_create([
+                HistorialAsignacion(conversacion_id=pk, operador_anterior_id=operador_id, fecha_asignacion=ahora)
+                for pk, operador_id in devueltas.items()
+            ])
+
+        colas = ColaAsignacion.recalcular_cargas()
+        asignadas = AsignadorAutomatico.asignar_pendientes(anteriores=devueltas)
+        if cerradas or reasignadas or asignadas:
+            cls._publicar(cerradas, reasignadas, asignadas)
+
+        return {
+            'cerradas': cerradas,
+            'reasignadas': reasignadas,
+            'asignadas': asignadas,
+            'colas': colas,
+        }
+
+    @staticmethod
+    def _publicar(cerradas, reasignadas, asignadas):
+        """Invalida las vistas cacheadas y avisa a las bandejas abiertas"""
+        from core.cache_decorators import invalidate_cache_pattern
+        invalidate_cache_pattern('conversaciones:lista_conversaciones')
+        cache.delete(BandejaOperador.CLAVE_ESTADISTICAS)
+        try:
+            from channels.layers import get_channel_layer
+            from asgiref.sync import async_to_sync
+            async_to_sync(get_channel_layer().group_send)(
+                'conversaciones_list',
+                {
+                    'type': 'actualizar_lista',
+                    'mensaje': f'{cerradas} cerradas y {reasignadas} devueltas a la cola por inactividad; {asignadas} asignadas',
+                }
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo notificar la depuración de conversaciones: {e}")
+
+
+class BandejaOperador:
+    """Bandeja de conversaciones paginada por keyset sobre los contadores desnormalizados"""
+
+    TAMANO_PAGINA = 25
+    TIMEOUT_ESTADISTICAS = 300
+    CLAVE_ESTADISTICAS = 'bandeja:estadisticas'
+
+    @staticmethod
+    def codificar_cursor(conversacion):
+        marca = int(conversacion.fecha_ultimo_mensaje.timestamp() * 1_000_000)
+        return f"{marca}_{conversacion.pk}"
+
+    @staticmethod
+    def decodificar_cursor(cursor):
+        """Devuelve (fecha_ultimo_mensaje, id) o None si el cursor es inválido"""
+        try:
+            marca, pk = cursor.split('_', 1)
+            fecha = datetime.fromtimestamp(int(marca) / 1_000_000, tz=dt_timezone.utc)
+            return fecha, int(pk)
+        except (AttributeError, ValueError, OverflowError, OSError):
+            return None
+
+    @classmethod
+    def pagina(cls, queryset, cursor=None, tamano=None):
+        """
+        Página de conversaciones ordenadas por último mensaje. Devuelve
+        ``(conversaciones, siguiente_cursor)``; el costo no depende de cuántas
+        conversaciones haya antes del cursor.
+        """
+        tamano = tamano or cls.TAMANO_PAGINA
+        queryset = queryset.order_by('-fecha_ultimo_mensaje', '-id')
+
+        posicion = cls.decodificar_cursor(cursor) if cursor else None
+        if posicion:
+            fecha, pk = posicion
+            queryset = queryset.filter(
+                Q(fecha_ultimo_mensaje__lt=fecha) | Q(fecha_ultimo_mensaje=fecha, id__lt=pk)
+            )
+
+        conversaciones = list(queryset[:tamano + 1])
+        siguiente = None
+        if len(conversaciones) > tamano:
+            conversaciones = conversaciones[:tamano]
+            siguiente = cls.codificar_cursor(conversaciones[-1])
+        return conversaciones, siguiente
+
+    @classmethod
+    def estadisticas(cls):
+        """
+        Sin atender, atendidos en el mes y tiempo promedio de respuesta del mes.
+
+        Las consultas recorren solo conversaciones abiertas (índice
+        operador/estado) y las del mes (índice fecha_inicio), así que no crecen
+        con el historial. Los mensajes no cambian estos valores: la cache se
+        borra en las transiciones de estado u operador (signals_contadores y
+        el depurador) y ``TIMEOUT_ESTADISTICAS`` queda como respaldo.
+        """
+        datos = cache.get(cls.CLAVE_ESTADISTICAS)
+        if datos is not None:
+            return datos
+
+        inicio_mes = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        no_atendidos = Conversacion.objects.filter(
+            operador_asignado__isnull=True, estado__in=('pendiente', 'activa')
+        ).count()
+        mes = Conversacion.objects.filter(
+            fecha_inicio__gte=inicio_mes, operador_asignado__isnull=False
+        ).aggregate(atendidos=Count('id'), tiempo_promedio=Avg('tiempo_respuesta_segundos'))
+        datos = {
+            'chats_no_atendidos': no_atendidos,
+            'atendidos_mes': mes['atendidos'],
+            'tiempo_promedio': round((mes['tiempo_promedio'] or 0) / 60, 1),
+        }
+        cache.set(cls.CLAVE_ESTADISTICAS, datos, cls.TIMEOUT_ESTADISTICAS)
+        return datos
+
+    @staticmethod
+    def carga_operadores():
+        """Operadores de conversaciones con su carga actual leída de ColaAsignacion"""
+        return User.objects.filter(
+            groups__name__in=['Conversaciones', 'OperadorCharla']
+        ).distinct().annotate(
+            conversaciones_activas=Coalesce('cola_asignacion__conversaciones_actuales', 0)
+        ).order_by('first_name', 'last_name')
 
 
 class MetricasService:
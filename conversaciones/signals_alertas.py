@@ -1,9 +1,11 @@
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 
-from .models import Conversacion, Mensaje
+from .models import Conversacion, Mensaje, TerminoRiesgo
+from .lexico_riesgo import analizador_riesgo, invalidar_lexico
 from legajos.services_alertas import AlertasService
 
 
@@ -76,9 +78,11 @@ def verificar_tiempo_respuesta(sender, instance, created, **kwargs):
         try:
             conversacion = instance.conversacion
             
-            # Verificar palabras clave de riesgo PRIMERO
+            # Términos de riesgo: se analizan fuera del guardado, al confirmar
+            mensaje_id = instance.pk
+            transaction.on_commit(lambda: analizador_riesgo.encolar(mensaje_id))
+            
             if conversacion.operador_asignado:
-                _verificar_palabras_riesgo(conversacion, instance)
                 _generar_alerta_mensaje_ciudadano(conversacion, instance)
                 _crear_historial_mensaje(conversacion, instance)
             
@@ -111,30 +115,6 @@ def verificar_tiempo_respuesta(sender, instance, created, **kwargs):
             print(f"Error verificando tiempo de respuesta: {e}")
 
 
-def _verificar_palabras_riesgo(conversacion, mensaje):
-    """Verifica palabras clave de riesgo en el mensaje"""
-    try:
-        palabras_riesgo = ['suicidio', 'lastimar', 'drogas', 'violencia', 'matar', 'morir', 'suicidar']
-        contenido_lower = mensaje.contenido.lower()
-        
-        palabras_encontradas = [palabra for palabra in palabras_riesgo if palabra in contenido_lower]
-        
-        if palabras_encontradas:
-            # Crear alerta crítica en el sistema principal
-            if hasattr(conversacion, 'ciudadano_relacionado') and conversacion.ciudadano_relacionado:
-                from legajos.models import AlertaCiudadano
-                
-                alerta = AlertaCiudadano.objects.create(
-                    ciudadano=conversacion.ciudadano_relacionado,
-                    tipo='RIESGO_CRITICO_CONVERSACION',
-                    prioridad='CRITICA',
-                    mensaje=f'RIESGO CRÍTICO: Palabras de riesgo detectadas en conversación #{conversacion.id}'
-                )
-                AlertasService._enviar_notificacion_alerta(alerta)
-    except Exception as e:
-        print(f"Error verificando palabras de riesgo: {e}")
-
-
 def _generar_alerta_mensaje_ciudadano(conversacion, mensaje):
     """Genera alerta específica para operadores de conversaciones"""
     try:
@@ -182,3 +162,7 @@ def _crear_historial_mensaje(conversacion, mensaje):
         print(f"Error creando historial de mensaje: {e}")
 
 
+@receiver([post_save, post_delete], sender=TerminoRiesgo)
+def recompilar_lexico_riesgo(sender, **kwargs):
+    """Fuerza la recompilación del autómata en todos los procesos"""
+    invalidar_lexico()
@@ -0,0 +1,84 @@
+"""
+Mantenimiento de los contadores desnormalizados de conversaciones.
+
+Todas las actualizaciones son UPDATE con expresiones F(), así que dos
+mensajes simultáneos no se pisan: la bandeja lee los contadores sin
+agregar sobre ``Mensaje``.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ColaAsignacion, Conversacion, Mensaje, restar_sin_negativos
+
+logger = logging.getLogger(__name__)
+
+
+def _operador_activo(estado, operador_id):
+    return operador_id if estado == 'activa' else None
+
+
+@receiver(post_save, sender=Mensaje)
+def contar_mensaje_nuevo(sender, instance, created, **kwargs):
+    """Suma el mensaje a los contadores de su conversación"""
+    if not created:
+        return
+    cambios = {
+        'total_mensajes': F('total_mensajes') + 1,
+        'fecha_ultimo_mensaje': Greatest(F('fecha_ultimo_mensaje'), Value(instance.fecha_envio)),
+    }
+    if instance.remitente == 'ciudadano' and not instance.leido:
+        cambios['mensajes_no_leidos'] = F('mensajes_no_leidos') + 1
+    Conversacion.objects.filter(pk=instance.conversacion_id).update(**cambios)
+
+
+@receiver(post_delete, sender=Mensaje)
+def descontar_mensaje(sender, instance, **kwargs):
+    cambios = {'total_mensajes': restar_sin_negativos('total_mensajes', 1)}
+    if instance.remitente == 'ciudadano' and not instance.leido:
+        cambios['mensajes_no_leidos'] = restar_sin_negativos('mensajes_no_leidos', 1)
+    Conversacion.objects.filter(pk=instance.conversacion_id).update(**cambios)
+
+
+@receiver(post_save, sender=Conversacion)
+def actualizar_carga_operador(sender, instance, created, **kwargs):
+    """Ajusta ``ColaAsignacion.conversaciones_actuales`` según el cambio de estado/operador"""
+    if created:
+        original = {'estado': None, 'operador_asignado_id': None}
+    else:
+        original = getattr(instance, '_carga_original', None)
+    actual = {'estado': instance.estado, 'operador_asignado_id': instance.operador_asignado_id}
+    instance._carga_original = actual
+
+    if original is None or len(original) < 2:
+        # Instancia sin estado de origen conocido (construida a mano o con .only())
+        if actual['operador_asignado_id']:
+            cola = ColaAsignacion.objects.filter(operador_id=actual['operador_asignado_id']).first()
+            if cola:
+                cola.actualizar_contador()
+        return
+
+    anterior = _operador_activo(original.get('estado'), original.get('operador_asignado_id'))
+    nuevo = _operador_activo(actual['estado'], actual['operador_asignado_id'])
+    if anterior == nuevo:
+        return
+    ColaAsignacion.ajustar_carga(anterior, -1)
+    ColaAsignacion.ajustar_carga(nuevo, 1)
+
+
+@receiver(post_delete, sender=Conversacion)
+def liberar_carga_operador(sender, instance, **kwargs):
+    ColaAsignacion.ajustar_carga(_operador_activo(instance.estado, instance.operador_asignado_id), -1)
+
+
+@receiver(post_save, sender=Conversacion)
+@receiver(post_delete, sender=Conversacion)
+def invalidar_estadisticas_bandeja(sender, instance, **kwargs):
+    """Asignación, cierre y métricas de respuesta cambian las estadísticas de la bandeja"""
+    from .services import BandejaOperador
+    transaction.on_commit(lambda: cache.delete(BandejaOperador.CLAVE_ESTADISTICAS))
@@ -8,6 +8,8 @@ from django.contrib import messages
 from django.db import models
 from django.core.cache import cache
 from core.cache_decorators import cache_view, cache_queryset, invalidate_cache_pattern
+from core.permisos import grupos_usuario, tiene_permiso_conversaciones
+from core.respuestas_condicionales import condicional, validador
 from .models import Conversacion, Mensaje
 import json
 
@@ -235,16 +237,10 @@ def obtener_mensajes_ciudadano(request, conversacion_id):
 
 
 # Vistas del backoffice
-def tiene_permiso_conversaciones(user):
-    return user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists() or user.is_superuser
-
-
 @login_required
 @user_passes_test(tiene_permiso_conversaciones)
 def lista_conversaciones(request):
-    from datetime import datetime
-    from django.db.models import Count, Q
-    from django.contrib.auth.models import User
+    from .services import BandejaOperador
     
     # Filtros
     estado_filtro = request.GET.get('estado', '')
@@ -253,18 +249,16 @@ def lista_conversaciones(request):
     fecha_hasta = request.GET.get('fecha_hasta', '')
     busqueda = request.GET.get('busqueda', '')
     tipo_filtro = request.GET.get('tipo', '')
+    cursor = request.GET.get('cursor', '')
     
-    # Base queryset optimizado
-    if request.user.groups.filter(name='OperadorCharla').exists() and not request.user.is_superuser:
-        conversaciones = Conversacion.objects.select_related('operador_asignado').annotate(
-            mensajes_no_leidos=Count('mensajes', filter=Q(mensajes__remitente='ciudadano', mensajes__leido=False))
-        ).filter(
+    # Los no leídos y el total de mensajes son contadores de Conversacion
+    es_operador_charla = 'OperadorCharla' in grupos_usuario(request.user)
+    
+    conversaciones = Conversacion.objects.select_related('operador_asignado')
+    if es_operador_charla and not request.user.is_superuser:
+        conversaciones = conversaciones.filter(
             models.Q(operador_asignado=None) | models.Q(operador_asignado=request.user)
         )
-    else:
-        conversaciones = Conversacion.objects.select_related('operador_asignado').annotate(
-            mensajes_no_leidos=Count('mensajes', filter=Q(mensajes__remitente='ciudadano', mensajes__leido=False))
-        )
     
     # Aplicar filtros
     if estado_filtro:
@@ -286,57 +280,34 @@ def lista_conversaciones(request):
     
     if busqueda:
         conversaciones = conversaciones.filter(
-            Q(id__icontains=busqueda) | Q(dni_ciudadano__icontains=busqueda)
+            models.Q(id__icontains=busqueda) | models.Q(dni_ciudadano__icontains=busqueda)
         )
     
     if tipo_filtro:
         conversaciones = conversaciones.filter(tipo=tipo_filtro)
     
-    # Estadísticas
-    chats_no_atendidos = Conversacion.objects.filter(operador_asignado=None, estado='activa').count()
-    
-    mes_actual = datetime.now().month
-    año_actual = datetime.now().year
-    atendidos_mes = Conversacion.objects.filter(
-        operador_asignado__isnull=False,
-        fecha_inicio__month=mes_actual,
-        fecha_inicio__year=año_actual
-    ).count()
-    
-    # Tiempo promedio optimizado usando campo precalculado
-    from django.db.models import Avg
-    tiempo_promedio = Conversacion.objects.filter(
-        operador_asignado__isnull=False,
-        tiempo_respuesta_segundos__isnull=False
-    ).aggregate(
-        promedio=Avg('tiempo_respuesta_segundos')
-    )['promedio'] or 0
-    tiempo_promedio = round(tiempo_promedio / 60, 1)
-    
-    # Carga de trabajo por operador
-    operadores_con_carga = User.objects.filter(
-        groups__name__in=['Conversaciones', 'OperadorCharla']
-    ).annotate(
-        conversaciones_activas=Count('conversacion', filter=Q(conversacion__estado='activa'))
-    ).order_by('first_name', 'last_name')
-    
-    # Todos los operadores para el filtro
-    todos_operadores = User.objects.filter(
-        groups__name__in=['Conversaciones', 'OperadorCharla']
-    ).order_by('first_name', 'last_name')
+    # Paginación por keyset (último mensaje, id)
+    conversaciones, siguiente_cursor = BandejaOperador.pagina(conversaciones, cursor)
+    parametros = request.GET.copy()
+    parametros.pop('cursor', None)
+    if siguiente_cursor:
+        parametros['cursor'] = siguiente_cursor
     
-    es_operador_charla = request.user.groups.filter(name='OperadorCharla').exists()
-    
-    # mensajes_no_leidos ya calculado en annotate - eliminar bucle
+    # Estadísticas y carga por operador desde contadores
+    estadisticas = BandejaOperador.estadisticas()
+    operadores_con_carga = BandejaOperador.carga_operadores()
     
     return render(request, 'conversaciones/lista.html', {
         'conversaciones': conversaciones,
         'es_operador_charla': es_operador_charla,
-        'chats_no_atendidos': chats_no_atendidos,
-        'atendidos_mes': atendidos_mes,
-        'tiempo_promedio': round(tiempo_promedio, 1),
+        'chats_no_atendidos': estadisticas['chats_no_atendidos'],
+        'atendidos_mes': estadisticas['atendidos_mes'],
+        'tiempo_promedio': estadisticas['tiempo_promedio'],
         'operadores_con_carga': operadores_con_carga,
-        'todos_operadores': todos_operadores,
+        'todos_operadores': operadores_con_carga,
+        'cursor_actual': cursor,
+        'siguiente_cursor': siguiente_cursor,
+        'query_siguiente': parametros.urlencode() if siguiente_cursor else '',
         'filtros': {
             'estado': estado_filtro,
             'operador': operador_filtro,
@@ -355,7 +326,7 @@ def detalle_conversacion(request, conversacion_id):
     mensajes = conversacion.mensajes.all()
     
     # Marcar mensajes del ciudadano como leídos
-    mensajes.filter(remitente='ciudadano', leido=False).update(leido=True)
+    conversacion.marcar_mensajes_leidos()
     
     return render(request, 'conversaciones/detalle.html', {
         'conversacion': conversacion,
@@ -383,10 +354,6 @@ def asignar_conversacion(request, conversacion_id):
             conversacion.asignar_operador(request.user, request.user)
             messages.success(request, 'Conversación asignada exitosamente.')
         
-        # Actualizar colas después de la asignación
-        from .services import AsignadorAutomatico
-        AsignadorAutomatico.actualizar_todas_las_colas()
-        
         # Invalidar cache de la lista
         invalidate_cache_pattern('conversaciones:lista_conversaciones')
         
@@ -503,10 +470,6 @@ def reasignar_conversacion(request, conversacion_id):
             
             conversacion.asignar_operador(operador, request.user)
             
-            # Actualizar colas
-            from .services import AsignadorAutomatico
-            AsignadorAutomatico.actualizar_todas_las_colas()
-            
             # Invalidar cache
             invalidate_cache_pattern('conversaciones:lista_conversaciones')
             
@@ -579,7 +542,7 @@ def asignacion_automatica(request):
         conversaciones_sin_asignar = Conversacion.objects.filter(
             estado='activa',
             operador_asignado=None
-        ).only('id', 'estado')
+        )
         
         asignadas = 0
         sin_operadores = 0
@@ -647,14 +610,22 @@ def api_metricas_tiempo_real(request):
     })
 
 
+def _validador_conversacion(request, conversacion_id):
+    """Los campos que muestra el detalle; evita serializar y enviar si no cambiaron"""
+    fila = Conversacion.objects.filter(id=conversacion_id).values_list(
+        'tipo', 'dni_ciudadano', 'sexo_ciudadano', 'estado', 'fecha_inicio', 'total_mensajes',
+        'mensajes_no_leidos', 'operador_asignado_id', 'operador_asignado__first_name', 'operador_asignado__last_name',
+    ).first()
+    return validador('conversacion', conversacion_id, *fila) if fila else None
+
+
 @login_required
 @user_passes_test(tiene_permiso_conversaciones)
+@condicional(_validador_conversacion)
 def api_conversacion_detalle(request, conversacion_id):
     """API para obtener detalles de una conversación específica"""
     try:
-        conversacion = Conversacion.objects.select_related('operador_asignado').annotate(
-            mensajes_no_leidos=Count('mensajes', filter=Q(mensajes__remitente='ciudadano', mensajes__leido=False))
-        ).get(id=conversacion_id)
+        conversacion = Conversacion.objects.select_related('operador_asignado').get(id=conversacion_id)
         
         return JsonResponse({
             'success': True,
@@ -667,7 +638,7 @@ def api_conversacion_detalle(request, conversacion_id):
                 'estado_display': conversacion.get_estado_display(),
                 'operador': conversacion.operador_asignado.get_full_name() if conversacion.operador_asignado else None,
                 'fecha': conversacion.fecha_inicio.strftime('%d/%m/%Y %H:%M'),
-                'mensajes': conversacion.mensajes.count(),
+                'mensajes': conversacion.total_mensajes,
                 'no_leidos': conversacion.mensajes_no_leidos
             }
         })
@@ -679,43 +650,9 @@ def api_conversacion_detalle(request, conversacion_id):
 @user_passes_test(tiene_permiso_conversaciones)
 def api_estadisticas_tiempo_real(request):
     """API para obtener estadísticas de conversaciones en tiempo real"""
-    from datetime import datetime
-    
-    # Estadísticas básicas
-    chats_no_atendidos = Conversacion.objects.filter(operador_asignado=None, estado='activa').count()
-    
-    mes_actual = datetime.now().month
-    año_actual = datetime.now().year
-    atendidos_mes = Conversacion.objects.filter(
-        operador_asignado__isnull=False,
-        fecha_inicio__month=mes_actual,
-        fecha_inicio__year=año_actual
-    ).count()
-    
-    # Tiempo promedio de respuesta
-    tiempo_promedio = 0
-    conversaciones_con_respuesta = Conversacion.objects.filter(
-        operador_asignado__isnull=False,
-        mensajes__remitente='operador'
-    ).distinct()
-    
-    if conversaciones_con_respuesta.exists():
-        tiempos = []
-        for conv in conversaciones_con_respuesta:
-            primer_msg_ciudadano = conv.mensajes.filter(remitente='ciudadano').first()
-            primer_msg_operador = conv.mensajes.filter(remitente='operador').first()
-            if primer_msg_ciudadano and primer_msg_operador:
-                diff = primer_msg_operador.fecha_envio - primer_msg_ciudadano.fecha_envio
-                tiempos.append(diff.total_seconds() / 60)
-        
-        if tiempos:
-            tiempo_promedio = sum(tiempos) / len(tiempos)
+    from .services import BandejaOperador
     
     return JsonResponse({
         'success': True,
-        'estadisticas': {
-            'chats_no_atendidos': chats_no_atendidos,
-            'atendidos_mes': atendidos_mes,
-            'tiempo_promedio': round(tiempo_promedio, 1)
-        }
+        'estadisticas': BandejaOperador.estadisticas()
     })
@@ -325,10 +325,10 @@ class AuditoriaInstitucionAdmin(admin.ModelAdmin):
 
 @admin.register(OperacionMasiva)
 class OperacionMasivaAdmin(admin.ModelAdmin):
-    list_display = ('tipo', 'modelo_afectado', 'usuario', 'cantidad_registros', 'registros_exitosos', 'completada', 'fecha_inicio')
-    list_filter = ('tipo', 'completada', 'fecha_inicio')
+    list_display = ('tipo', 'accion', 'modelo_afectado', 'usuario', 'cantidad_registros', 'procesados', 'registros_exitosos', 'registros_fallidos', 'estado', 'fecha_inicio')
+    list_filter = ('tipo', 'estado', 'completada', 'fecha_inicio')
     search_fields = ('usuario__username', 'modelo_afectado')
-    readonly_fields = ('tipo', 'usuario', 'modelo_afectado', 'cantidad_registros', 'registros_exitosos', 'registros_fallidos', 'archivo_origen', 'archivo_log', 'fecha_inicio', 'fecha_fin', 'completada', 'errores', 'ip_address')
+    readonly_fields = ('tipo', 'usuario', 'modelo_afectado', 'cantidad_registros', 'registros_exitosos', 'registros_fallidos', 'archivo_origen', 'archivo_log', 'fecha_inicio', 'fecha_fin', 'completada', 'errores', 'ip_address', 'accion', 'parametros', 'objetivos', 'procesados', 'tamano_lote', 'estado', 'bloqueada_hasta')
     ordering = ('-fecha_inicio',)
     date_hierarchy = 'fecha_inicio'
     
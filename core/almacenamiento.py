@@ -0,0 +1,105 @@
+"""
+Almacenamiento de archivos direccionado por contenido.
+
+El archivo se copia por bloques a un temporal mientras se calcula su
+SHA-256 (la memoria usada no depende del tamaño) y luego se mueve a
+``<prefijo>/<aa>/<bb>/<sha256><ext>``. Si ese blob ya existe el temporal se
+descarta: subir el mismo archivo N veces ocupa disco una sola vez.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class ContenidoGuardado:
+    nombre: str
+    sha256: str
+    tamano: int
+    duplicado: bool
+
+
+def hash_streaming(archivo, tamano_bloque=TAMANO_BLOQUE):
+    """SHA-256 y tamaño de un archivo leyéndolo por bloques"""
+    digest = hashlib.sha256()
+    tamano = 0
+    if hasattr(archivo, 'seek'):
+        archivo.seek(0)
+    for bloque in _bloques(archivo, tamano_bloque):
+        digest.update(bloque)
+        tamano += len(bloque)
+    return digest.hexdigest(), tamano
+
+
+def _bloques(archivo, tamano_bloque):
+    if hasattr(archivo, 'chunks'):
+        yield from archivo.chunks(tamano_bloque)
+        return
+    while True:
+        bloque = archivo.read(tamano_bloque)
+        if not bloque:
+            break
+        yield bloque
+
+
+def nombre_blob(sha256, nombre_original, prefijo):
+    extension = os.path.splitext(nombre_original or '')[1].lower()[:10]
+    return f"{prefijo}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def guardar_contenido(archivo, nombre_original, prefijo='adjuntos', storage=None):
+    """Guarda ``archivo`` por su hash y devuelve el nombre, hash y tamaño"""
+    storage = storage or default_storage
+    try:
+        raiz = storage.path('')
+    except NotImplementedError:
+        return _guardar_en_storage_remoto(archivo, nombre_original, prefijo, storage)
+
+    directorio_tmp = os.path.join(raiz, prefijo, 'tmp')
+    os.makedirs(directorio_tmp, exist_ok=True)
+    digest = hashlib.sha256()
+    tamano = 0
+    descriptor, ruta_tmp = tempfile.mkstemp(dir=directorio_tmp)
+    try:
+        with os.fdopen(descriptor, 'wb') as destino:
+            if hasattr(archivo, 'seek'):
+                archivo.seek(0)
+            for bloque in _bloques(archivo, TAMANO_BLOQUE):
+                digest.update(bloque)
+                tamano += len(bloque)
+                destino.write(bloque)
+
+        sha256 = digest.hexdigest()
+        nombre = nombre_blob(sha256, nombre_original, prefijo)
+        ruta_final = storage.path(nombre)
+        if os.path.exists(ruta_final):
+            return ContenidoGuardado(nombre, sha256, tamano, duplicado=True)
+
+        os.makedirs(os.path.dirname(ruta_final), exist_ok=True)
+        os.chmod(ruta_tmp, 0o644)
+        # Mismo filesystem: el rename es atómico y dos subidas iguales no se pisan
+        os.replace(ruta_tmp, ruta_final)
+        return ContenidoGuardado(nombre, sha256, tamano, duplicado=False)
+    finally:
+        if os.path.exists(ruta_tmp):
+            os.unlink(ruta_tmp)
+
+
+def _guardar_en_storage_remoto(archivo, nombre_original, prefijo, storage):
+    """Storages sin ruta local: se hashea primero y se sube solo si falta el blob"""
+    sha256, tamano = hash_streaming(archivo)
+    nombre = nombre_blob(sha256, nombre_original, prefijo)
+    if storage.exists(nombre):
+        return ContenidoGuardado(nombre, sha256, tamano, duplicado=True)
+    archivo.seek(0)
+    storage.save(nombre, File(archivo))
+    return ContenidoGuardado(nombre, sha256, tamano, duplicado=False)
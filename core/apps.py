@@ -10,3 +10,6 @@ class CoreConfig(AppConfig):
         import core.cache_utils  # noqa: F401, pylint: disable=import-outside-toplevel,unused-import
         import core.signals_auditoria  # noqa: F401, pylint: disable=import-outside-toplevel,unused-import
         import core.signals_auditoria_historial  # noqa: F401, pylint: disable=import-outside-toplevel,unused-import
+        import core.signals_permisos  # noqa: F401, pylint: disable=import-outside-toplevel,unused-import
+        import core.signals_catalogos  # noqa: F401, pylint: disable=import-outside-toplevel,unused-import
+        import core.signals_anomalias  # noqa: F401, pylint: disable=import-outside-toplevel,unused-import
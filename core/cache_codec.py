@@ -0,0 +1,163 @@
+"""
+Serialización y compresión de valores de cache (django-redis).
+
+- ``SerializadorCache``: datos JSON puros (dict con claves str, list, str,
+  números, bool, None) van con orjson; el resto con pickle. El primer byte
+  distingue el formato, así que los valores pickle ya guardados se siguen
+  leyendo.
+- ``CompresorAdaptativo``: solo comprime por encima de ``UMBRAL_COMPRESION``
+  bytes, con lz4 o zstd si están instalados y zlib si no. Los valores
+  guardados con ``ZlibCompressor`` se siguen leyendo.
+- ``compactar`` / ``expandir``: un queryset de modelos se guarda como tuplas
+  de valores y se reconstruye con ``Model.from_db`` en vez de picklear cada
+  instancia.
+
+Los enteros no pasan por acá: django-redis los guarda tal cual.
+"""
+import math
+import pickle
+import zlib
+
+from django_redis.compressors.base import BaseCompressor
+from django_redis.serializers.base import BaseSerializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+UMBRAL_COMPRESION = 1024  # bytes
+NIVEL_ZLIB = 6
+PROFUNDIDAD_MAXIMA = 32
+
+MARCA_JSON = b'\x01'
+MARCA_COMPRIMIDO = b'\x00'  # seguido del algoritmo
+ALGORITMO_LZ4 = b'4'
+ALGORITMO_ZSTD = b'z'
+ALGORITMO_ZLIB = b'Z'
+
+
+def es_json_puro(valor, profundidad=0):
+    """True si el valor vuelve idéntico de un JSON (sin tuplas, fechas, Decimal...)"""
+    tipo = type(valor)
+    # type() y no isinstance: una subclase (SafeString, IntEnum) volvería como la base
+    if valor is None or tipo is str or tipo is bool:
+        return True
+    if tipo is float:
+        return math.isfinite(valor)
+    if tipo is int:
+        return -2 ** 63 <= valor < 2 ** 64
+    if profundidad >= PROFUNDIDAD_MAXIMA:
+        return False
+    if tipo is list:
+        return all(es_json_puro(v, profundidad + 1) for v in valor)
+    if tipo is dict:
+        return all(type(k) is str and es_json_puro(v, profundidad + 1) for k, v in valor.items())
+    return False
+
+
+class SerializadorCache(BaseSerializer):
+    """orjson para datos planos, pickle para el resto"""
+
+    def __init__(self, options):
+        super().__init__(options=options)
+        self.protocolo = options.get('PICKLE_VERSION', pickle.HIGHEST_PROTOCOL)
+
+    def dumps(self, value):
+        if orjson is not None and es_json_puro(value):
+            try:
+                return MARCA_JSON + orjson.dumps(value)
+            except orjson.JSONEncodeError:
+                pass
+        return pickle.dumps(value, self.protocolo)
+
+    def loads(self, value):
+        if value[:1] == MARCA_JSON:
+            return orjson.loads(value[1:])
+        return pickle.loads(value)
+
+
+class CompresorAdaptativo(BaseCompressor):
+    """Comprime solo valores grandes, con el compresor más rápido disponible"""
+
+    def __init__(self, options):
+        super().__init__(options=options)
+        self.umbral = options.get('COMPRESION_UMBRAL', UMBRAL_COMPRESION)
+        self._zstd_c = zstandard.ZstdCompressor(level=3) if zstandard else None
+        self._zstd_d = zstandard.ZstdDecompressor() if zstandard else None
+
+    def compress(self, value):
+        if len(value) < self.umbral:
+            return value
+        if lz4 is not None:
+            return MARCA_COMPRIMIDO + ALGORITMO_LZ4 + lz4.compress(value)
+        if self._zstd_c is not None:
+            return MARCA_COMPRIMIDO + ALGORITMO_ZSTD + self._zstd_c.compress(value)
+        return MARCA_COMPRIMIDO + ALGORITMO_ZLIB + zlib.compress(value, NIVEL_ZLIB)
+
+    def decompress(self, value):
+        if value[:1] == MARCA_COMPRIMIDO:
+            algoritmo, datos = value[1:2], value[2:]
+            if algoritmo == ALGORITMO_LZ4:
+                return lz4.decompress(datos)
+            if algoritmo == ALGORITMO_ZSTD:
+                return self._zstd_d.decompress(datos)
+            return zlib.decompress(datos)
+        if value[:1] == b'x':
+            # Valor anterior de ZlibCompressor (cabecera zlib 0x78)
+            try:
+                return zlib.decompress(value)
+            except zlib.error:
+                pass
+        return value
+
+
+# --- Querysets compactos ---
+
+class FilasModelo(tuple):
+    """(label del modelo, alias de base, attnames, filas) para cachear sin instancias"""
+    __slots__ = ()
+
+
+def _es_compactable(queryset):
+    from django.db.models.query import ModelIterable, QuerySet
+    if not isinstance(queryset, QuerySet) or queryset._iterable_class is not ModelIterable:
+        return False
+    consulta = queryset.query
+    return (
+        not consulta.select_related
+        and not consulta.annotations
+        and not consulta.extra
+        and not consulta.deferred_loading[0]
+        and not queryset._prefetch_related_lookups
+    )
+
+
+def compactar(valor):
+    """Un queryset de modelos simple pasa a ``FilasModelo``; el resto queda igual"""
+    from django.db.models.query import QuerySet
+    if not _es_compactable(valor):
+        return list(valor) if isinstance(valor, QuerySet) else valor
+    campos = [campo.attname for campo in valor.model._meta.concrete_fields]
+    filas = list(valor.values_list(*campos))
+    return FilasModelo((valor.model._meta.label, valor.db, tuple(campos), filas))
+
+
+def expandir(valor):
+    """Inversa de ``compactar``: devuelve la lista de instancias"""
+    if not isinstance(valor, FilasModelo):
+        return valor
+    from django.apps import apps
+    label, alias, campos, filas = valor
+    modelo = apps.get_model(label)
+    return [modelo.from_db(alias, campos, fila) for fila in filas]
@@ -1,26 +1,20 @@
-from django.core.cache import cache
 from django.views.decorators.cache import cache_page
 from functools import wraps
-import hashlib
+
+from .cache_codec import compactar, expandir
+from .cache_protegido import clave_estable, obtener_o_calcular
 
 def cache_view(timeout=300):
     """Decorator para cachear vistas con timeout personalizado"""
     return cache_page(timeout)
 
 def cache_queryset(timeout=300, key_prefix='qs'):
-    """Decorator para cachear querysets"""
+    """Decorator para cachear querysets (un solo cálculo por clave al expirar)"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Generar clave única basada en función y parámetros
-            cache_key = f"{key_prefix}:{func.__name__}:{hash(str(args) + str(kwargs))}"
-            
-            result = cache.get(cache_key)
-            if result is None:
-                result = func(*args, **kwargs)
-                cache.set(cache_key, result, timeout)
-            
-            return result
+            cache_key = f"{key_prefix}:{func.__name__}:{clave_estable(*args, **kwargs)}"
+            return expandir(obtener_o_calcular(cache_key, lambda: compactar(func(*args, **kwargs)), timeout))
         return wrapper
     return decorator
 
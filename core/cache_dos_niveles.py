@@ -0,0 +1,291 @@
+"""
+Backend de cache en dos niveles: LRU en memoria del proceso delante de Redis.
+
+Solo las claves que se declaran en ``LOCAL['CLAVES']`` (prefijo -> TTL local
+en segundos) pasan por el nivel local; el resto va directo a django-redis.
+Una lectura que acierta en el nivel local no toca la red ni descomprime.
+
+Cada escritura de una clave local (set, add, delete, incr...) la descarta del
+proceso y publica la clave en un canal de Redis; un hilo por proceso escucha
+ese canal y la descarta en los demás. Las claves de ``LOCAL['SIN_AVISO']``
+no publican (contadores que se escriben en cada request): en los otros
+procesos quedan desactualizadas a lo sumo su TTL local. Si la suscripción se
+corta se vacía el nivel local, porque pudo perderse algún aviso.
+
+Los valores locales se devuelven sin copiar: conviene usar el nivel local
+para valores chicos que no se modifican (contadores, versiones, tuplas).
+
+Configuración::
+
+    CACHES = {"default": {
+        "BACKEND": "core.cache_dos_niveles.CacheDosNiveles",
+        ...
+        "LOCAL": {
+            "CLAVES": {"contar_": 5, "permisos:version": 5},
+            "SIN_AVISO": ["active_requests"],
+            "MAX_ENTRADAS": 2000,
+        },
+    }}
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRADAS = 2000
+REINTENTO_SUSCRIPCION = 5  # segundos
+TODAS = '*'
+
+_AUSENTE = object()
+
+
+class CacheLocal:
+    """LRU acotado con vencimiento por entrada"""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            return _AUSENTE
+        vence, valor = entrada
+        if vence < time.monotonic():
+            self._datos.pop(clave, None)
+            return _AUSENTE
+        try:
+            self._datos.move_to_end(clave)
+        except KeyError:
+            pass  # descartada por otro hilo
+        return valor
+
+    def guardar(self, clave, valor, ttl):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def descartar(self, clave):
+        self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class CacheDosNiveles(RedisCache):
+    """``RedisCache`` con nivel local opcional por clave"""
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        local = params.get('LOCAL', {})
+        # Prefijo más largo primero
+        self._prefijos = sorted(local.get('CLAVES', {}).items(), key=lambda item: -len(item[0]))
+        self._sin_aviso = tuple(local.get('SIN_AVISO', ()))
+        self._local = CacheLocal(local.get('MAX_ENTRADAS', MAX_ENTRADAS))
+        self._canal = local.get('CANAL') or f"{self.key_prefix or 'cache'}:cache:invalidar"
+        self._pid = None
+        self._contadores = {'local_aciertos': 0, 'local_fallos': 0, 'redis_aciertos': 0, 'redis_fallos': 0}
+
+    # --- Configuración por clave ---
+
+    def _ttl_local(self, key):
+        for prefijo, ttl in self._prefijos:
+            if key.startswith(prefijo):
+                return ttl
+        return None
+
+    def _contar(self, nombre, cantidad=1):
+        self._contadores[nombre] += cantidad
+
+    # --- Lecturas ---
+
+    def get(self, key, default=None, version=None, client=None):
+        ttl = self._ttl_local(key)
+        if ttl is None or client is not None:
+            valor = super().get(key, _AUSENTE, version=version, client=client)
+            self._contar('redis_fallos' if valor is _AUSENTE else 'redis_aciertos')
+            return default if valor is _AUSENTE else valor
+
+        self._asegurar_suscripcion()
+        clave = self.make_key(key, version=version)
+        valor = self._local.obtener(clave)
+        if valor is not _AUSENTE:
+            self._contar('local_aciertos')
+            return valor
+        self._contar('local_fallos')
+        valor = super().get(key, _AUSENTE, version=version)
+        if valor is _AUSENTE:
+            self._contar('redis_fallos')
+            return default
+        self._contar('redis_aciertos')
+        self._local.guardar(clave, valor, ttl)
+        return valor
+
+    def get_many(self, keys, version=None, client=None):
+        resultado = {}
+        remotas = []
+        for key in keys:
+            if client is None and self._ttl_local(key) is not None:
+                self._asegurar_suscripcion()
+                valor = self._local.obtener(self.make_key(key, version=version))
+                if valor is not _AUSENTE:
+                    self._contar('local_aciertos')
+                    resultado[key] = valor
+                    continue
+                self._contar('local_fallos')
+            remotas.append(key)
+        if remotas:
+            encontrados = super().get_many(remotas, version=version, client=client)
+            self._contar('redis_aciertos', len(encontrados))
+            self._contar('redis_fallos', len(remotas) - len(encontrados))
+            for key, valor in encontrados.items():
+                ttl = self._ttl_local(key) if client is None else None
+                if ttl is not None:
+                    self._local.guardar(self.make_key(key, version=version), valor, ttl)
+            resultado.update(encontrados)
+        return resultado
+
+    # --- Escrituras ---
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        resultado = super().set(key, value, timeout=timeout, version=version, client=client, nx=nx, xx=xx)
+        self._invalidar([key], version)
+        return resultado
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        resultado = super().add(key, value, timeout=timeout, version=version, client=client)
+        if resultado:
+            self._invalidar([key], version)
+        return resultado
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        resultado = super().set_many(data, timeout=timeout, version=version, client=client)
+        self._invalidar(list(data), version)
+        return resultado
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        resultado = super().delete(key, version=version, prefix=prefix, client=client)
+        self._invalidar([key], version)
+        return resultado
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        resultado = super().delete_many(keys, version=version, client=client)
+        self._invalidar(keys, version)
+        return resultado
+
+    def incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        resultado = super().incr(key, delta=delta, version=version, client=client, ignore_key_check=ignore_key_check)
+        self._invalidar([key], version)
+        return resultado
+
+    def decr(self, key, delta=1, version=None, client=None):
+        resultado = super().decr(key, delta=delta, version=version, client=client)
+        self._invalidar([key], version)
+        return resultado
+
+    def delete_pattern(self, *args, **kwargs):
+        resultado = super().delete_pattern(*args, **kwargs)
+        self._invalidar_todo()
+        return resultado
+
+    def clear(self):
+        resultado = super().clear()
+        self._invalidar_todo()
+        return resultado
+
+    # --- Invalidación entre procesos ---
+
+    def _invalidar(self, keys, version):
+        avisar = []
+        for key in keys:
+            if self._ttl_local(key) is None:
+                continue
+            clave = self.make_key(key, version=version)
+            self._local.descartar(clave)
+            if not (self._sin_aviso and key.startswith(self._sin_aviso)):
+                avisar.append(clave)
+        self._publicar(*avisar)
+
+    def _invalidar_todo(self):
+        if self._prefijos:
+            self._local.limpiar()
+            self._publicar(TODAS)
+
+    def _publicar(self, *claves):
+        if not claves:
+            return
+        try:
+            conexion = self.client.get_client(write=True)
+            for clave in claves:
+                conexion.publish(self._canal, clave)
+        except Exception as e:
+            logger.warning(f"No se pudo publicar la invalidación de cache: {e}")
+
+    def _asegurar_suscripcion(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        # Tras un fork (preload_app) el hilo del padre no existe en el hijo
+        self._pid = pid
+        self._local.limpiar()
+        threading.Thread(target=self._escuchar, name='cache-invalidaciones', daemon=True).start()
+
+    def _escuchar(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.get_client(write=False).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._canal)
+                # Lo cacheado antes de suscribirse pudo perder avisos
+                self._local.limpiar()
+                while True:
+                    mensaje = pubsub.get_message(timeout=1.0)
+                    if not mensaje:
+                        continue
+                    clave = mensaje['data']
+                    clave = clave.decode() if isinstance(clave, bytes) else str(clave)
+                    if clave == TODAS:
+                        self._local.limpiar()
+                    else:
+                        self._local.descartar(clave)
+            except Exception as e:
+                logger.warning(f"Suscripción de invalidaciones de cache interrumpida: {e}")
+                self._local.limpiar()
+                time.sleep(REINTENTO_SUSCRIPCION)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    # --- Métricas ---
+
+    def estadisticas(self):
+        """Aciertos por nivel de este proceso"""
+        c = dict(self._contadores)
+
+        def proporcion(aciertos, fallos):
+            total = aciertos + fallos
+            return round(aciertos / total, 4) if total else None
+
+        return {
+            **c,
+            'local_proporcion': proporcion(c['local_aciertos'], c['local_fallos']),
+            'redis_proporcion': proporcion(c['redis_aciertos'], c['redis_fallos']),
+            'local_entradas': len(self._local),
+        }
@@ -0,0 +1,137 @@
+"""
+Cache con protección contra estampidas.
+
+Con get-then-set, cuando una clave caliente expira todos los workers
+recalculan el mismo COUNT a la vez. ``obtener_o_calcular`` evita eso con:
+
+- Un único cálculo por clave (``cache.add`` como lock): el resto espera el
+  valor o, si hay uno vencido, lo sigue sirviendo mientras tanto
+  (stale-while-revalidate).
+- Refresco anticipado probabilístico (XFetch): antes del vencimiento algún
+  request recalcula con probabilidad creciente, proporcional a lo que tardó
+  el último cálculo, así la clave casi nunca llega a vencer.
+
+El valor se guarda como ``(valor, vence, duracion)``. ``vence`` es el
+vencimiento lógico; la clave vive ``gracia`` segundos más para poder servir
+el valor vencido. Borrar la clave (invalidación) sigue funcionando igual.
+"""
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+BETA = 1.0
+ESPERA_MAXIMA = 5  # segundos que un request espera el cálculo de otro
+INTERVALO_ESPERA = 0.05
+TIMEOUT_LOCK = 30
+
+
+def _serializable(valor):
+    if hasattr(valor, '_meta') and hasattr(valor, 'pk'):
+        return f"{valor._meta.label_lower}:{valor.pk}"
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    if isinstance(valor, (set, frozenset)):
+        return sorted(map(str, valor))
+    return str(valor)
+
+
+def clave_estable(*partes, **kwargs):
+    """Hash determinístico de los argumentos (``hash()`` cambia entre procesos)"""
+    texto = json.dumps([partes, kwargs], sort_keys=True, default=_serializable, ensure_ascii=False)
+    return hashlib.sha1(texto.encode()).hexdigest()[:24]
+
+
+def _gracia(timeout, gracia):
+    return gracia if gracia is not None else max(60, timeout // 2)
+
+
+def guardar(clave, valor, timeout, gracia=None, duracion=0.0):
+    """Guarda un valor ya calculado (por ejemplo desde una tarea programada)"""
+    cache.set(clave, (valor, time.time() + timeout, duracion), timeout + _gracia(timeout, gracia))
+
+
+def _leer(clave):
+    sobre = cache.get(clave)
+    if isinstance(sobre, tuple) and len(sobre) == 3:
+        return sobre
+    return None  # ausente o con formato anterior
+
+
+def _tomar_lock(clave):
+    token = uuid.uuid4().hex
+    try:
+        if cache.add(f"{clave}:lock", token, TIMEOUT_LOCK):
+            return token
+    except Exception as e:
+        logger.warning(f"No se pudo tomar el lock de cache {clave}: {e}")
+        return token  # sin cache compartida cada proceso calcula
+    return None
+
+
+def _soltar_lock(clave, token):
+    try:
+        if cache.get(f"{clave}:lock") == token:
+            cache.delete(f"{clave}:lock")
+    except Exception:
+        pass
+
+
+def _calcular(clave, calcular, timeout, gracia, token):
+    inicio = time.monotonic()
+    try:
+        valor = calcular()
+        guardar(clave, valor, timeout, gracia, time.monotonic() - inicio)
+        return valor
+    finally:
+        _soltar_lock(clave, token)
+
+
+def obtener_o_calcular(clave, calcular, timeout, gracia=None, beta=BETA):
+    """Devuelve el valor cacheado de ``clave``; lo calcula un solo proceso a la vez"""
+    sobre = _leer(clave)
+    if sobre is not None:
+        valor, vence, duracion = sobre
+        # XFetch: -log(u) es exponencial, recalcular antes cuanto más caro es
+        if time.time() - duracion * beta * math.log(1.0 - random.random()) < vence:
+            return valor
+        token = _tomar_lock(clave)
+        if token is None:
+            return valor  # otro lo está recalculando: se sirve el anterior
+        try:
+            return _calcular(clave, calcular, timeout, gracia, token)
+        except Exception as e:
+            logger.warning(f"Falló el recálculo de {clave}, se sirve el valor anterior: {e}")
+            return valor
+
+    token = _tomar_lock(clave)
+    if token is not None:
+        return _calcular(clave, calcular, timeout, gracia, token)
+
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while time.monotonic() < limite:
+        time.sleep(INTERVALO_ESPERA)
+        sobre = _leer(clave)
+        if sobre is not None:
+            return sobre[0]
+    logger.warning(f"Espera agotada para {clave}, se calcula sin lock")
+    return calcular()
+
+
+def cache_protegido(timeout=300, prefijo='cp'):
+    """Decorator: cachea el resultado por argumentos con ``obtener_o_calcular``"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            clave = f"{prefijo}:{func.__module__}.{func.__qualname__}:{clave_estable(*args, **kwargs)}"
+            return obtener_o_calcular(clave, lambda: func(*args, **kwargs), timeout)
+        return wrapper
+    return decorator
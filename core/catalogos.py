@@ -0,0 +1,138 @@
+"""
+Catálogos de referencia en memoria del proceso.
+
+Provincias, municipios, localidades, sexos e instituciones activas cambian
+muy poco y se consultan en cada formulario y en los selects en cascada. Se
+cargan una vez por proceso en estructuras inmutables (tuplas e índices por
+id del padre) y se recargan cuando cambia la versión compartida en cache,
+que incrementan las señales de ``core.signals_catalogos``. Entre chequeos
+de versión las búsquedas no tocan ni la base ni Redis.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CLAVE_VERSION = 'catalogos:version'
+INTERVALO_VERIFICACION = 30  # segundos entre chequeos de versión por proceso
+HTTP_MAX_AGE = 3600  # segundos de cache del navegador para los selects en cascada
+
+Opcion = namedtuple('Opcion', 'id nombre')
+OpcionInstitucion = namedtuple('OpcionInstitucion', 'id nombre tipo etiqueta')
+
+
+@dataclass(frozen=True)
+class Catalogos:
+    version: int
+    provincias: tuple
+    municipios: tuple
+    localidades: tuple
+    sexos: tuple
+    instituciones_activas: tuple  # ordenadas por nombre
+    municipios_por_provincia: MappingProxyType
+    localidades_por_municipio: MappingProxyType
+
+    def municipios_de(self, provincia_id):
+        return self.municipios_por_provincia.get(provincia_id, ())
+
+    def localidades_de(self, municipio_id):
+        return self.localidades_por_municipio.get(municipio_id, ())
+
+
+def _agrupar(filas):
+    """{padre_id: ((id, nombre), ...)} a partir de filas (id, nombre, padre_id)"""
+    grupos = {}
+    for id_, nombre, padre_id in filas:
+        grupos.setdefault(padre_id, []).append(Opcion(id_, nombre))
+    return MappingProxyType({padre: tuple(opciones) for padre, opciones in grupos.items()})
+
+
+def cargar(version):
+    """Lee todos los catálogos de la base"""
+    from core.models import Institucion, Localidad, Municipio, Provincia, Sexo, TipoInstitucion
+
+    municipios = list(Municipio.objects.order_by('id').values_list('id', 'nombre', 'provincia_id'))
+    localidades = list(Localidad.objects.order_by('id').values_list('id', 'nombre', 'municipio_id'))
+    tipos = dict(TipoInstitucion.choices)
+    instituciones = tuple(
+        OpcionInstitucion(id_, nombre, tipo, f"{nombre} [{tipos.get(tipo, tipo)}]")
+        for id_, nombre, tipo in Institucion.objects.filter(activo=True).order_by('nombre').values_list(
+            'id', 'nombre', 'tipo'
+        )
+    )
+    return Catalogos(
+        version=version,
+        provincias=tuple(Opcion(*fila) for fila in Provincia.objects.order_by('id').values_list('id', 'nombre')),
+        municipios=tuple(Opcion(id_, nombre) for id_, nombre, _ in municipios),
+        localidades=tuple(Opcion(id_, nombre) for id_, nombre, _ in localidades),
+        sexos=tuple(Opcion(*fila) for fila in Sexo.objects.order_by('id').values_list('id', 'sexo')),
+        instituciones_activas=instituciones,
+        municipios_por_provincia=_agrupar(municipios),
+        localidades_por_municipio=_agrupar(localidades),
+    )
+
+
+_catalogos = None
+_verificado = 0.0
+_lock = threading.Lock()
+
+
+def _version_actual():
+    return cache.get(CLAVE_VERSION, 0)
+
+
+def obtener_catalogos():
+    """Catálogos del proceso, recargados si cambió la versión compartida"""
+    global _catalogos, _verificado
+    ahora = time.monotonic()
+    if _catalogos is not None and ahora - _verificado < INTERVALO_VERIFICACION:
+        return _catalogos
+
+    version = _version_actual()
+    with _lock:
+        if _catalogos is None or version != _catalogos.version:
+            _catalogos = cargar(version)
+            logger.info(
+                f"Catálogos cargados (v{version}): {len(_catalogos.provincias)} provincias, "
+                f"{len(_catalogos.municipios)} municipios, {len(_catalogos.localidades)} localidades"
+            )
+        _verificado = ahora
+    return _catalogos
+
+
+def invalidar_catalogos():
+    """Marca los catálogos como modificados para que todos los procesos los recarguen"""
+    global _verificado
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, 1, None)
+    _verificado = 0.0
+
+
+def etag(*partes):
+    """ETag de una respuesta derivada de los catálogos"""
+    return '"cat-' + '-'.join(str(p) for p in (obtener_catalogos().version, *partes)) + '"'
+
+
+def id_entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def asignar_opciones(campo, opciones, etiqueta='nombre'):
+    """
+    Reemplaza las opciones de un ModelChoiceField por las del catálogo, así el
+    formulario no consulta la base al renderizarse (la validación sigue usando
+    el queryset del campo).
+    """
+    vacio = [('', campo.empty_label)] if campo.empty_label is not None else []
+    campo.choices = vacio + [(opcion.id, getattr(opcion, etiqueta)) for opcion in opciones]
@@ -1,11 +1,11 @@
-from .models import DispositivoRed
+from .catalogos import obtener_catalogos
 
 def dispositivos_context(request):
     """Agrega dispositivos al contexto global"""
     if request.user.is_authenticated and request.user.is_superuser:
         return {
-            'todos_dispositivos': DispositivoRed.objects.filter(activo=True).order_by('nombre')
+            'todos_dispositivos': obtener_catalogos().instituciones_activas
         }
     return {
         'todos_dispositivos': []
-    }
\ No newline at end of file
+    }
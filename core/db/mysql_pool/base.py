@@ -0,0 +1,71 @@
+"""
+Backend MySQL con pool acotado de conexiones por worker.
+
+Se configura con ``ENGINE: "core.db.mysql_pool"`` y ``CONN_MAX_AGE: 0``:
+cada request (o greenlet) toma una conexión del pool en su primera query y
+la devuelve cuando Django cierra la conexión al terminar el request, así
+que el total de conexiones del worker nunca supera ``POOL["SIZE"]``.
+
+    "POOL": {
+        "SIZE": 10,            # conexiones máximas por proceso
+        "TIMEOUT": 10,         # segundos de espera para obtener una conexión
+        "MAX_AGE": 1800,       # reciclar conexiones con más de N segundos
+        "CHECK_INTERVAL": 30,  # ping si estuvo libre más de N segundos
+        "LEASE_TIMEOUT": 600,  # recuperar préstamos sin cursores nuevos en N segundos (0: nunca)
+    }
+"""
+from django.db.backends.mysql import base as mysql_base
+
+from core.db.pool import obtener_pool
+
+
+class DatabaseWrapper(mysql_base.DatabaseWrapper):
+    """DatabaseWrapper de MySQL que toma y devuelve conexiones de un pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._conexion_reutilizada = False
+
+    @property
+    def pool(self):
+        return obtener_pool(self.alias, self.settings_dict.get('POOL', {}))
+
+    def get_new_connection(self, conn_params):
+        nuevas = []
+
+        def crear():
+            conexion = super(DatabaseWrapper, self).get_new_connection(conn_params)
+            nuevas.append(conexion)
+            return conexion
+
+        conexion = self.pool.obtener(crear)
+        self._conexion_reutilizada = not nuevas
+        return conexion
+
+    def create_cursor(self, name=None):
+        # Cada cursor renueva el préstamo: solo se recuperan los abandonados
+        self.pool.renovar(self.connection)
+        return super().create_cursor(name)
+
+    def init_connection_state(self):
+        # El estado de sesión (sql_mode, aislamiento, SQL_AUTO_IS_NULL) ya se
+        # aplicó cuando la conexión se creó; solo se restaura el autocommit.
+        if self._conexion_reutilizada:
+            return
+        super().init_connection_state()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        conexion = self.connection
+        descartar = False
+        try:
+            # Una conexión nunca vuelve al pool con una transacción abierta
+            if self.in_atomic_block or not self.get_autocommit():
+                conexion.rollback()
+                conexion.autocommit(True)
+            if self.errors_occurred and not self.is_usable():
+                descartar = True
+        except Exception:
+            descartar = True
+        self.pool.devolver(conexion, descartar=descartar)
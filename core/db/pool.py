@@ -0,0 +1,234 @@
+"""
+Pool acotado de conexiones por proceso para el backend ``core.db.mysql_pool``.
+
+Usa las primitivas de ``threading``: bajo gunicorn+gevent están
+monkey-patcheadas, así que un greenlet que espera una conexión cede el
+control en lugar de bloquear el worker.
+
+Cada conexión entregada queda registrada como préstamo; el backend lo renueva
+en cada cursor. Un préstamo sin actividad durante ``max_prestamo`` (greenlet
+muerto, camino de error que no cerró la conexión) se recupera: la conexión se
+cierra y su lugar en el semáforo se libera, así el pool no se achica.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+
+class PoolAgotado(OperationalError):
+    """No se obtuvo una conexión del pool dentro del timeout"""
+
+
+class PoolConexiones:
+    """Pool LIFO con tamaño máximo, timeout de checkout y verificación de salud"""
+
+    def __init__(self, alias, tamano=10, timeout=10.0, max_edad=1800, intervalo_verificacion=30, max_prestamo=600):
+        self.alias = alias
+        self.tamano = tamano
+        self.timeout = timeout
+        self.max_edad = max_edad
+        self.intervalo_verificacion = intervalo_verificacion
+        self.max_prestamo = max_prestamo
+
+        self._semaforo = threading.BoundedSemaphore(tamano)
+        self._lock = threading.Lock()
+        self._libres = deque()  # (conexion, creada, ultimo_uso)
+        self._creadas = {}  # id(conexion) -> creada
+        self._prestadas = {}  # id(conexion) -> (conexion, ultima_actividad)
+        self.metricas = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'recuperadas': 0,
+            'creadas': 0,
+            'descartadas': 0,
+            'en_uso': 0,
+            'max_en_uso': 0,
+            'espera_total_ms': 0.0,
+            'espera_max_ms': 0.0,
+        }
+
+    # --- Checkout / devolución ---
+
+    def obtener(self, crear):
+        """Entrega una conexión libre (o nueva con ``crear``) respetando el tamaño"""
+        inicio = time.monotonic()
+        if not self._semaforo.acquire(blocking=False):
+            # Sin lugar libre: antes de esperar se recuperan los préstamos abandonados
+            self.recuperar_vencidas()
+            if not self._semaforo.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.metricas['timeouts'] += 1
+                logger.warning(
+                    f"Pool {self.alias} agotado: {self.tamano} conexiones en uso tras {self.timeout}s"
+                )
+                raise PoolAgotado(f"Pool de conexiones '{self.alias}' agotado")
+
+        try:
+            conexion = self._tomar_libre()
+            if conexion is None:
+                conexion = crear()
+                with self._lock:
+                    self._creadas[id(conexion)] = time.monotonic()
+                    self.metricas['creadas'] += 1
+        except Exception:
+            self._semaforo.release()
+            raise
+
+        espera_ms = (time.monotonic() - inicio) * 1000
+        with self._lock:
+            self._prestadas[id(conexion)] = (conexion, time.monotonic())
+            self.metricas['checkouts'] += 1
+            self.metricas['en_uso'] += 1
+            self.metricas['max_en_uso'] = max(self.metricas['max_en_uso'], self.metricas['en_uso'])
+            self.metricas['espera_total_ms'] += espera_ms
+            self.metricas['espera_max_ms'] = max(self.metricas['espera_max_ms'], espera_ms)
+        return conexion
+
+    def _tomar_libre(self):
+        ahora = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._libres:
+                    return None
+                conexion, creada, ultimo_uso = self._libres.pop()
+
+            if self.max_edad and ahora - creada > self.max_edad:
+                self._cerrar(conexion)
+                continue
+            if ahora - ultimo_uso > self.intervalo_verificacion and not self._sana(conexion):
+                self._cerrar(conexion)
+                continue
+            return conexion
+
+    def devolver(self, conexion, descartar=False):
+        """Devuelve la conexión al pool (o la cierra si quedó inutilizable)"""
+        with self._lock:
+            prestada = self._prestadas.pop(id(conexion), None) is not None
+        if not prestada:
+            # Préstamo ya recuperado por vencido: su lugar en el semáforo ya se liberó
+            self._cerrar(conexion)
+            return
+        try:
+            with self._lock:
+                self.metricas['en_uso'] -= 1
+                creada = self._creadas.get(id(conexion))
+            if descartar or creada is None:
+                self._cerrar(conexion)
+            else:
+                with self._lock:
+                    self._libres.append((conexion, creada, time.monotonic()))
+        finally:
+            self._semaforo.release()
+
+    def renovar(self, conexion):
+        """Marca actividad en el préstamo de la conexión"""
+        with self._lock:
+            if id(conexion) in self._prestadas:
+                self._prestadas[id(conexion)] = (conexion, time.monotonic())
+
+    def recuperar_vencidas(self):
+        """Cierra los préstamos sin actividad hace más de ``max_prestamo`` y libera su lugar"""
+        if not self.max_prestamo:
+            return 0
+        limite = time.monotonic() - self.max_prestamo
+        with self._lock:
+            vencidas = [clave for clave, (_, actividad) in self._prestadas.items() if actividad < limite]
+            conexiones = [self._prestadas.pop(clave)[0] for clave in vencidas]
+            self.metricas['en_uso'] -= len(conexiones)
+            self.metricas['recuperadas'] += len(conexiones)
+        for conexion in conexiones:
+            self._cerrar(conexion)
+            self._semaforo.release()
+        if conexiones:
+            logger.warning(
+                f"Pool {self.alias}: {len(conexiones)} conexiones recuperadas sin actividad hace más de {self.max_prestamo}s"
+            )
+        return len(conexiones)
+
+    # --- Salud ---
+
+    def _sana(self, conexion):
+        try:
+            conexion.ping()
+            return True
+        except Exception:
+            return False
+
+    def _cerrar(self, conexion):
+        with self._lock:
+            self._creadas.pop(id(conexion), None)
+            self.metricas['descartadas'] += 1
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+    def verificar(self):
+        """Descarta conexiones libres caídas o vencidas y recupera préstamos abandonados (para tareas de mantenimiento)"""
+        self.recuperar_vencidas()
+        with self._lock:
+            libres, self._libres = list(self._libres), deque()
+        ahora = time.monotonic()
+        for conexion, creada, ultimo_uso in libres:
+            if (self.max_edad and ahora - creada > self.max_edad) or not self._sana(conexion):
+                self._cerrar(conexion)
+            else:
+                with self._lock:
+                    self._libres.append((conexion, creada, ultimo_uso))
+
+    def estadisticas(self):
+        with self._lock:
+            datos = dict(self.metricas)
+            datos['libres'] = len(self._libres)
+            datos['abiertas'] = len(self._creadas)
+            datos['prestadas'] = len(self._prestadas)
+        datos.update({
+            'alias': self.alias,
+            'tamano': self.tamano,
+            'pid': os.getpid(),
+            'espera_promedio_ms': round(datos['espera_total_ms'] / datos['checkouts'], 2) if datos['checkouts'] else 0,
+        })
+        return datos
+
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+def obtener_pool(alias, opciones):
+    """Pool del proceso actual para el alias (se recrea tras un fork)"""
+    global _pools_pid
+    pid = os.getpid()
+    pool = _pools.get(alias) if _pools_pid == pid else None
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        if _pools_pid != pid:
+            # Las conexiones heredadas del master no se comparten con el hijo
+            _pools.clear()
+            _pools_pid = pid
+        if alias not in _pools:
+            _pools[alias] = PoolConexiones(
+                alias,
+                tamano=opciones.get('SIZE', 10),
+                timeout=opciones.get('TIMEOUT', 10.0),
+                max_edad=opciones.get('MAX_AGE', 1800),
+                intervalo_verificacion=opciones.get('CHECK_INTERVAL', 30),
+                max_prestamo=opciones.get('LEASE_TIMEOUT', 600),
+            )
+        return _pools[alias]
+
+
+def estadisticas_pools():
+    """Métricas de todos los pools del proceso actual"""
+    if _pools_pid != os.getpid():
+        return {}
+    return {alias: pool.estadisticas() for alias, pool in list(_pools.items())}
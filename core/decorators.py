@@ -2,6 +2,8 @@ from functools import wraps
 
 from django.core.exceptions import PermissionDenied
 
+from core.permisos import tiene_grupo
+
 
 def group_required(group_names):
     """
@@ -10,9 +12,7 @@ def group_required(group_names):
     """
 
     def in_group(user):
-        return user.is_authenticated and (
-            user.groups.filter(name__in=group_names).exists() or user.is_superuser
-        )
+        return tiene_grupo(user, *group_names)
 
     def decorator(view_func):
         @wraps(view_func)
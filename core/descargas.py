@@ -0,0 +1,93 @@
+"""
+Servicio de descargas de archivos.
+
+Django autoriza y audita; la transferencia la hace nginx mediante
+``X-Accel-Redirect`` hacia una location ``internal`` que apunta a
+MEDIA_ROOT, así que un worker no queda ocupado enviando el archivo.
+Los enlaces son firmados, de corta duración y atados al usuario.
+
+La regla de descarga masiva la evalúa ``core.detector_auditoria`` al
+registrarse cada ``LogDescargaArchivo``.
+"""
+import logging
+import mimetypes
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+SALT = 'core.descargas'
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+# --- Enlaces firmados ---
+
+def firmar(recurso, objeto_id, usuario_id):
+    """Token firmado para descargar ``recurso``/``objeto_id`` como ``usuario_id``"""
+    return signing.dumps({'r': recurso, 'o': str(objeto_id), 'u': usuario_id}, salt=SALT, compress=True)
+
+
+def verificar(token, recurso, usuario_id):
+    """Devuelve el id del objeto si el token es válido, vigente y del usuario; si no, None"""
+    try:
+        datos = signing.loads(token, salt=SALT, max_age=_config('DESCARGAS_URL_MAX_AGE', 600))
+    except signing.BadSignature:
+        return None
+    if datos.get('r') != recurso or datos.get('u') != usuario_id:
+        return None
+    return datos.get('o')
+
+
+def registrar_descarga(request, archivo_nombre, archivo_path, modelo_origen='', objeto_id=''):
+    """Audita la descarga (la regla de descarga masiva corre al guardar el log)"""
+    from core.models_auditoria import LogDescargaArchivo
+
+    LogDescargaArchivo.objects.create(
+        usuario=request.user,
+        archivo_nombre=archivo_nombre[:255],
+        archivo_path=archivo_path[:500],
+        modelo_origen=modelo_origen,
+        objeto_id=str(objeto_id),
+        ip_address=_ip_cliente(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+    )
+
+
+def _ip_cliente(request):
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0]
+    return request.META.get('REMOTE_ADDR')
+
+
+# --- Respuesta ---
+
+def respuesta_archivo(request, archivo, nombre_descarga, modelo_origen='', objeto_id='', adjunto=False):
+    """
+    Audita y devuelve la respuesta de descarga de ``archivo`` (FieldFile).
+    Con ``DESCARGAS_X_ACCEL`` la envía nginx; si no, la sirve Django en streaming.
+    """
+    registrar_descarga(request, nombre_descarga, archivo.name, modelo_origen, objeto_id)
+
+    content_type = mimetypes.guess_type(nombre_descarga)[0] or 'application/octet-stream'
+    disposicion = 'attachment' if adjunto else 'inline'
+
+    if _config('DESCARGAS_X_ACCEL', False):
+        response = HttpResponse(content_type=content_type)
+        prefijo = _config('DESCARGAS_PREFIJO_INTERNO', '/protected-media/')
+        response['X-Accel-Redirect'] = f"{prefijo.rstrip('/')}/{quote(archivo.name)}"
+        response['X-Accel-Buffering'] = 'no'
+    else:
+        response = FileResponse(archivo.open('rb'), content_type=content_type)
+
+    response['Content-Disposition'] = f"{disposicion}; filename*=UTF-8''{quote(nombre_descarga)}"
+    response['Cache-Control'] = 'private, no-store'
+    # DescargaArchivoMiddleware no debe volver a auditarla
+    response.descarga_auditada = True
+    return response
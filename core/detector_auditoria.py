@@ -0,0 +1,196 @@
+"""
+Detección de anomalías de auditoría en streaming.
+
+Cada evento de auditoría (``LogAccion``, ``SesionUsuario``,
+``LogDescargaArchivo``) suma un punto en una ventana deslizante por regla y
+usuario (sorted set en Redis) en cuanto se confirma. Si la cuenta alcanza
+el umbral se crea la ``AlertaAuditoria`` en el momento; una clave con TTL
+evita repetirla mientras dure el silencio de la regla. No hay barridos
+periódicos sobre las tablas de auditoría.
+
+Sin Redis las ventanas se llevan en memoria del proceso (cada worker ve
+solo sus eventos).
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MINUTO = 60
+HORA = 60 * MINUTO
+HORA_INICIO_LABORAL = 7
+HORA_FIN_LABORAL = 22
+
+
+@dataclass(frozen=True)
+class Regla:
+    tipo: str
+    severidad: str
+    ventana: int  # segundos
+    umbral: int  # eventos dentro de la ventana que disparan la alerta
+    silencio: int = HORA  # segundos sin repetir la alerta para el mismo usuario
+
+
+ACTIVIDAD_SOSPECHOSA = Regla('ACTIVIDAD_SOSPECHOSA', 'ALTA', ventana=10 * MINUTO, umbral=51)
+MULTIPLES_LOGINS = Regla('MULTIPLES_LOGINS', 'MEDIA', ventana=HORA, umbral=3)
+ACCESO_FUERA_HORARIO = Regla('ACCESO_FUERA_HORARIO', 'MEDIA', ventana=0, umbral=1)
+
+
+def regla_descargas():
+    ventana = getattr(settings, 'DESCARGAS_MASIVAS_VENTANA', 300)
+    return Regla(
+        'DESCARGA_MASIVA', 'ALTA',
+        ventana=ventana,
+        umbral=getattr(settings, 'DESCARGAS_MASIVAS_UMBRAL', 10),
+        silencio=ventana,
+    )
+
+
+def _redis():
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except Exception:
+        return None
+
+
+class VentanasEnMemoria:
+    """Respaldo sin Redis: marcas de tiempo por clave dentro del proceso"""
+
+    MAX_EVENTOS = 10000
+
+    def __init__(self):
+        self._ventanas = {}
+        self._silencios = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, clave, ventana, ahora):
+        with self._lock:
+            eventos = self._ventanas.setdefault(clave, deque(maxlen=self.MAX_EVENTOS))
+            eventos.append(ahora)
+            while eventos and eventos[0] <= ahora - ventana:
+                eventos.popleft()
+            return len(eventos)
+
+    def silenciar(self, clave, segundos, ahora):
+        with self._lock:
+            if self._silencios.get(clave, 0) > ahora:
+                return False
+            self._silencios[clave] = ahora + segundos
+            return True
+
+
+class DetectorAuditoria:
+    """Ventanas deslizantes por usuario y alertas inmediatas con deduplicación"""
+
+    PREFIJO = 'auditoria:ventana'
+    PREFIJO_ALERTA = 'auditoria:alerta'
+
+    def __init__(self):
+        self.memoria = VentanasEnMemoria()
+
+    # --- Eventos ---
+
+    def registrar_accion(self, usuario_id, accion, fecha=None, ip=None):
+        self.evaluar(ACTIVIDAD_SOSPECHOSA, usuario_id, self._describir_actividad)
+        if accion == 'LOGIN':
+            hora = timezone.localtime(fecha or timezone.now())
+            if hora.hour < HORA_INICIO_LABORAL or hora.hour > HORA_FIN_LABORAL:
+                self._alertar_si_corresponde(
+                    ACCESO_FUERA_HORARIO, usuario_id,
+                    f"Acceso fuera del horario laboral a las {hora.strftime('%H:%M')}",
+                    {'hora_acceso': hora.strftime('%H:%M'), 'ip': ip},
+                )
+
+    def registrar_sesion(self, usuario_id):
+        self.evaluar(MULTIPLES_LOGINS, usuario_id, self._describir_logins)
+
+    def registrar_descarga(self, usuario_id):
+        return self.evaluar(regla_descargas(), usuario_id, self._describir_descargas)
+
+    # --- Ventanas ---
+
+    def evaluar(self, regla, usuario_id, describir):
+        """Suma el evento a la ventana de la regla y alerta si se alcanzó el umbral"""
+        cantidad = self.contar(regla, usuario_id)
+        if cantidad >= regla.umbral:
+            descripcion, detalles = describir(regla, cantidad)
+            self._alertar_si_corresponde(regla, usuario_id, descripcion, detalles)
+        return cantidad
+
+    def contar(self, regla, usuario_id):
+        ahora = time.time()
+        clave = f"{self.PREFIJO}:{regla.tipo}:{usuario_id}"
+        redis = _redis()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline()
+                pipe.zremrangebyscore(clave, 0, ahora - regla.ventana)
+                pipe.zadd(clave, {f"{ahora}:{uuid.uuid4().hex[:8]}": ahora})
+                pipe.zcard(clave)
+                pipe.expire(clave, int(regla.ventana) + 1)
+                return pipe.execute()[2]
+            except Exception as e:
+                logger.warning(f"Ventana de auditoría no disponible en Redis: {e}")
+        return self.memoria.registrar(clave, regla.ventana, ahora)
+
+    def _alertar_si_corresponde(self, regla, usuario_id, descripcion, detalles):
+        if not self._debe_alertar(regla, usuario_id):
+            return None
+        from .models_auditoria import AlertaAuditoria
+
+        alerta = AlertaAuditoria.objects.create(
+            tipo=regla.tipo,
+            severidad=regla.severidad,
+            usuario_afectado_id=usuario_id,
+            descripcion=descripcion,
+            detalles=detalles,
+        )
+        logger.info(f"Alerta de auditoría {regla.tipo} para usuario {usuario_id}")
+        return alerta
+
+    def _debe_alertar(self, regla, usuario_id):
+        """True una sola vez por período de silencio para la regla y el usuario"""
+        clave = f"{self.PREFIJO_ALERTA}:{regla.tipo}:{usuario_id}"
+        redis = _redis()
+        if redis is not None:
+            try:
+                return bool(redis.set(clave, 1, nx=True, ex=int(regla.silencio)))
+            except Exception as e:
+                logger.warning(f"Deduplicación de alertas no disponible en Redis: {e}")
+        return self.memoria.silenciar(clave, regla.silencio, time.time())
+
+    # --- Textos ---
+
+    @staticmethod
+    def _describir_actividad(regla, cantidad):
+        minutos = regla.ventana // MINUTO
+        return (
+            f"Actividad inusualmente alta: {cantidad} acciones en {minutos} minutos",
+            {'acciones_count': cantidad, 'periodo': f'{minutos}_minutos'},
+        )
+
+    @staticmethod
+    def _describir_logins(regla, cantidad):
+        return (
+            f"Usuario con {cantidad} inicios de sesión en la última hora",
+            {'sesiones_count': cantidad},
+        )
+
+    @staticmethod
+    def _describir_descargas(regla, cantidad):
+        minutos = regla.ventana // MINUTO
+        return (
+            f"Descarga masiva de archivos detectada ({cantidad} descargas en {minutos} minutos)",
+            {'cantidad_descargas': cantidad, 'periodo': f'{minutos} minutos'},
+        )
+
+
+detector_auditoria = DetectorAuditoria()
@@ -1,4 +1,5 @@
 from django import forms
+from .catalogos import asignar_opciones, obtener_catalogos
 from .models import Institucion, Provincia, Municipio, Localidad
 
 
@@ -26,4 +27,11 @@ class InstitucionForm(forms.ModelForm):
             'fecha_personeria': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
             'cuit': forms.TextInput(attrs={'class': 'form-control'}),
             'nro_sss': forms.TextInput(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        catalogos = obtener_catalogos()
+        asignar_opciones(self.fields['provincia'], catalogos.provincias)
+        asignar_opciones(self.fields['municipio'], catalogos.municipios)
+        asignar_opciones(self.fields['localidad'], catalogos.localidades)
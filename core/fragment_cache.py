@@ -0,0 +1,106 @@
+"""
+Cache de fragmentos de template con claves versionadas por objeto.
+
+La clave de un fragmento combina, por cada objeto involucrado, su
+``modificado`` y un contador de versión que los signals incrementan cuando
+cambia algo relacionado (seguimientos, planes, derivaciones...). También
+incluye el alcance de permisos del usuario, para que usuarios con distintos
+grupos no compartan HTML. Al cambiar la versión las claves viejas quedan
+huérfanas y expiran solas: no hace falta borrar por patrón.
+"""
+import hashlib
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_VERSION = 'fragmentos:v'
+PREFIJO_FRAGMENTO = 'fragmentos:html'
+TIMEOUT_FRAGMENTO = 60 * 60
+TIMEOUT_VERSION = 60 * 60 * 24 * 7
+
+
+def _clave_version(modelo, pk):
+    return f"{PREFIJO_VERSION}:{modelo._meta.label_lower}:{pk}"
+
+
+def incrementar_version(modelo, pk):
+    """Invalida todos los fragmentos que dependen del objeto indicado"""
+    if pk is None:
+        return
+    clave = _clave_version(modelo, pk)
+    try:
+        cache.add(clave, 0, TIMEOUT_VERSION)
+        cache.incr(clave)
+    except ValueError:
+        # La clave expiró entre add e incr
+        cache.set(clave, 1, TIMEOUT_VERSION)
+    except Exception as e:
+        logger.warning(f"No se pudo incrementar la versión de fragmentos {clave}: {e}")
+
+
+def alcance_usuario(usuario):
+    """Resume los permisos que cambian lo que ve el usuario en un fragmento"""
+    if usuario is None or not usuario.is_authenticated:
+        return 'anon'
+    if usuario.is_superuser:
+        return 'su'
+    from core.permisos import grupos_usuario
+    grupos = ','.join(sorted(grupos_usuario(usuario)))
+    return f"{'st' if usuario.is_staff else 'us'}:{grupos}"
+
+
+def clave_fragmento(nombre, objetos, usuario=None):
+    """Arma la clave del fragmento o None si algún objeto no es cacheable.
+
+    Los modelos aportan ``modificado`` y versión; cualquier otro valor (por
+    ejemplo la fecha del día) se incluye tal cual en la clave.
+    """
+    claves_version = {}
+    for i, obj in enumerate(objetos):
+        if hasattr(obj, '_meta'):
+            if obj.pk is None:
+                return None
+            claves_version[i] = _clave_version(type(obj), obj.pk)
+
+    versiones = cache.get_many(list(claves_version.values())) if claves_version else {}
+
+    partes = [alcance_usuario(usuario)]
+    for i, obj in enumerate(objetos):
+        clave = claves_version.get(i)
+        if clave is None:
+            partes.append(str(obj))
+            continue
+        modificado = getattr(obj, 'modificado', None)
+        sello = modificado.timestamp() if modificado else ''
+        partes.append(f"{clave}:{sello}:{versiones.get(clave, 0)}")
+
+    digest = hashlib.md5('|'.join(partes).encode()).hexdigest()
+    return f"{PREFIJO_FRAGMENTO}:{nombre}:{digest}"
+
+
+def obtener_fragmento(nombre, objetos, usuario, renderizar, timeout=TIMEOUT_FRAGMENTO):
+    """Devuelve el HTML cacheado del fragmento o lo renderiza y lo guarda"""
+    try:
+        clave = clave_fragmento(nombre, objetos, usuario)
+    except Exception as e:
+        logger.warning(f"Cache de fragmentos no disponible ({nombre}): {e}")
+        return renderizar()
+
+    if clave is None:
+        return renderizar()
+
+    try:
+        contenido = cache.get(clave)
+    except Exception:
+        contenido = None
+    if contenido is not None:
+        return contenido
+
+    contenido = renderizar()
+    try:
+        cache.set(clave, contenido, timeout)
+    except Exception as e:
+        logger.warning(f"No se pudo guardar el fragmento {nombre}: {e}")
+    return contenido
@@ -1,5 +1,8 @@
 from django.utils.functional import LazyObject
-from django.core.cache import cache
+
+from .cache_codec import compactar, expandir
+from .cache_protegido import obtener_o_calcular
+
 
 class LazyQuerySet:
     """Lazy loading para querysets pesados"""
@@ -12,10 +15,9 @@ class LazyQuerySet:
     
     def __iter__(self):
         if self._result is None:
-            self._result = cache.get(self.cache_key)
-            if self._result is None:
-                self._result = list(self.queryset_func())
-                cache.set(self.cache_key, self._result, self.timeout)
+            self._result = expandir(obtener_o_calcular(
+                self.cache_key, lambda: compactar(self.queryset_func()), self.timeout
+            ))
         return iter(self._result)
     
     def count(self):
@@ -0,0 +1,191 @@
+"""
+Logging sin I/O en el request.
+
+Un único ``ManejadorCola`` (``QueueHandler``) en el logger raíz deja cada
+registro en una cola en memoria; un hilo de sistema por proceso la vacía por
+lotes, elige el archivo según el nivel (``info``, ``warning``, ``error``,
+``critical`` y ``data`` para registros con ``extra={'data': ...}``) y lo
+escribe en ``LOG_DIR/<AAAA-MM-DD>/<nombre>.log`` usando la fecha del propio
+registro, así que un worker que pasa la medianoche cambia de carpeta solo.
+
+Si la cola está llena el registro se descarta y se cuenta (se informa luego
+en ``warning.log``): loguear nunca bloquea un request.
+"""
+import atexit
+import importlib
+import logging
+import logging.handlers
+import os
+import sys
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from core.utils import JSONDataFormatter
+
+FORMATO = "[{asctime}] {module} {levelname} {name}: {message}"
+CAPACIDAD = 10000  # registros pendientes por proceso
+TAMANO_LOTE = 500
+INTERVALO = 0.25  # segundos de espera del escritor con la cola vacía
+
+ARCHIVOS_POR_NIVEL = {
+    logging.INFO: "info.log",
+    logging.WARNING: "warning.log",
+    logging.ERROR: "error.log",
+    logging.CRITICAL: "critical.log",
+}
+ARCHIVO_DATOS = "data.log"
+
+
+def _original(modulo, nombre):
+    """Objeto sin monkey-patch de gevent: el escritor es un hilo real, no un greenlet"""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched(modulo):
+            return monkey.get_original(modulo, nombre)
+    except ImportError:
+        pass
+    return getattr(importlib.import_module(modulo), nombre)
+
+
+class EscritorRegistros:
+    """Vacía la cola del proceso por lotes y escribe en los archivos diarios"""
+
+    def __init__(self, directorio, formato=FORMATO, capacidad=CAPACIDAD):
+        self.directorio = Path(directorio)
+        self.capacidad = capacidad
+        self.formateador = logging.Formatter(formato, style="{")
+        self.formateador_datos = JSONDataFormatter()
+        self._pid = None
+        self._reiniciar()
+
+    def _reiniciar(self):
+        # deque: append/popleft son atómicos y no dependen de locks parcheados
+        self._cola = deque()
+        self._archivos = {}
+        self._fecha = None
+        self.descartados = 0
+        self._lock = _original("_thread", "allocate_lock")()
+        self._sleep = _original("time", "sleep")
+        self._activo = False
+
+    # --- Productor (hilo del request) ---
+
+    def encolar(self, record):
+        self._asegurar_hilo()
+        if len(self._cola) >= self.capacidad:
+            self.descartados += 1
+            return
+        self._cola.append(record)
+
+    def _asegurar_hilo(self):
+        pid = os.getpid()
+        if self._pid == pid and self._activo:
+            return
+        if self._pid != pid:
+            # Tras un fork (preload_app) la cola y los archivos del padre no sirven
+            self._reiniciar()
+            self._pid = pid
+        self._activo = True
+        _original("_thread", "start_new_thread")(self._bucle, ())
+
+    # --- Consumidor (hilo escritor) ---
+
+    def _bucle(self):
+        while True:
+            try:
+                if not self.vaciar():
+                    self._sleep(INTERVALO)
+            except Exception as e:
+                sys.stderr.write(f"Error en el escritor de logs: {e}\n")
+                self._sleep(INTERVALO)
+
+    def vaciar(self):
+        """Escribe lo pendiente; devuelve cuántos registros procesó"""
+        with self._lock:
+            procesados = 0
+            while self._cola:
+                lote = []
+                while self._cola and len(lote) < TAMANO_LOTE:
+                    lote.append(self._cola.popleft())
+                self._escribir(lote)
+                procesados += len(lote)
+            if self.descartados:
+                descartados, self.descartados = self.descartados, 0
+                aviso = logging.makeLogRecord({
+                    "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"Cola de logs llena: {descartados} registros descartados",
+                })
+                self._escribir([aviso])
+            return procesados
+
+    def _escribir(self, lote):
+        lineas = {}
+        for record in lote:
+            fecha = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d")
+            nombre = ARCHIVOS_POR_NIVEL.get(record.levelno)
+            if nombre:
+                lineas.setdefault((fecha, nombre), []).append(self.formateador.format(record))
+            if hasattr(record, "data") and record.levelno >= logging.INFO:
+                lineas.setdefault((fecha, ARCHIVO_DATOS), []).append(self.formateador_datos.format(record))
+
+        for (fecha, nombre), textos in lineas.items():
+            archivo = self._archivo(fecha, nombre)
+            archivo.write("\n".join(textos) + "\n")
+            archivo.flush()
+
+    def _archivo(self, fecha, nombre):
+        if self._fecha is None or fecha > self._fecha:
+            # Cambió el día: se cierran los archivos de carpetas anteriores
+            for clave in [c for c in self._archivos if c[0] != fecha]:
+                self._archivos.pop(clave).close()
+            self._fecha = fecha
+        archivo = self._archivos.get((fecha, nombre))
+        if archivo is None:
+            carpeta = self.directorio / fecha
+            carpeta.mkdir(parents=True, exist_ok=True)
+            archivo = open(carpeta / nombre, "a", encoding="utf-8")
+            self._archivos[(fecha, nombre)] = archivo
+        return archivo
+
+    def cerrar(self):
+        if self._pid != os.getpid():
+            return
+        try:
+            self.vaciar()
+        finally:
+            for archivo in self._archivos.values():
+                archivo.close()
+            self._archivos = {}
+
+
+_escritores = {}
+
+
+def obtener_escritor(directorio, formato=FORMATO, capacidad=CAPACIDAD):
+    """Un escritor por directorio, compartido por todos los manejadores del proceso"""
+    clave = str(directorio)
+    escritor = _escritores.get(clave)
+    if escritor is None:
+        escritor = _escritores[clave] = EscritorRegistros(directorio, formato, capacidad)
+    return escritor
+
+
+@atexit.register
+def _vaciar_al_salir():
+    for escritor in list(_escritores.values()):
+        try:
+            escritor.cerrar()
+        except Exception:
+            pass
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """QueueHandler que encola sin bloquear hacia el escritor del proceso"""
+
+    def __init__(self, directorio, formato=FORMATO, capacidad=CAPACIDAD):
+        self.escritor = obtener_escritor(directorio, formato, capacidad)
+        super().__init__(self.escritor)
+
+    def enqueue(self, record):
+        self.escritor.encolar(record)
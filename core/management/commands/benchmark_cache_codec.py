@@ -0,0 +1,77 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils.safestring import mark_safe
+from django_redis.compressors.zlib import ZlibCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.pickle import PickleSerializer
+
+from core.cache_codec import CompresorAdaptativo, SerializadorCache, compactar, expandir, lz4, orjson, zstandard
+
+
+def _valores_representativos(incluir_queryset):
+    valores = {
+        'contar_ciudadanos (sobre)': (48213, time.time() + 300, 0.042),
+        'metrics:<minuto>': {'count': 1834, 'total_time': 211.7},
+        'permisos:<usuario>': {'grupos': ['Administrador', 'Ciudadanos'], 'version': 12},
+        'catalogo localidades': [{'id': i, 'nombre': f'Localidad {i}', 'municipio_id': i // 10} for i in range(2000)],
+        'phase2_consolidated_stats': {
+            'timestamp': datetime.now().isoformat(),
+            'queries': {f'q{i}': {'count': i * 3, 'avg_ms': i / 7} for i in range(200)},
+        },
+        'fragmento html': mark_safe('<tr><td>Ciudadano</td><td>DNI 30123456</td></tr>' * 150),
+    }
+    if incluir_queryset:
+        from legajos.models import Ciudadano
+        queryset = Ciudadano.objects.order_by('id')[:500]
+        valores['queryset 500 ciudadanos (modelos)'] = list(queryset)
+        valores['queryset 500 ciudadanos (compacto)'] = compactar(queryset)
+    return valores
+
+
+def _leer(serializador, compresor, datos):
+    # Igual que el cliente de django-redis: sin comprimir si el compresor no lo reconoce
+    try:
+        datos = compresor.decompress(datos)
+    except CompressorError:
+        pass
+    return expandir(serializador.loads(datos))
+
+
+class Command(BaseCommand):
+    help = 'Compara CPU y bytes de pickle+zlib contra el codec de cache para claves representativas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=2000, help='Repeticiones por valor')
+        parser.add_argument('--sin-queryset', action='store_true', help='No leer ciudadanos de la base')
+
+    def handle(self, *args, **options):
+        iteraciones = options['iteraciones']
+        codecs = {
+            'pickle+zlib': (PickleSerializer({}), ZlibCompressor({})),
+            'codec': (SerializadorCache({}), CompresorAdaptativo({})),
+        }
+        disponibles = [nombre for nombre, modulo in (('orjson', orjson), ('lz4', lz4), ('zstd', zstandard)) if modulo]
+        self.stdout.write(f"Librerías opcionales disponibles: {', '.join(disponibles) or 'ninguna'}\n")
+
+        try:
+            valores = _valores_representativos(not options['sin_queryset'])
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'Sin queryset de ciudadanos ({e})'))
+            valores = _valores_representativos(False)
+
+        self.stdout.write(f"{'clave':<38} {'codec':<12} {'bytes':>9} {'escribir µs':>12} {'leer µs':>10}")
+        for nombre, valor in valores.items():
+            for nombre_codec, (serializador, compresor) in codecs.items():
+                inicio = time.perf_counter()
+                for _ in range(iteraciones):
+                    datos = compresor.compress(serializador.dumps(valor))
+                escritura = (time.perf_counter() - inicio) / iteraciones * 1e6
+
+                inicio = time.perf_counter()
+                for _ in range(iteraciones):
+                    _leer(serializador, compresor, datos)
+                lectura = (time.perf_counter() - inicio) / iteraciones * 1e6
+
+                self.stdout.write(f"{nombre:<38} {nombre_codec:<12} {len(datos):>9} {escritura:>12.1f} {lectura:>10.1f}")
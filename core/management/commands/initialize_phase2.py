@@ -65,9 +65,9 @@ class Command(BaseCommand):
             )
             
             self.stdout.write('\n📋 Próximos pasos:')
-            self.stdout.write('  1. Monitorear dashboard: http://localhost:9000/performance-dashboard/')
-            self.stdout.write('  2. Revisar sugerencias de índices en 30 minutos')
-            self.stdout.write('  3. Verificar logs de particionamiento automático')
+            self.stdout.write('  1. Verificar que corra el programador: python manage.py run_scheduler --list')
+            self.stdout.write('  2. Monitorear dashboard: http://localhost:9000/performance-dashboard/')
+            self.stdout.write('  3. Revisar sugerencias de índices en 30 minutos')
             self.stdout.write('  4. Monitorear métricas de performance')
             
         except Exception as e:
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.series_tiempo import DIAS_CARGA_INICIAL, reconstruir, series_registradas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde la base las series de tiempo de los últimos días'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=DIAS_CARGA_INICIAL, help='Días hacia atrás a reconstruir')
+        parser.add_argument('--metrica', help='Solo esta métrica')
+
+    def handle(self, *args, **options):
+        hasta = timezone.localdate()
+        desde = hasta - timedelta(days=options['dias'])
+        for serie in series_registradas():
+            if options['metrica'] and serie.metrica != options['metrica']:
+                continue
+            reconstruir(serie, desde, hasta)
+            self.stdout.write(self.style.SUCCESS(f'{serie.metrica}: {desde} a {hasta}'))
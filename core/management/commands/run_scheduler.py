@@ -0,0 +1,45 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.scheduler import programador
+import core.tareas_programadas  # noqa: F401 - registra las tareas
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta el programador de tareas periódicas (un único líder en el cluster)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', metavar='TAREA', help='Ejecutar una tarea ahora y salir')
+        parser.add_argument('--list', action='store_true', help='Listar tareas registradas')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            lider = programador.lider_actual()
+            self.stdout.write(f'Líder actual: {lider or "ninguno"}')
+            for tarea in programador.tareas.values():
+                ultima = programador.ultima_ejecucion(tarea.nombre) or {}
+                self.stdout.write(
+                    f'  {tarea.nombre}: cada {tarea.intervalo}s, timeout {tarea.timeout}s, '
+                    f'última: {ultima.get("inicio", "-")} {ultima.get("estado", "")}'
+                )
+            return
+
+        if options['once']:
+            tarea = programador.tareas.get(options['once'])
+            if tarea is None:
+                raise CommandError(f"Tarea desconocida: {options['once']}")
+            estado = programador.ejecutar(tarea)
+            if estado is None:
+                self.stdout.write(self.style.WARNING('La tarea ya se está ejecutando en otra instancia'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{tarea.nombre}: {estado}'))
+            return
+
+        signal.signal(signal.SIGTERM, programador.detener)
+        signal.signal(signal.SIGINT, programador.detener)
+        self.stdout.write(self.style.SUCCESS(
+            f'Programador iniciado ({programador.instancia}) con {len(programador.tareas)} tareas'
+        ))
+        programador.bucle()
+        self.stdout.write('Programador detenido')
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from core.sampling_profiler import generar_token
+
+
+class Command(BaseCommand):
+    help = 'Genera un token firmado para perfilar requests con el header X-Profile-Token'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Usuario administrador que solicita el perfilado')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            usuario = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['username']}")
+
+        if not (usuario.is_staff or usuario.is_superuser):
+            raise CommandError('Solo los administradores pueden perfilar requests')
+
+        token = generar_token(usuario)
+        self.stdout.write(self.style.SUCCESS('Token de perfilado generado'))
+        self.stdout.write(token)
+        self.stdout.write(f'Uso: curl -H "X-Profile-Token: {token}" <url>')
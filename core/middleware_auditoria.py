@@ -229,6 +229,10 @@ class DescargaArchivoMiddleware(MiddlewareMixin):
         if not request.user.is_authenticated:
             return response
         
+        # Las descargas de core.descargas ya se auditaron al autorizarlas
+        if getattr(response, 'descarga_auditada', False):
+            return response
+        
         # Verificar si es una descarga
         es_descarga = False
         for patron in self.PATRONES_DESCARGA:
@@ -247,22 +251,14 @@ class DescargaArchivoMiddleware(MiddlewareMixin):
     
     def _auditar_descarga(self, request, response):
         """Crea un registro de auditoría de descarga"""
-        from core.models_auditoria import LogDescargaArchivo
+        from core.descargas import registrar_descarga
         
         try:
             # Extraer nombre del archivo
             archivo_nombre = self._extraer_nombre_archivo(request, response)
             
-            LogDescargaArchivo.objects.create(
-                usuario=request.user,
-                archivo_nombre=archivo_nombre,
-                archivo_path=request.path,
-                ip_address=self._get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', '')
-            )
-            
-            # Verificar descarga masiva
-            self._verificar_descarga_masiva(request.user)
+            # Registra el log y verifica descarga masiva (ventana deslizante en Redis)
+            registrar_descarga(request, archivo_nombre, request.path)
         
         except Exception as e:
             print(f"Error en auditoría de descarga: {e}")
@@ -286,32 +282,6 @@ class DescargaArchivoMiddleware(MiddlewareMixin):
         else:
             ip = request.META.get('REMOTE_ADDR')
         return ip
-    
-    def _verificar_descarga_masiva(self, usuario):
-        """Verifica si hay descarga masiva (10+ en 5 minutos)"""
-        from django.utils import timezone
-        from datetime import timedelta
-        from core.models_auditoria import LogDescargaArchivo, AlertaAuditoria
-        
-        hace_5_minutos = timezone.now() - timedelta(minutes=5)
-        
-        descargas_recientes = LogDescargaArchivo.objects.filter(
-            usuario=usuario,
-            timestamp__gte=hace_5_minutos
-        ).count()
-        
-        if descargas_recientes >= 10:
-            # Generar alerta
-            AlertaAuditoria.objects.create(
-                tipo='DESCARGA_MASIVA',
-                severidad='ALTA',
-                usuario_afectado=usuario,
-                descripcion=f'Descarga masiva de archivos detectada ({descargas_recientes} descargas en 5 minutos)',
-                detalles={
-                    'cantidad_descargas': descargas_recientes,
-                    'periodo': '5 minutos',
-                }
-            )
 
 
 class SesionUsuarioMiddleware(MiddlewareMixin):
@@ -326,19 +296,15 @@ class SesionUsuarioMiddleware(MiddlewareMixin):
         return None
     
     def _actualizar_sesion(self, request):
-        """Actualiza la última actividad de la sesión"""
-        from core.models_auditoria import SesionUsuario
-        from django.utils import timezone
+        """Registra la actividad; se vuelca a SesionUsuario en bloque (core.session_activity)"""
+        from core.session_activity import registro_actividad
         
         try:
             session_key = request.session.session_key
             if not session_key:
                 return
             
-            SesionUsuario.objects.filter(
-                session_key=session_key,
-                activa=True
-            ).update(ultima_actividad=timezone.now())
+            registro_actividad.registrar(session_key)
         
         except Exception as e:
             print(f"Error actualizando sesión: {e}")
@@ -402,12 +368,16 @@ def log_user_logout(sender, request, user, **kwargs):
         
         if hasattr(request, 'session') and request.session.session_key:
             try:
+                from core.session_activity import registro_actividad
+                registro_actividad.descartar(request.session.session_key)
+                ahora = timezone.now()
                 SesionUsuario.objects.filter(
                     session_key=request.session.session_key,
                     activa=True
                 ).update(
                     activa=False,
-                    fin_sesion=timezone.now()
+                    fin_sesion=ahora,
+                    ultima_actividad=ahora
                 )
             except Exception:
                 pass
@@ -6,6 +6,17 @@ from django.http import HttpResponse
 
 logger = logging.getLogger(__name__)
 
+CLAVE_ACTIVOS = 'active_requests'
+
+
+def _sumar_activos(delta):
+    """Incremento atómico: la lectura puede venir del nivel local y estar atrasada"""
+    try:
+        cache.incr(CLAVE_ACTIVOS, delta)
+    except ValueError:
+        cache.add(CLAVE_ACTIVOS, max(0, delta), 60)
+
+
 class ConcurrencyLimitMiddleware:
     """Middleware para controlar concurrencia y evitar sobrecarga"""
     
@@ -15,7 +26,7 @@ class ConcurrencyLimitMiddleware:
         
     def __call__(self, request):
         try:
-            current_load = cache.get('active_requests', 0)
+            current_load = max(0, cache.get(CLAVE_ACTIVOS, 0))
             
             if current_load > 1500:
                 logger.warning(f"Sistema sobrecargado: {current_load} requests activos")
@@ -24,14 +35,13 @@ class ConcurrencyLimitMiddleware:
                     status=503
                 )
             
-            cache.set('active_requests', current_load + 1, 60)
+            _sumar_activos(1)
             
             try:
                 response = self.get_response(request)
             finally:
                 try:
-                    current_load = cache.get('active_requests', 1)
-                    cache.set('active_requests', max(0, current_load - 1), 60)
+                    _sumar_activos(-1)
                 except Exception as e:
                     logger.error(f"Error decrementando contador: {e}")
             
@@ -65,7 +75,7 @@ class RequestMetricsMiddleware:
             if hasattr(response, '__setitem__'):
                 response['X-Response-Time'] = f"{response_time:.3f}s"
                 try:
-                    response['X-Active-Requests'] = str(cache.get('active_requests', 0))
+                    response['X-Active-Requests'] = str(max(0, cache.get(CLAVE_ACTIVOS, 0)))
                 except:
                     pass
             
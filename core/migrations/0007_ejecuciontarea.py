@@ -0,0 +1,32 @@
+# Generated by Django 4.2.20 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_auditoriaciudadano_ciudadano'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionTarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarea', models.CharField(max_length=100)),
+                ('estado', models.CharField(choices=[('EJECUTANDO', 'Ejecutando'), ('OK', 'Completada'), ('ERROR', 'Error'), ('TIMEOUT', 'Tiempo excedido')], default='EJECUTANDO', max_length=12)),
+                ('inicio', models.DateTimeField()),
+                ('fin', models.DateTimeField(blank=True, null=True)),
+                ('duracion_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('instancia', models.CharField(help_text='host:pid que ejecutó la tarea', max_length=120)),
+                ('detalle', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Ejecución de Tarea',
+                'verbose_name_plural': 'Ejecuciones de Tareas',
+                'ordering': ['-inicio'],
+                'indexes': [models.Index(fields=['tarea', '-inicio'], name='core_ejecuc_tarea_29b053_idx'), models.Index(fields=['estado', '-inicio'], name='core_ejecuc_estado_e36bad_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.20 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_ejecuciontarea'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='operacionmasiva',
+            name='accion',
+            field=models.CharField(blank=True, help_text='Acción registrada en el motor de operaciones', max_length=60),
+        ),
+        migrations.AddField(
+            model_name='operacionmasiva',
+            name='parametros',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='operacionmasiva',
+            name='objetivos',
+            field=models.JSONField(blank=True, help_text='IDs a procesar, en orden', null=True),
+        ),
+        migrations.AddField(
+            model_name='operacionmasiva',
+            name='procesados',
+            field=models.PositiveIntegerField(default=0, help_text='Checkpoint: objetivos ya procesados'),
+        ),
+        migrations.AddField(
+            model_name='operacionmasiva',
+            name='tamano_lote',
+            field=models.PositiveIntegerField(default=200),
+        ),
+        migrations.AddField(
+            model_name='operacionmasiva',
+            name='estado',
+            field=models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_CURSO', 'En curso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida'), ('CANCELADA', 'Cancelada')], default='COMPLETADA', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='operacionmasiva',
+            name='bloqueada_hasta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='operacionmasiva',
+            index=models.Index(fields=['estado', 'fecha_inicio'], name='core_operac_estado_7dd3fc_idx'),
+        ),
+    ]
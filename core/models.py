@@ -371,3 +371,37 @@ class DocumentoRequerido(TimeStamped):
     
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.institucion.nombre}"
+
+
+class EjecucionTarea(models.Model):
+    """Historial de ejecuciones del programador de tareas (core.scheduler)"""
+
+    class Estado(models.TextChoices):
+        EJECUTANDO = "EJECUTANDO", "Ejecutando"
+        OK = "OK", "Completada"
+        ERROR = "ERROR", "Error"
+        TIMEOUT = "TIMEOUT", "Tiempo excedido"
+
+    tarea = models.CharField(max_length=100)
+    estado = models.CharField(
+        max_length=12,
+        choices=Estado.choices,
+        default=Estado.EJECUTANDO
+    )
+    inicio = models.DateTimeField()
+    fin = models.DateTimeField(null=True, blank=True)
+    duracion_ms = models.PositiveIntegerField(null=True, blank=True)
+    instancia = models.CharField(max_length=120, help_text="host:pid que ejecutó la tarea")
+    detalle = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Ejecución de Tarea"
+        verbose_name_plural = "Ejecuciones de Tareas"
+        ordering = ["-inicio"]
+        indexes = [
+            models.Index(fields=["tarea", "-inicio"]),
+            models.Index(fields=["estado", "-inicio"]),
+        ]
+
+    def __str__(self):
+        return f"{self.tarea} - {self.get_estado_display()} ({self.inicio})"
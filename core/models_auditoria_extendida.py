@@ -487,6 +487,13 @@ class OperacionMasiva(models.Model):
         UPDATE_BATCH = "UPDATE_BATCH", "Actualización Masiva"
         DELETE_BATCH = "DELETE_BATCH", "Eliminación Masiva"
     
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        EN_CURSO = "EN_CURSO", "En curso"
+        COMPLETADA = "COMPLETADA", "Completada"
+        FALLIDA = "FALLIDA", "Fallida"
+        CANCELADA = "CANCELADA", "Cancelada"
+    
     tipo = models.CharField(max_length=20, choices=TipoOperacion.choices)
     usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
@@ -508,6 +515,15 @@ class OperacionMasiva(models.Model):
     completada = models.BooleanField(default=False)
     errores = models.JSONField(blank=True, null=True)
     
+    # Ejecución por lotes (core.operaciones_masivas)
+    accion = models.CharField(max_length=60, blank=True, help_text="Acción registrada en el motor de operaciones")
+    parametros = models.JSONField(blank=True, null=True)
+    objetivos = models.JSONField(blank=True, null=True, help_text="IDs a procesar, en orden")
+    procesados = models.PositiveIntegerField(default=0, help_text="Checkpoint: objetivos ya procesados")
+    tamano_lote = models.PositiveIntegerField(default=200)
+    estado = models.CharField(max_length=12, choices=Estado.choices, default=Estado.COMPLETADA)
+    bloqueada_hasta = models.DateTimeField(null=True, blank=True)
+    
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     
     class Meta:
@@ -518,7 +534,15 @@ class OperacionMasiva(models.Model):
             models.Index(fields=["usuario", "-fecha_inicio"]),
             models.Index(fields=["tipo", "-fecha_inicio"]),
             models.Index(fields=["modelo_afectado", "-fecha_inicio"]),
+            models.Index(fields=["estado", "fecha_inicio"]),
         ]
     
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.modelo_afectado} ({self.cantidad_registros} registros)"
+    
+    @property
+    def progreso(self):
+        """Porcentaje de objetivos procesados"""
+        if not self.cantidad_registros:
+            return 100
+        return min(100, round(self.procesados * 100 / self.cantidad_registros))
@@ -214,11 +214,13 @@ class SystemMonitor:
             redis_conn = get_redis_connection("default")
             info = redis_conn.info()
             
+            from django.core.cache import cache
             return {
                 'hits': info.get('keyspace_hits', 0),
                 'misses': info.get('keyspace_misses', 0),
                 'memory_used': info.get('used_memory', 0),
-                'connected_clients': info.get('connected_clients', 0)
+                'connected_clients': info.get('connected_clients', 0),
+                'niveles': cache.estadisticas() if hasattr(cache, 'estadisticas') else None,
             }
         except ImportError:
             return {'hits': 0, 'misses': 0, 'memory_used': 0, 'connected_clients': 0, 'error': 'redis_unavailable'}
@@ -0,0 +1,287 @@
+"""
+Motor de operaciones masivas.
+
+Una ``OperacionMasiva`` guarda la acción a aplicar, sus parámetros y la
+lista ordenada de IDs. La ejecuta la tarea programada
+``operaciones_masivas``, fuera del request y por lotes: cada lote corre en
+una transacción corta que aplica los cambios, deja un único ``LogAccion``
+con el resumen del lote y avanza el checkpoint (``procesados``). Si el
+proceso muere, el lease (``bloqueada_hasta``) vence y la siguiente corrida
+retoma desde el último lote confirmado.
+
+Los errores por fila se van agregando a ``archivo_log``.
+
+Las acciones se registran con ``@accion_masiva`` (ver
+``legajos.operaciones_masivas``) y reciben un ``Lote``.
+"""
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models_auditoria import LogAccion
+from .models_auditoria_extendida import OperacionMasiva
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 200
+DURACION_LEASE = 5 * 60  # segundos; se renueva con cada lote
+
+ACCION_LOG_POR_TIPO = {
+    OperacionMasiva.TipoOperacion.UPDATE_BATCH: LogAccion.TipoAccion.UPDATE,
+    OperacionMasiva.TipoOperacion.DELETE_BATCH: LogAccion.TipoAccion.DELETE,
+    OperacionMasiva.TipoOperacion.IMPORT: LogAccion.TipoAccion.IMPORT,
+    OperacionMasiva.TipoOperacion.EXPORT: LogAccion.TipoAccion.EXPORT,
+}
+ESTADOS_ACTIVOS = (OperacionMasiva.Estado.PENDIENTE, OperacionMasiva.Estado.EN_CURSO)
+
+
+@dataclass(frozen=True)
+class AccionMasiva:
+    nombre: str
+    modelo: str
+    funcion: Callable
+    tipo: str
+
+
+class Lote:
+    """IDs de un lote y el resultado por fila que va dejando la acción"""
+
+    def __init__(self, operacion, ids):
+        self.operacion = operacion
+        self.ids = list(ids)
+        self.exitosos = []
+        self.errores = []  # (id, motivo)
+        self.resumen = {}  # datos extra para el LogAccion del lote
+
+    @property
+    def parametros(self):
+        return self.operacion.parametros or {}
+
+    def ok(self, pk):
+        self.exitosos.append(str(pk))
+
+    def fallo(self, pk, motivo):
+        self.errores.append((str(pk), str(motivo)))
+
+    def marcar_faltantes(self, encontrados):
+        """Registra como error los IDs del lote que no existen"""
+        encontrados = {str(pk) for pk in encontrados}
+        for pk in self.ids:
+            if pk not in encontrados:
+                self.fallo(pk, 'No existe')
+
+    def agregar(self, otro):
+        self.exitosos.extend(otro.exitosos)
+        self.errores.extend(otro.errores)
+
+
+_acciones = {}
+
+
+def accion_masiva(nombre, modelo, tipo=OperacionMasiva.TipoOperacion.UPDATE_BATCH):
+    """Registra una acción ejecutable por el motor"""
+    def decorator(func):
+        _acciones[nombre] = AccionMasiva(nombre, modelo, func, tipo)
+        return func
+    return decorator
+
+
+def obtener_accion(nombre):
+    try:
+        return _acciones[nombre]
+    except KeyError:
+        raise ValueError(f"Acción masiva desconocida: {nombre}") from None
+
+
+# --- Alta y control ---
+
+def encolar(nombre, ids, usuario=None, parametros=None, ip_address=None, tamano_lote=TAMANO_LOTE):
+    """Crea la operación pendiente; la ejecuta la tarea programada"""
+    accion = obtener_accion(nombre)
+    objetivos = list(dict.fromkeys(str(pk) for pk in ids))
+    operacion = OperacionMasiva.objects.create(
+        tipo=accion.tipo,
+        usuario=usuario,
+        modelo_afectado=accion.modelo,
+        cantidad_registros=len(objetivos),
+        accion=nombre,
+        parametros=parametros or {},
+        objetivos=objetivos,
+        tamano_lote=max(1, tamano_lote),
+        estado=OperacionMasiva.Estado.PENDIENTE,
+        ip_address=ip_address,
+    )
+    operacion.archivo_log.name = f"auditorias/logs/operacion_{operacion.pk}.log"
+    operacion.save(update_fields=['archivo_log'])
+    logger.info(f"Operación masiva #{operacion.pk} encolada: {nombre} sobre {len(objetivos)} registros")
+    return operacion
+
+
+def cancelar(operacion_id):
+    """Detiene la operación al terminar el lote en curso"""
+    return OperacionMasiva.objects.filter(pk=operacion_id, estado__in=ESTADOS_ACTIVOS).update(
+        estado=OperacionMasiva.Estado.CANCELADA, fecha_fin=timezone.now(), bloqueada_hasta=None,
+    ) == 1
+
+
+def _libres(ahora):
+    return Q(bloqueada_hasta__isnull=True) | Q(bloqueada_hasta__lt=ahora)
+
+
+def _tomar(operacion_id):
+    """Toma el lease de la operación; False si otro proceso la está ejecutando"""
+    ahora = timezone.now()
+    return OperacionMasiva.objects.filter(_libres(ahora), pk=operacion_id, estado__in=ESTADOS_ACTIVOS).update(
+        estado=OperacionMasiva.Estado.EN_CURSO, bloqueada_hasta=ahora + timedelta(seconds=DURACION_LEASE),
+    ) == 1
+
+
+# --- Ejecución ---
+
+def ejecutar_pendientes(limite_segundos=None):
+    """Ejecuta (o retoma) las operaciones pendientes, en orden de alta"""
+    inicio = time.monotonic()
+    ids = list(
+        OperacionMasiva.objects.filter(_libres(timezone.now()), estado__in=ESTADOS_ACTIVOS)
+        .exclude(accion='')
+        .order_by('fecha_inicio')
+        .values_list('id', flat=True)[:20]
+    )
+    ejecutadas = 0
+    for operacion_id in ids:
+        restante = None
+        if limite_segundos is not None:
+            restante = limite_segundos - (time.monotonic() - inicio)
+            if restante <= 0:
+                break
+        if ejecutar(operacion_id, limite_segundos=restante) is not None:
+            ejecutadas += 1
+    return ejecutadas
+
+
+def ejecutar(operacion_id, limite_segundos=None):
+    """Procesa lotes hasta terminar, cancelarse o agotar ``limite_segundos``"""
+    if not _tomar(operacion_id):
+        return None
+    operacion = OperacionMasiva.objects.get(pk=operacion_id)
+    try:
+        accion = obtener_accion(operacion.accion)
+    except ValueError as e:
+        _finalizar(operacion, OperacionMasiva.Estado.FALLIDA, {'error': str(e)})
+        return operacion
+
+    inicio = time.monotonic()
+    objetivos = operacion.objetivos or []
+    while operacion.procesados < len(objetivos):
+        if limite_segundos is not None and time.monotonic() - inicio >= limite_segundos:
+            # Se libera el lease para que la próxima corrida continúe
+            OperacionMasiva.objects.filter(pk=operacion.pk).update(bloqueada_hasta=None)
+            return operacion
+        ids = objetivos[operacion.procesados:operacion.procesados + operacion.tamano_lote]
+        try:
+            _procesar_lote(operacion, accion, ids)
+        except Exception as e:
+            logger.error(f"Operación masiva #{operacion.pk} interrumpida: {e}", exc_info=True)
+            _finalizar(operacion, OperacionMasiva.Estado.FALLIDA, {'error': str(e)})
+            return operacion
+        operacion.refresh_from_db(fields=['procesados', 'registros_exitosos', 'registros_fallidos', 'estado'])
+        if operacion.estado == OperacionMasiva.Estado.CANCELADA:
+            logger.info(f"Operación masiva #{operacion.pk} cancelada en {operacion.procesados}/{len(objetivos)}")
+            return operacion
+
+    errores = None
+    if operacion.registros_fallidos:
+        errores = {'fallidos': operacion.registros_fallidos, 'log': operacion.archivo_log.name}
+    _finalizar(operacion, OperacionMasiva.Estado.COMPLETADA, errores)
+    logger.info(
+        f"Operación masiva #{operacion.pk} completada: {operacion.registros_exitosos} ok, "
+        f"{operacion.registros_fallidos} con error"
+    )
+    return operacion
+
+
+def _procesar_lote(operacion, accion, ids):
+    lote = Lote(operacion, ids)
+    try:
+        with transaction.atomic():
+            accion.funcion(lote)
+            _cerrar_lote(operacion, accion, lote)
+    except Exception as e:
+        # Una fila rompió el lote: se repite fila por fila con savepoints,
+        # en una sola transacción para que el checkpoint siga siendo atómico
+        logger.warning(f"Lote de la operación #{operacion.pk} reintentado fila por fila: {e}")
+        lote = Lote(operacion, ids)
+        with transaction.atomic():
+            for pk in ids:
+                fila = Lote(operacion, [pk])
+                try:
+                    with transaction.atomic():
+                        accion.funcion(fila)
+                except Exception as error_fila:
+                    fila = Lote(operacion, [pk])
+                    fila.fallo(pk, error_fila)
+                lote.agregar(fila)
+            _cerrar_lote(operacion, accion, lote)
+    _escribir_errores(operacion, lote.errores)
+    return lote
+
+
+def _cerrar_lote(operacion, accion, lote):
+    """Un LogAccion por lote y avance del checkpoint, dentro de la transacción del lote"""
+    LogAccion.objects.create(
+        usuario_id=operacion.usuario_id,
+        accion=ACCION_LOG_POR_TIPO.get(accion.tipo, LogAccion.TipoAccion.UPDATE),
+        modelo=accion.modelo,
+        objeto_id=f"operacion:{operacion.pk}",
+        objeto_repr=f"Operación masiva #{operacion.pk} ({accion.nombre})"[:200],
+        detalles={
+            'operacion_id': operacion.pk,
+            'accion': accion.nombre,
+            'parametros': operacion.parametros,
+            'desde': operacion.procesados,
+            'exitosos': lote.exitosos,
+            'fallidos': len(lote.errores),
+            **lote.resumen,
+        },
+        ip_address=operacion.ip_address,
+    )
+    OperacionMasiva.objects.filter(pk=operacion.pk).update(
+        procesados=F('procesados') + len(lote.ids),
+        registros_exitosos=F('registros_exitosos') + len(lote.exitosos),
+        registros_fallidos=F('registros_fallidos') + len(lote.errores),
+        bloqueada_hasta=timezone.now() + timedelta(seconds=DURACION_LEASE),
+    )
+
+
+def _finalizar(operacion, estado, errores=None):
+    OperacionMasiva.objects.filter(pk=operacion.pk).update(
+        estado=estado,
+        completada=estado == OperacionMasiva.Estado.COMPLETADA,
+        fecha_fin=timezone.now(),
+        bloqueada_hasta=None,
+        errores=errores,
+    )
+    operacion.estado = estado
+
+
+def _escribir_errores(operacion, errores):
+    if not errores or not operacion.archivo_log.name:
+        return
+    marca = timezone.now().isoformat(timespec='seconds')
+    lineas = ''.join(f"{marca}\t{pk}\t{motivo}\n" for pk, motivo in errores)
+    try:
+        ruta = default_storage.path(operacion.archivo_log.name)
+    except NotImplementedError:
+        logger.warning(f"Operación masiva #{operacion.pk}: {len(errores)} errores sin archivo de log local")
+        return
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'a', encoding='utf-8') as archivo:
+        archivo.write(lineas)
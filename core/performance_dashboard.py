@@ -7,10 +7,11 @@ from datetime import timedelta
 from .performance_analyzer import PerformanceAnalyzer
 from .monitoring import system_monitor
 from .phase2_manager import phase2_manager
+from .permisos import tiene_grupo
 import json
 
 def is_admin(user):
-    return user.is_superuser or user.groups.filter(name__in=['Administrador', 'Ciudadanos']).exists()
+    return tiene_grupo(user, 'Administrador', 'Ciudadanos')
 
 @login_required
 @user_passes_test(is_admin)
@@ -194,7 +195,7 @@ def phase2_metrics_api(request):
             phase2_stats = cache.get('phase2_consolidated_stats', {})
         
         response_data = {
-            'phase2_active': phase2_manager.running,
+            'phase2_active': phase2_manager.get_phase2_status()['running'],
             'last_update': phase2_stats.get('timestamp'),
             'partitioning': {
                 'active_partitions': sum(
@@ -343,12 +344,7 @@ def run_phase2_tests_api(request):
         perf_summary = phase2_stats.get('performance_summary', {})
         
         # Verificar estado de componentes
-        components_status = {
-            'partitioning': phase2_manager.components['partitioning'].running,
-            'query_optimizer': phase2_manager.components['query_optimizer'].running,
-            'connection_pool': hasattr(phase2_manager.components['connection_pool'], 'pools'),
-            'index_manager': phase2_manager.components['index_manager'].running
-        }
+        components_status = phase2_manager.estado_componentes()
         active_components = sum(components_status.values())
         
         results['tests_executed'].append({
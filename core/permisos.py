@@ -0,0 +1,138 @@
+"""
+Snapshot de permisos por usuario: grupos, flags y alcance del perfil.
+
+Se memoiza en el objeto ``user`` (dura lo que dura el request) y se cachea
+entre requests; ``core.signals_permisos`` lo invalida cuando cambian los
+grupos del usuario, su perfil o algún grupo. En régimen estable los
+chequeos de permisos no hacen queries.
+"""
+from functools import wraps
+
+from django.contrib.auth import REDIRECT_FIELD_NAME
+from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+PREFIJO = 'permisos:usuario'
+CLAVE_VERSION = 'permisos:version'
+TIMEOUT = 60 * 60
+
+GRUPOS_CONVERSACIONES = ('Conversaciones', 'OperadorCharla')
+
+
+def _clave(user_id):
+    return f"{PREFIJO}:{user_id}"
+
+
+def _construir(user):
+    grupos = list(user.groups.values_list('name', flat=True))
+    alcance = {'provincia_id': None, 'es_usuario_provincial': False, 'rol': None}
+    try:
+        profile = user.profile
+        alcance = {
+            'provincia_id': profile.provincia_id,
+            'es_usuario_provincial': profile.es_usuario_provincial,
+            'rol': profile.rol,
+        }
+    except Exception:
+        pass
+    return {'grupos': grupos, **alcance}
+
+
+def obtener_permisos(user):
+    """Devuelve el snapshot de permisos del usuario (dict) o None si es anónimo"""
+    if user is None or not user.is_authenticated:
+        return None
+
+    snapshot = getattr(user, '_permisos_snapshot', None)
+    if snapshot is not None:
+        return snapshot
+
+    clave = _clave(user.pk)
+    datos = cache.get_many([clave, CLAVE_VERSION])
+    version = datos.get(CLAVE_VERSION, 0)
+    guardado = datos.get(clave)
+    if guardado is None or guardado.get('v') != version:
+        guardado = _construir(user)
+        guardado['v'] = version
+        cache.set(clave, guardado, TIMEOUT)
+
+    # Los flags se leen del usuario ya cargado: siempre están al día
+    snapshot = {
+        **guardado,
+        'grupos': frozenset(guardado['grupos']),
+        'is_superuser': user.is_superuser,
+        'is_staff': user.is_staff,
+    }
+    user._permisos_snapshot = snapshot
+    return snapshot
+
+
+def grupos_usuario(user):
+    """Nombres de grupos del usuario (frozenset vacío si es anónimo)"""
+    snapshot = obtener_permisos(user)
+    return snapshot['grupos'] if snapshot else frozenset()
+
+
+def tiene_grupo(user, *nombres):
+    """True si el usuario pertenece a alguno de los grupos o es superusuario"""
+    snapshot = obtener_permisos(user)
+    if snapshot is None:
+        return False
+    return snapshot['is_superuser'] or not snapshot['grupos'].isdisjoint(nombres)
+
+
+def alcance_perfil(user):
+    """Provincia, carácter provincial y rol del perfil del usuario"""
+    snapshot = obtener_permisos(user) or {}
+    return {
+        'provincia_id': snapshot.get('provincia_id'),
+        'es_usuario_provincial': snapshot.get('es_usuario_provincial', False),
+        'rol': snapshot.get('rol'),
+    }
+
+
+def tiene_permiso_conversaciones(user):
+    return tiene_grupo(user, *GRUPOS_CONVERSACIONES)
+
+
+def invalidar_permisos(*user_ids):
+    """Descarta el snapshot cacheado de los usuarios indicados"""
+    if user_ids:
+        cache.delete_many([_clave(user_id) for user_id in user_ids])
+
+
+def invalidar_todos():
+    """Invalida todos los snapshots (por ejemplo al renombrar un grupo)"""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, 1, None)
+
+
+# --- Decoradores ---
+
+def grupo_requerido(*nombres, login_url=None, raise_exception=False):
+    """
+    Restringe la vista a usuarios de alguno de los grupos (o superusuarios).
+    Con ``raise_exception`` responde 403 en lugar de redirigir al login.
+    """
+    def check(user):
+        if tiene_grupo(user, *nombres):
+            return True
+        if raise_exception and user.is_authenticated:
+            raise PermissionDenied
+        return False
+
+    return user_passes_test(check, login_url=login_url, redirect_field_name=REDIRECT_FIELD_NAME)
+
+
+def permiso_conversaciones_requerido(view_func):
+    """Atajo para vistas del módulo de conversaciones"""
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not tiene_permiso_conversaciones(request.user):
+            raise PermissionDenied
+        return view_func(request, *args, **kwargs)
+
+    return _wrapped_view
@@ -15,6 +15,13 @@ logger = logging.getLogger(__name__)
 class Phase2OptimizationManager:
     """Gestor central de todas las optimizaciones de Fase 2"""
     
+    # Tarea de core.tareas_programadas que reemplaza al hilo de cada componente
+    TAREAS_COMPONENTES = {
+        'partitioning': 'particiones_mantenimiento',
+        'query_optimizer': 'optimizador_queries',
+        'index_manager': 'analisis_indices',
+    }
+    
     def __init__(self):
         self.components = {
             'partitioning': partition_manager,
@@ -34,20 +41,10 @@ class Phase2OptimizationManager:
             logger.info("📊 Inicializando Connection Pool Avanzado...")
             self.components['connection_pool'].initialize_pools()
             
-            # 2. Inicializar Particionamiento
-            logger.info("🗂️ Iniciando Sistema de Particionamiento...")
-            self.components['partitioning'].start_auto_partitioning()
-            
-            # 3. Inicializar Query Optimizer
-            logger.info("⚡ Iniciando Motor de Optimización de Queries...")
-            self.components['query_optimizer'].start_optimization_engine()
-            
-            # 4. Inicializar Index Manager
-            logger.info("🔍 Iniciando Gestor Inteligente de Índices...")
-            self.components['index_manager'].start_index_analyzer()
-            
-            # 5. Iniciar monitoreo de estadísticas
-            self.start_stats_monitoring()
+            # 2-5. Particionamiento, optimizador de queries, índices y
+            # estadísticas corren como tareas del programador (un único
+            # proceso en el cluster), no como hilos en cada worker.
+            logger.info("🗓️ Tareas periódicas delegadas a core.scheduler (manage.py run_scheduler)")
             
             # 6. Ejecutar optimizaciones iniciales
             self.run_initial_optimizations()
@@ -187,7 +184,7 @@ class Phase2OptimizationManager:
                 },
                 'recommendations': {
                     'immediate_actions': self._get_immediate_recommendations(),
-                    'monitoring_setup': 'Monitoreo automático configurado cada 5 minutos',
+                    'monitoring_setup': 'Tareas periódicas a cargo de manage.py run_scheduler',
                     'next_steps': [
                         'Monitorear dashboard de performance',
                         'Revisar sugerencias de índices en 30 minutos',
@@ -240,14 +237,24 @@ class Phase2OptimizationManager:
         except Exception as e:
             logger.error(f"Error apagando Fase 2: {e}")
     
+    def estado_componentes(self):
+        """Componentes activos: pools inicializados o tarea programada con ejecución reciente"""
+        from .scheduler import programador
+        
+        estado = {
+            name: bool(programador.ultima_ejecucion(tarea))
+            for name, tarea in self.TAREAS_COMPONENTES.items()
+        }
+        estado['connection_pool'] = bool(getattr(self.components['connection_pool'], 'pools', None))
+        return estado
+    
     def get_phase2_status(self):
         """Obtiene estado actual de Fase 2"""
+        from .scheduler import programador
+        
         return {
-            'running': self.running,
-            'components_status': {
-                name: getattr(component, 'running', False) 
-                for name, component in self.components.items()
-            },
+            'running': self.running or bool(programador.ultima_ejecucion('estadisticas_fase2')),
+            'components_status': self.estado_componentes(),
             'last_stats_update': cache.get('phase2_consolidated_stats', {}).get('timestamp'),
             'initial_report': cache.get('phase2_initial_report')
         }
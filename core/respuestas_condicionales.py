@@ -0,0 +1,168 @@
+"""
+Respuestas condicionales (ETag / Last-Modified) para APIs consultadas por polling.
+
+Antes de armar la respuesta se calcula un validador barato: ``MAX(modificado)``
+y ``COUNT(*)`` del queryset filtrado (una sola consulta agregada) y, para
+datos derivados de otros modelos (contadores, métricas), un contador de
+versión por agregado que los signals incrementan. Si el ETag que manda el
+cliente coincide se responde 304 sin ejecutar la consulta principal ni
+serializar.
+
+- ``@condicional(funcion)`` para vistas función: ``funcion(request, ...)``
+  devuelve un ``Validador`` o None (sin validador se responde normal).
+- ``RespuestaCondicionalMixin`` para ViewSets de DRF (``list`` y ``retrieve``).
+
+El ETag incluye el usuario, así que dos usuarios en el mismo navegador no
+comparten respuestas.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+PREFIJO_VERSION = 'condicional:v'
+TIMEOUT_VERSION = 60 * 60 * 24 * 30
+METODOS = ('GET', 'HEAD')
+
+
+@dataclass(frozen=True)
+class Validador:
+    partes: tuple
+    ultima_modificacion: datetime = None
+    versiones: dict = field(default_factory=dict)
+
+
+# --- Versiones por agregado ---
+
+def _clave_version(agregado):
+    return f"{PREFIJO_VERSION}:{agregado}"
+
+
+def incrementar_version(agregado):
+    """Invalida los validadores que dependen del agregado"""
+    clave = _clave_version(agregado)
+    try:
+        cache.add(clave, 0, TIMEOUT_VERSION)
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, 1, TIMEOUT_VERSION)
+
+
+def versiones(*agregados):
+    if not agregados:
+        return {}
+    datos = cache.get_many([_clave_version(a) for a in agregados])
+    return {a: datos.get(_clave_version(a), 0) for a in agregados}
+
+
+# --- Validadores ---
+
+def validador(*partes, ultima_modificacion=None, agregados=()):
+    return Validador(tuple(partes), ultima_modificacion, versiones(*agregados))
+
+
+def validador_queryset(queryset, *campos, agregados=(), extra=()):
+    """MAX de los campos de fecha y COUNT del queryset en una consulta"""
+    campos = campos or ('modificado',)
+    datos = queryset.order_by().aggregate(
+        _total=Count('pk'), **{f'_max_{i}': Max(campo) for i, campo in enumerate(campos)}
+    )
+    maximos = [datos[f'_max_{i}'] for i in range(len(campos))]
+    fechas = [m for m in maximos if isinstance(m, datetime)]
+    return validador(
+        queryset.model._meta.label_lower, datos['_total'],
+        *(m.timestamp() if isinstance(m, datetime) else m for m in maximos),
+        *extra,
+        ultima_modificacion=max(fechas) if fechas else None,
+        agregados=agregados,
+    )
+
+
+def etag(request, validador):
+    usuario = getattr(request, 'user', None)
+    usuario_id = usuario.pk if usuario is not None and usuario.is_authenticated else 'anon'
+    texto = '|'.join(str(p) for p in (usuario_id, *validador.partes, *sorted(validador.versiones.items())))
+    return '"' + hashlib.md5(texto.encode()).hexdigest() + '"'
+
+
+def responder_condicional(request, validador, generar):
+    """304 si el cliente ya tiene la versión vigente; si no, ``generar()`` con validadores"""
+    if validador is None or request.method not in METODOS:
+        return generar()
+
+    valor_etag = etag(request, validador)
+    ultima = int(validador.ultima_modificacion.timestamp()) if validador.ultima_modificacion else None
+    respuesta = get_conditional_response(request, etag=valor_etag, last_modified=ultima)
+    if respuesta is None:
+        respuesta = generar()
+        if respuesta.status_code != 200:
+            return respuesta
+
+    respuesta['ETag'] = valor_etag
+    if ultima is not None:
+        respuesta['Last-Modified'] = http_date(ultima)
+    # Que el navegador revalide siempre en vez de usar una copia sin preguntar
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    patch_vary_headers(respuesta, ('Cookie',))
+    return respuesta
+
+
+def condicional(funcion_validador):
+    """Decorator para vistas función que responden GET"""
+    def decorator(vista):
+        @wraps(vista)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in METODOS:
+                return vista(request, *args, **kwargs)
+            return responder_condicional(
+                request,
+                funcion_validador(request, *args, **kwargs),
+                lambda: vista(request, *args, **kwargs),
+            )
+        return wrapper
+    return decorator
+
+
+class RespuestaCondicionalMixin:
+    """``list`` y ``retrieve`` con 304 cuando el queryset filtrado no cambió.
+
+    ``queryset_validador``: queryset sin anotaciones ni prefetch para el
+    validador (por defecto ``get_queryset()``). ``campos_condicionales``:
+    fechas cuyo máximo entra en el validador. ``agregados_condicionales``:
+    versiones de datos derivados (por ejemplo contadores anotados).
+    """
+    queryset_validador = None
+    campos_condicionales = ('modificado',)
+    agregados_condicionales = ()
+
+    def _queryset_validador(self):
+        base = self.queryset_validador.all() if self.queryset_validador is not None else self.get_queryset()
+        return self.filter_queryset(base)
+
+    def list(self, request, *args, **kwargs):
+        validador_lista = validador_queryset(
+            self._queryset_validador(), *self.campos_condicionales,
+            agregados=self.agregados_condicionales, extra=(request.GET.urlencode(),),
+        )
+        return responder_condicional(
+            request, validador_lista, lambda: super(RespuestaCondicionalMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self._queryset_validador().filter(**{self.lookup_field: kwargs[lookup]})
+            validador_detalle = validador_queryset(
+                queryset, *self.campos_condicionales, agregados=self.agregados_condicionales,
+            )
+        except (ValueError, ValidationError):
+            validador_detalle = None  # lookup inválido: la vista responde 404
+        return responder_condicional(
+            request, validador_detalle, lambda: super(RespuestaCondicionalMixin, self).retrieve(request, *args, **kwargs),
+        )
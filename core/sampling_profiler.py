@@ -0,0 +1,237 @@
+"""
+Profiler estadístico de bajo overhead para producción.
+
+Reemplaza a Silk fuera de DEBUG: en lugar de instrumentar cada llamada, un
+hilo de sistema toma muestras periódicas de la pila de los requests que se
+están perfilando y las acumula en memoria como pilas colapsadas por vista
+(formato ``flamegraph.pl``). El volcado a disco lo hace el mismo hilo, fuera
+del ciclo del request, y nunca se escribe en la base de datos.
+
+Un request se perfila si trae el header ``X-Profile-Token`` firmado para un
+administrador (ver comando ``token_perfilado``) o si cae dentro de
+``PROFILER_SAMPLE_RATE``.
+"""
+import importlib
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+logger = logging.getLogger(__name__)
+
+SALT_TOKEN = 'core.sampling_profiler'
+HEADER_TOKEN = 'HTTP_X_PROFILE_TOKEN'
+
+
+def _original(modulo, nombre):
+    """Devuelve el objeto sin monkey-patch de gevent (hilos y sleep reales)"""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched(modulo):
+            return monkey.get_original(modulo, nombre)
+    except ImportError:
+        pass
+    return getattr(importlib.import_module(modulo), nombre)
+
+
+def _greenlet_actual():
+    try:
+        from greenlet import getcurrent
+    except ImportError:
+        return None
+    return getcurrent()
+
+
+def generar_token(usuario):
+    """Genera un token firmado que habilita el perfilado para un administrador"""
+    return signing.dumps({'u': usuario.pk}, salt=SALT_TOKEN, compress=True)
+
+
+def verificar_token(token):
+    """Devuelve el id de usuario del token o None si es inválido o expiró"""
+    max_age = getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 3600)
+    try:
+        datos = signing.loads(token, salt=SALT_TOKEN, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    return datos.get('u')
+
+
+class MuestreadorPilas:
+    """Toma muestras de pila de los requests registrados y las agrega por vista"""
+
+    def __init__(self, intervalo=0.005, intervalo_volcado=60, profundidad=64,
+                 directorio=None):
+        self.intervalo = intervalo
+        self.intervalo_volcado = intervalo_volcado
+        self.profundidad = profundidad
+        self.directorio = Path(directorio) if directorio else None
+
+        self._lock = _original('_thread', 'allocate_lock')()
+        self._sleep = _original('time', 'sleep')
+        self._activos = {}
+        self._muestras = {}
+        self._pilas = defaultdict(Counter)
+        self._etiquetas = {}
+        self._pid = None
+        self._secuencia = 0
+
+    # --- Registro de requests ---
+
+    def registrar(self):
+        """Registra el request actual; devuelve la clave para liberarlo"""
+        self._asegurar_hilo()
+        with self._lock:
+            self._secuencia += 1
+            clave = self._secuencia
+            self._activos[clave] = (_greenlet_actual(), _original('_thread', 'get_ident')())
+            self._muestras[clave] = Counter()
+        return clave
+
+    def liberar(self, clave, vista):
+        """Quita el request y suma sus muestras a la vista resuelta"""
+        with self._lock:
+            self._activos.pop(clave, None)
+            muestras = self._muestras.pop(clave, None)
+            if muestras:
+                self._pilas[vista].update(muestras)
+        return sum(muestras.values()) if muestras else 0
+
+    # --- Hilo de muestreo ---
+
+    def _asegurar_hilo(self):
+        # Con preload_app el hilo del master no sobrevive al fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._activos.clear()
+            self._muestras.clear()
+            self._pilas.clear()
+        _original('_thread', 'start_new_thread')(self._bucle, ())
+
+    def _bucle(self):
+        ultimo_volcado = time.monotonic()
+        while self._pid == os.getpid():
+            if self._activos:
+                self._sleep(self.intervalo)
+                try:
+                    self._muestrear()
+                except Exception as e:
+                    logger.debug(f"Error tomando muestra: {e}")
+            else:
+                self._sleep(min(1.0, self.intervalo_volcado))
+
+            if time.monotonic() - ultimo_volcado >= self.intervalo_volcado:
+                ultimo_volcado = time.monotonic()
+                try:
+                    self.volcar()
+                except Exception as e:
+                    logger.warning(f"Error volcando perfiles: {e}")
+
+    def _muestrear(self):
+        frames = sys._current_frames()
+        with self._lock:
+            activos = list(self._activos.items())
+        for clave, (glet, ident) in activos:
+            # Un greenlet suspendido expone su frame; el que corre no, y su
+            # pila es la del hilo.
+            frame = getattr(glet, 'gr_frame', None) if glet is not None else None
+            if frame is None:
+                if glet is not None and getattr(glet, 'dead', False):
+                    continue
+                frame = frames.get(ident)
+            if frame is None:
+                continue
+            pila = self._colapsar(frame)
+            with self._lock:
+                muestras = self._muestras.get(clave)
+                if muestras is not None:
+                    muestras[pila] += 1
+
+    def _colapsar(self, frame):
+        partes = []
+        while frame is not None and len(partes) < self.profundidad:
+            code = frame.f_code
+            etiqueta = self._etiquetas.get(code)
+            if etiqueta is None:
+                modulo = frame.f_globals.get('__name__', '?')
+                etiqueta = f"{modulo}:{code.co_name}"
+                self._etiquetas[code] = etiqueta
+            partes.append(etiqueta)
+            frame = frame.f_back
+        partes.reverse()
+        return ';'.join(partes)
+
+    # --- Volcado ---
+
+    def volcar(self):
+        """Escribe las pilas acumuladas como archivos ``.folded`` por vista"""
+        with self._lock:
+            pilas, self._pilas = self._pilas, defaultdict(Counter)
+        if not pilas or self.directorio is None:
+            return 0
+
+        carpeta = self.directorio / time.strftime('%Y%m%d')
+        carpeta.mkdir(parents=True, exist_ok=True)
+        total = 0
+        for vista, contador in pilas.items():
+            nombre = vista.replace(':', '.').replace('/', '_') or 'sin_ruta'
+            ruta = carpeta / f"{nombre}.{os.getpid()}.folded"
+            lineas = ''.join(f"{pila} {n}\n" for pila, n in contador.items())
+            with open(ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(lineas)
+            total += len(contador)
+        return total
+
+    def resumen(self):
+        """Muestras pendientes de volcado por vista"""
+        with self._lock:
+            return {vista: sum(c.values()) for vista, c in self._pilas.items()}
+
+
+muestreador = MuestreadorPilas(
+    intervalo=getattr(settings, 'PROFILER_INTERVAL', 0.005),
+    intervalo_volcado=getattr(settings, 'PROFILER_FLUSH_INTERVAL', 60),
+    profundidad=getattr(settings, 'PROFILER_MAX_DEPTH', 64),
+    directorio=getattr(settings, 'PROFILER_DIR', None),
+)
+
+
+class SamplingProfilerMiddleware:
+    """Perfila por muestreo los requests con token firmado o por tasa aleatoria"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.habilitado = getattr(settings, 'PROFILER_ENABLED', True)
+        self.tasa = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+
+    def __call__(self, request):
+        if not self.habilitado or not self._debe_perfilar(request):
+            return self.get_response(request)
+
+        clave = muestreador.registrar()
+        try:
+            response = self.get_response(request)
+        finally:
+            match = getattr(request, 'resolver_match', None)
+            vista = (match.view_name if match else None) or 'sin_ruta'
+            cantidad = muestreador.liberar(clave, vista)
+        response['X-Profile-Samples'] = str(cantidad)
+        return response
+
+    def _debe_perfilar(self, request):
+        token = request.META.get(HEADER_TOKEN)
+        if token:
+            if verificar_token(token) is not None:
+                return True
+            logger.warning(f"Token de perfilado inválido desde {request.META.get('REMOTE_ADDR')}")
+        return self.tasa > 0 and random.random() < self.tasa
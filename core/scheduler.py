@@ -0,0 +1,276 @@
+"""
+Programador de tareas periódicas con un único líder en el cluster.
+
+Reemplaza los hilos daemon por worker (particionamiento, optimizador de
+queries, índices, estadísticas de Fase 2): las tareas se registran acá y se
+ejecutan en un proceso dedicado (``manage.py run_scheduler``).
+
+- Liderazgo: lock en Redis (``SET NX EX``) renovado por un hilo de latido.
+  Solo el líder dispara tareas; si muere, otro proceso toma el lock al
+  vencer el TTL.
+- Cada ejecución toma además un lock por tarea, así que aunque haya dos
+  líderes durante una transición (o un ``--once`` manual) una misma tarea
+  nunca corre dos veces en simultáneo.
+- La próxima ejecución de cada tarea vive en Redis con jitter, para que un
+  nuevo líder no re-ejecute todo al arrancar.
+- ``despertar`` adelanta la próxima ejecución de una tarea a un momento
+  dado (vencimientos de la agenda), con el intervalo como respaldo.
+- El historial queda en ``EjecucionTarea``.
+"""
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CLAVE_LIDER = 'scheduler:lider'
+PREFIJO_LOCK = 'scheduler:lock'
+PREFIJO_PROXIMA = 'scheduler:proxima'
+PREFIJO_ULTIMA = 'scheduler:ultima'
+
+# Borra la clave solo si sigue perteneciendo a esta instancia
+_LUA_LIBERAR = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Renueva el TTL solo si sigue perteneciendo a esta instancia
+_LUA_RENOVAR = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Adelanta la próxima ejecución si el momento pedido es anterior
+_LUA_ADELANTAR = """
+local actual = redis.call('get', KEYS[1])
+if not actual or tonumber(ARGV[1]) < tonumber(actual) then
+    redis.call('set', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+class TiempoExcedido(Exception):
+    """La tarea superó su timeout"""
+
+
+class TareaProgramada:
+    """Tarea periódica registrada en el programador"""
+
+    def __init__(self, nombre, funcion, intervalo, timeout=None, jitter=0.1):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.intervalo = intervalo
+        self.timeout = timeout or min(intervalo, 3600)
+        self.jitter = jitter
+
+    def proximo_intervalo(self):
+        variacion = self.intervalo * self.jitter
+        return self.intervalo + random.uniform(-variacion, variacion)
+
+    def __repr__(self):
+        return f"<TareaProgramada {self.nombre} cada {self.intervalo}s>"
+
+
+class Programador:
+    """Registro de tareas y bucle de ejecución con elección de líder"""
+
+    TTL_LIDER = 30
+    TICK = 1.0
+
+    def __init__(self):
+        self.tareas = {}
+        self.instancia = f"{socket.gethostname()}:{os.getpid()}"
+        self.es_lider = False
+        self._activo = False
+
+    # --- Registro ---
+
+    def tarea(self, nombre, intervalo, timeout=None, jitter=0.1):
+        """Decorador para registrar una tarea periódica (intervalo en segundos)"""
+        def decorator(func):
+            self.tareas[nombre] = TareaProgramada(nombre, func, intervalo, timeout, jitter)
+            return func
+        return decorator
+
+    def _redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+    # --- Liderazgo ---
+
+    def adquirir_liderazgo(self):
+        redis = self._redis()
+        if redis.set(CLAVE_LIDER, self.instancia, nx=True, ex=self.TTL_LIDER):
+            self.es_lider = True
+        else:
+            self.es_lider = bool(redis.eval(_LUA_RENOVAR, 1, CLAVE_LIDER, self.instancia, self.TTL_LIDER))
+        return self.es_lider
+
+    def liberar_liderazgo(self):
+        try:
+            self._redis().eval(_LUA_LIBERAR, 1, CLAVE_LIDER, self.instancia)
+        except Exception as e:
+            logger.warning(f"No se pudo liberar el liderazgo: {e}")
+        self.es_lider = False
+
+    def lider_actual(self):
+        valor = self._redis().get(CLAVE_LIDER)
+        return valor.decode() if isinstance(valor, bytes) else valor
+
+    def _latido(self):
+        """Renueva el liderazgo mientras una tarea larga ocupa el hilo principal"""
+        while self._activo:
+            time.sleep(self.TTL_LIDER / 3)
+            if not self._activo:
+                break
+            try:
+                self.adquirir_liderazgo()
+            except Exception as e:
+                logger.warning(f"Error renovando liderazgo: {e}")
+                self.es_lider = False
+
+    # --- Ejecución ---
+
+    def _vencida(self, tarea, ahora):
+        redis = self._redis()
+        clave = f"{PREFIJO_PROXIMA}:{tarea.nombre}"
+        proxima = redis.get(clave)
+        if proxima is None:
+            # Primera vez: repartir el arranque dentro del jitter
+            inicial = ahora + random.uniform(0, tarea.intervalo * tarea.jitter)
+            redis.set(clave, inicial, nx=True)
+            return False
+        return float(proxima) <= ahora
+
+    def _reprogramar(self, tarea):
+        proxima = time.time() + tarea.proximo_intervalo()
+        self._redis().set(f"{PREFIJO_PROXIMA}:{tarea.nombre}", proxima)
+
+    def despertar(self, nombre, momento):
+        """Adelanta la tarea para que corra en ``momento`` (epoch) si le tocaba más tarde.
+
+        Para tareas que atienden vencimientos: el intervalo queda como respaldo
+        y la tarea se despierta cuando vence el próximo ítem.
+        """
+        return bool(self._redis().eval(_LUA_ADELANTAR, 1, f"{PREFIJO_PROXIMA}:{nombre}", momento))
+
+    def ejecutar(self, tarea):
+        """Ejecuta una tarea con lock propio, timeout e historial. Devuelve el estado"""
+        from .models import EjecucionTarea
+
+        redis = self._redis()
+        clave_lock = f"{PREFIJO_LOCK}:{tarea.nombre}"
+        if not redis.set(clave_lock, self.instancia, nx=True, ex=int(tarea.timeout) + 60):
+            logger.info(f"Tarea {tarea.nombre} ya en ejecución en otra instancia")
+            return None
+
+        close_old_connections()
+        inicio = timezone.now()
+        t0 = time.monotonic()
+        ejecucion = EjecucionTarea.objects.create(
+            tarea=tarea.nombre, inicio=inicio, instancia=self.instancia
+        )
+        estado, detalle = EjecucionTarea.Estado.OK, ''
+        try:
+            with _limite_tiempo(tarea.timeout):
+                resultado = tarea.funcion()
+            if resultado is not None:
+                detalle = str(resultado)[:2000]
+        except TiempoExcedido:
+            estado, detalle = EjecucionTarea.Estado.TIMEOUT, f"Superó {tarea.timeout}s"
+            logger.error(f"Tarea {tarea.nombre} excedió su timeout de {tarea.timeout}s")
+        except Exception as e:
+            estado, detalle = EjecucionTarea.Estado.ERROR, str(e)[:2000]
+            logger.error(f"Error en tarea {tarea.nombre}: {e}")
+        finally:
+            redis.eval(_LUA_LIBERAR, 1, clave_lock, self.instancia)
+
+        duracion_ms = int((time.monotonic() - t0) * 1000)
+        close_old_connections()
+        EjecucionTarea.objects.filter(pk=ejecucion.pk).update(
+            estado=estado, fin=timezone.now(), duracion_ms=duracion_ms, detalle=detalle
+        )
+        cache.set(f"{PREFIJO_ULTIMA}:{tarea.nombre}", {
+            'estado': estado,
+            'inicio': inicio.isoformat(),
+            'duracion_ms': duracion_ms,
+            'instancia': self.instancia,
+        }, 7 * 86400)
+        return estado
+
+    def ultima_ejecucion(self, nombre):
+        return cache.get(f"{PREFIJO_ULTIMA}:{nombre}")
+
+    def bucle(self):
+        """Bucle principal del proceso dedicado"""
+        self._activo = True
+        threading.Thread(target=self._latido, daemon=True).start()
+        logger.info(f"Programador iniciado en {self.instancia} con {len(self.tareas)} tareas")
+        try:
+            while self._activo:
+                try:
+                    if not self.es_lider and not self.adquirir_liderazgo():
+                        time.sleep(self.TTL_LIDER / 3)
+                        continue
+
+                    ahora = time.time()
+                    for tarea in list(self.tareas.values()):
+                        if not self.es_lider or not self._activo:
+                            break
+                        if self._vencida(tarea, ahora):
+                            self._reprogramar(tarea)
+                            self.ejecutar(tarea)
+                except Exception as e:
+                    logger.error(f"Error en bucle del programador: {e}")
+                    time.sleep(5)
+                time.sleep(self.TICK)
+        finally:
+            self._activo = False
+            self.liberar_liderazgo()
+
+    def detener(self, *args):
+        self._activo = False
+
+
+class _limite_tiempo:
+    """Interrumpe la tarea con SIGALRM (solo en el hilo principal)"""
+
+    def __init__(self, segundos):
+        self.segundos = segundos
+        self.habilitado = (
+            hasattr(signal, 'setitimer')
+            and threading.current_thread() is threading.main_thread()
+        )
+
+    def _handler(self, signum, frame):
+        raise TiempoExcedido()
+
+    def __enter__(self):
+        if self.habilitado:
+            self.anterior = signal.signal(signal.SIGALRM, self._handler)
+            signal.setitimer(signal.ITIMER_REAL, self.segundos)
+        return self
+
+    def __exit__(self, *exc):
+        if self.habilitado:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.anterior)
+        return False
+
+
+# Instancia global del programador
+programador = Programador()
@@ -0,0 +1,287 @@
+"""
+Contadores de series de tiempo en hashes de Redis para los gráficos de tendencia.
+
+Cada ``Serie`` cuenta registros de un modelo por la fecha de uno de sus
+campos, en total y por dimensión (``tipo_contacto=LLAMADA``,
+``estado=ABIERTO``...):
+
+- por día: ``series:<metrica>:d:<dimension>:<AAAA>`` con campos ``MM-DD``
+- por hora (solo campos DateTime): ``series:<metrica>:h:<dimension>:<AAAA-MM-DD>``
+  con campos ``HH``
+
+Los signals suman al crear, restan al borrar y mueven el conteo cuando
+cambia la fecha o una dimensión. Un gráfico lee un vector con un HMGET por
+año en vez de reagregar la tabla. La tarea ``series_reconciliar`` recalcula
+los últimos días desde la base (cambios por ``update()``) y
+``manage.py reconstruir_series`` hace la carga inicial.
+
+``reconstruir`` deja en ``series:<metrica>:cargada`` la fecha desde la que
+la serie está completa. Sin esa marca (nunca cargada, Redis vaciado o
+desalojado) o para días anteriores, la lectura levanta ``SerieNoCargada`` y
+el gráfico agrega desde la base; la reconciliación diaria hace entonces la
+carga completa.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import ExtractHour, TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'series'
+TTL_DIARIO = 800 * 24 * 60 * 60
+TTL_HORARIO = 10 * 24 * 60 * 60
+TOTAL = ''
+DIAS_CARGA_INICIAL = 400
+
+
+class SerieNoCargada(Exception):
+    """La serie no tiene datos completos en Redis para el rango pedido"""
+
+
+@dataclass(frozen=True)
+class Serie:
+    metrica: str
+    modelo: str  # 'app.Modelo'
+    campo_fecha: str
+    dimensiones: tuple = ()
+
+    @property
+    def model(self):
+        return apps.get_model(self.modelo)
+
+    @property
+    def horaria(self):
+        return self.model._meta.get_field(self.campo_fecha).get_internal_type() == 'DateTimeField'
+
+
+_series = {}
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def _clave_dia(metrica, dimension, anio):
+    return f"{PREFIJO}:{metrica}:d:{dimension}:{anio}"
+
+
+def _clave_hora(metrica, dimension, dia):
+    return f"{PREFIJO}:{metrica}:h:{dimension}:{dia.isoformat()}"
+
+
+def _clave_cargada(metrica):
+    return f"{PREFIJO}:{metrica}:cargada"
+
+
+def _clave_valores(metrica, nombre):
+    return f"{PREFIJO}:{metrica}:valores:{nombre}"
+
+
+def _dimension(nombre, valor):
+    return f"{nombre}={'' if valor is None else valor}"
+
+
+def _momento(valor):
+    """(fecha local, hora o None) del valor del campo de fecha"""
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.date(), valor.hour
+    return valor, None
+
+
+# --- Escritura ---
+
+def registrar(serie, valor_fecha, dimensiones, delta=1):
+    """Suma ``delta`` al bucket del día (y de la hora) en el total y cada dimensión"""
+    if valor_fecha is None:
+        return
+    dia, hora = _momento(valor_fecha)
+    redis = _redis()
+    pipe = redis.pipeline(transaction=False)
+    for dimension in (TOTAL, *(_dimension(n, v) for n, v in dimensiones.items())):
+        clave = _clave_dia(serie.metrica, dimension, dia.year)
+        pipe.hincrby(clave, dia.strftime('%m-%d'), delta)
+        pipe.expire(clave, TTL_DIARIO)
+        if hora is not None:
+            clave = _clave_hora(serie.metrica, dimension, dia)
+            pipe.hincrby(clave, f"{hora:02d}", delta)
+            pipe.expire(clave, TTL_HORARIO)
+    for nombre, valor in dimensiones.items():
+        pipe.sadd(_clave_valores(serie.metrica, nombre), '' if valor is None else str(valor))
+    pipe.execute()
+
+
+def _valores(serie, instancia):
+    return getattr(instancia, serie.campo_fecha), {n: getattr(instancia, n) for n in serie.dimensiones}
+
+
+def _aplicar(serie, cambios):
+    def aplicar():
+        try:
+            for valor_fecha, dimensiones, delta in cambios:
+                registrar(serie, valor_fecha, dimensiones, delta)
+        except Exception as e:
+            # La reconciliación diaria corrige lo que se pierda acá
+            logger.warning(f"No se pudo actualizar la serie {serie.metrica}: {e}")
+    transaction.on_commit(aplicar)
+
+
+def registrar_serie(metrica, modelo, campo_fecha, dimensiones=()):
+    """Declara la serie y conecta los signals del modelo"""
+    serie = Serie(metrica, modelo, campo_fecha, tuple(dimensiones))
+    _series[metrica] = serie
+    campos = (campo_fecha, *serie.dimensiones)
+
+    def antes_de_guardar(sender, instance, update_fields=None, **kwargs):
+        instance._serie_anterior = None
+        if update_fields is not None and not set(update_fields) & set(campos):
+            return  # no cambia nada de la serie: se evita la consulta
+        if not instance._state.adding and instance.pk is not None:
+            fila = sender._base_manager.filter(pk=instance.pk).values_list(*campos).first()
+            if fila is not None:
+                instance._serie_anterior = (fila[0], dict(zip(serie.dimensiones, fila[1:])))
+
+    def al_guardar(sender, instance, created, **kwargs):
+        actual = _valores(serie, instance)
+        anterior = getattr(instance, '_serie_anterior', None)
+        if created:
+            _aplicar(serie, [(*actual, 1)])
+        elif anterior is not None and anterior != actual:
+            _aplicar(serie, [(*anterior, -1), (*actual, 1)])
+
+    def al_borrar(sender, instance, **kwargs):
+        _aplicar(serie, [(*_valores(serie, instance), -1)])
+
+    uid = f'series_{metrica}'
+    pre_save.connect(antes_de_guardar, sender=modelo, weak=False, dispatch_uid=f'{uid}_pre')
+    post_save.connect(al_guardar, sender=modelo, weak=False, dispatch_uid=f'{uid}_post')
+    post_delete.connect(al_borrar, sender=modelo, weak=False, dispatch_uid=f'{uid}_delete')
+    return serie
+
+
+def series_registradas():
+    return list(_series.values())
+
+
+# --- Lectura ---
+
+def _dias(desde, hasta):
+    return [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+
+
+def cargada_desde(metrica):
+    """Fecha desde la que la serie está completa en Redis, o None"""
+    valor = _redis().get(_clave_cargada(metrica))
+    if valor is None:
+        return None
+    return date.fromisoformat(valor.decode() if isinstance(valor, bytes) else valor)
+
+
+def _verificar_cargada(metrica, desde):
+    cargada = cargada_desde(metrica)
+    if cargada is None or desde < cargada:
+        raise SerieNoCargada(f"Serie {metrica} cargada desde {cargada}, se pidió desde {desde}")
+
+
+def vector_diario(metrica, desde, hasta, dimension=TOTAL):
+    """Conteos por día entre ``desde`` y ``hasta`` (inclusive).
+
+    Levanta ``SerieNoCargada`` si la serie no cubre el rango.
+    """
+    _verificar_cargada(metrica, desde)
+    dias = _dias(desde, hasta)
+    por_anio = defaultdict(list)
+    for dia in dias:
+        por_anio[dia.year].append(dia)
+    pipe = _redis().pipeline(transaction=False)
+    for anio, dias_anio in por_anio.items():
+        clave = _clave_dia(metrica, dimension, anio)
+        pipe.exists(clave)
+        pipe.hmget(clave, [d.strftime('%m-%d') for d in dias_anio])
+    respuestas = pipe.execute()
+    conteos = {}
+    for (anio, dias_anio), existe, valores in zip(por_anio.items(), respuestas[::2], respuestas[1::2]):
+        # reconstruir escribe todos los días del rango, aun en 0: un año sin hash fue desalojado
+        if not existe and dimension == TOTAL:
+            raise SerieNoCargada(f"Serie {metrica} sin datos para {anio}")
+        conteos.update({dia: int(valor or 0) for dia, valor in zip(dias_anio, valores)})
+    return [conteos[dia] for dia in dias]
+
+
+def vector_horario(metrica, dia, dimension=TOTAL):
+    """Conteos por hora (0-23) de un día"""
+    _verificar_cargada(metrica, dia)
+    valores = _redis().hmget(_clave_hora(metrica, dimension, dia), [f"{h:02d}" for h in range(24)])
+    return [int(valor or 0) for valor in valores]
+
+
+def vectores_por_dimension(metrica, nombre, desde, hasta):
+    """{valor: vector diario} para cada valor conocido de la dimensión"""
+    valores = sorted(v.decode() if isinstance(v, bytes) else v for v in _redis().smembers(_clave_valores(metrica, nombre)))
+    return {valor: vector_diario(metrica, desde, hasta, _dimension(nombre, valor)) for valor in valores}
+
+
+# --- Reconciliación ---
+
+def reconstruir(serie, desde, hasta):
+    """Recalcula desde la base los buckets de ``desde`` a ``hasta`` y los sobrescribe"""
+    queryset = serie.model._base_manager.all()
+    if serie.horaria:
+        inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()))
+        fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), datetime.min.time()))
+        queryset = queryset.filter(**{f'{serie.campo_fecha}__gte': inicio, f'{serie.campo_fecha}__lt': fin})
+        queryset = queryset.annotate(_dia=TruncDate(serie.campo_fecha), _hora=ExtractHour(serie.campo_fecha))
+        grupos = ['_dia', '_hora']
+    else:
+        queryset = queryset.filter(**{f'{serie.campo_fecha}__range': (desde, hasta)})
+        queryset = queryset.annotate(_dia=TruncDate(serie.campo_fecha))
+        grupos = ['_dia']
+
+    dias = defaultdict(lambda: defaultdict(int))   # dimension -> dia -> n
+    horas = defaultdict(lambda: defaultdict(int))  # (dimension, dia) -> hora -> n
+    valores = defaultdict(set)
+    for fila in queryset.order_by().values(*grupos, *serie.dimensiones).annotate(_n=Count('pk')):
+        dimensiones = [TOTAL] + [_dimension(n, fila[n]) for n in serie.dimensiones]
+        for nombre in serie.dimensiones:
+            valores[nombre].add('' if fila[nombre] is None else str(fila[nombre]))
+        for dimension in dimensiones:
+            dias[dimension][fila['_dia']] += fila['_n']
+            if serie.horaria:
+                horas[(dimension, fila['_dia'])][fila['_hora']] += fila['_n']
+
+    redis = _redis()
+    for nombre in serie.dimensiones:
+        conocidos = {v.decode() if isinstance(v, bytes) else v for v in redis.smembers(_clave_valores(serie.metrica, nombre))}
+        valores[nombre] |= conocidos
+    todas = [TOTAL] + [_dimension(n, v) for n in serie.dimensiones for v in valores[n]]
+
+    pipe = redis.pipeline(transaction=False)
+    for nombre, conjunto in valores.items():
+        if conjunto:
+            pipe.sadd(_clave_valores(serie.metrica, nombre), *conjunto)
+    for dimension in todas:
+        for dia in _dias(desde, hasta):
+            clave = _clave_dia(serie.metrica, dimension, dia.year)
+            pipe.hset(clave, dia.strftime('%m-%d'), dias[dimension].get(dia, 0))
+            pipe.expire(clave, TTL_DIARIO)
+            if serie.horaria and (timezone.localdate() - dia).days < TTL_HORARIO // 86400:
+                clave = _clave_hora(serie.metrica, dimension, dia)
+                pipe.hset(clave, mapping={f"{h:02d}": horas[(dimension, dia)].get(h, 0) for h in range(24)})
+                pipe.expire(clave, TTL_HORARIO)
+    pipe.execute()
+
+    # La marca solo retrocede: una reconciliación corta no achica lo ya cargado
+    cargada = cargada_desde(serie.metrica)
+    if cargada is None or desde < cargada:
+        redis.set(_clave_cargada(serie.metrica), desde.isoformat())
+    logger.info(f"Serie {serie.metrica} reconstruida del {desde} al {hasta}")
@@ -6,7 +6,12 @@ from .models_auditoria import LogAccion, LogDescargaArchivo, SesionUsuario, Aler
 
 
 class ServicioAlertas:
-    """Servicio para generar alertas automáticas de auditoría"""
+    """
+    Verificaciones de auditoría por barrido de tablas.
+
+    Las alertas se generan en línea con ``core.detector_auditoria``; esto
+    queda para reconciliar a mano (comando ``verificar_auditoria``).
+    """
     
     @staticmethod
     def verificar_multiples_logins():
@@ -0,0 +1,147 @@
+"""
+Registro agrupado de actividad de sesiones.
+
+``SesionUsuarioMiddleware`` ya no actualiza ``SesionUsuario`` en cada
+request: anota el último acceso en un hash de Redis (o en un dict del
+proceso si no hay Redis) y la tarea ``sesiones_actividad`` del programador
+vuelca todo con un UPDATE por lote. Dentro de ``RESOLUCION`` segundos el
+mismo proceso ni siquiera escribe en Redis.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, Value, When
+
+logger = logging.getLogger(__name__)
+
+CLAVE_HASH = 'sesiones:actividad'
+RESOLUCION = getattr(settings, 'SESIONES_ACTIVIDAD_RESOLUCION', 30)
+INTERVALO_VOLCADO = getattr(settings, 'SESIONES_ACTIVIDAD_INTERVALO_VOLCADO', 30)
+TAMANO_LOTE = 500
+MAX_SESIONES_LOCALES = 10000
+
+
+class RegistroActividadSesiones:
+    """Acumula timestamps de última actividad y los vuelca en bloque"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ultimo_registro = {}
+        self._pendientes = {}
+        self._hilo_local = None
+
+    def _redis(self):
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection('default')
+        except Exception:
+            return None
+
+    def registrar(self, session_key, ahora=None):
+        """Anota actividad de la sesión; no toca la base de datos"""
+        ahora = ahora or time.time()
+        ultimo = self._ultimo_registro.get(session_key)
+        if ultimo is not None and ahora - ultimo < RESOLUCION:
+            return
+        self._ultimo_registro[session_key] = ahora
+        if len(self._ultimo_registro) > MAX_SESIONES_LOCALES:
+            self._podar_throttle(ahora)
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                redis.hset(CLAVE_HASH, session_key, ahora)
+                return
+            except Exception as e:
+                logger.warning(f"Redis no disponible para actividad de sesiones: {e}")
+
+        with self._lock:
+            self._pendientes[session_key] = ahora
+        self._asegurar_hilo_local()
+
+    def descartar(self, session_key):
+        """Olvida la actividad pendiente de una sesión que se cierra"""
+        self._ultimo_registro.pop(session_key, None)
+        with self._lock:
+            self._pendientes.pop(session_key, None)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                redis.hdel(CLAVE_HASH, session_key)
+            except Exception:
+                pass
+
+    def _tomar_pendientes(self):
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, {}
+
+        redis = self._redis()
+        if redis is not None:
+            # RENAME es atómico: lo que llegue después va a un hash nuevo
+            temporal = f"{CLAVE_HASH}:volcando:{uuid.uuid4().hex}"
+            try:
+                redis.rename(CLAVE_HASH, temporal)
+            except Exception:
+                return pendientes  # No había actividad registrada
+            for clave, valor in redis.hgetall(temporal).items():
+                clave = clave.decode() if isinstance(clave, bytes) else clave
+                pendientes[clave] = max(float(valor), pendientes.get(clave, 0))
+            redis.delete(temporal)
+        return pendientes
+
+    def volcar(self):
+        """Actualiza ``ultima_actividad`` de las sesiones activas en lotes"""
+        from core.models_auditoria import SesionUsuario
+
+        pendientes = self._tomar_pendientes()
+        if not pendientes:
+            return 0
+
+        claves = list(pendientes)
+        actualizadas = 0
+        for i in range(0, len(claves), TAMANO_LOTE):
+            lote = claves[i:i + TAMANO_LOTE]
+            casos = [
+                When(session_key=clave, then=Value(
+                    datetime.fromtimestamp(pendientes[clave], tz=dt_timezone.utc)
+                ))
+                for clave in lote
+            ]
+            actualizadas += SesionUsuario.objects.filter(
+                session_key__in=lote, activa=True
+            ).update(ultima_actividad=Case(*casos, output_field=DateTimeField()))
+        return actualizadas
+
+    def _podar_throttle(self, ahora):
+        limite = ahora - RESOLUCION
+        self._ultimo_registro = {
+            k: v for k, v in self._ultimo_registro.items() if v >= limite
+        }
+
+    def _asegurar_hilo_local(self):
+        """Sin Redis, cada proceso vuelca su propio dict en segundo plano"""
+        if self._hilo_local is not None and self._hilo_local.is_alive():
+            return
+        with self._lock:
+            if self._hilo_local is not None and self._hilo_local.is_alive():
+                return
+            self._hilo_local = threading.Thread(target=self._volcado_local, daemon=True)
+            self._hilo_local.start()
+
+    def _volcado_local(self):
+        from django.db import close_old_connections
+        while True:
+            time.sleep(INTERVALO_VOLCADO)
+            try:
+                self.volcar()
+            except Exception as e:
+                logger.error(f"Error volcando actividad de sesiones: {e}")
+            finally:
+                close_old_connections()
+
+
+registro_actividad = RegistroActividadSesiones()
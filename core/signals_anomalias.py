@@ -0,0 +1,43 @@
+"""
+Alimenta el detector de anomalías con cada evento de auditoría confirmado.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .detector_auditoria import detector_auditoria
+from .models_auditoria import LogAccion, LogDescargaArchivo, SesionUsuario
+
+logger = logging.getLogger(__name__)
+
+
+def _al_confirmar(funcion, *args):
+    def ejecutar():
+        try:
+            funcion(*args)
+        except Exception as e:
+            logger.error(f"Error en el detector de auditoría: {e}", exc_info=True)
+    transaction.on_commit(ejecutar)
+
+
+@receiver(post_save, sender=LogAccion, dispatch_uid='anomalias_log_accion')
+def accion_registrada(sender, instance, created, **kwargs):
+    if created and instance.usuario_id:
+        _al_confirmar(
+            detector_auditoria.registrar_accion,
+            instance.usuario_id, instance.accion, instance.timestamp, instance.ip_address,
+        )
+
+
+@receiver(post_save, sender=SesionUsuario, dispatch_uid='anomalias_sesion')
+def sesion_iniciada(sender, instance, created, **kwargs):
+    if created and instance.activa:
+        _al_confirmar(detector_auditoria.registrar_sesion, instance.usuario_id)
+
+
+@receiver(post_save, sender=LogDescargaArchivo, dispatch_uid='anomalias_descarga')
+def descarga_registrada(sender, instance, created, **kwargs):
+    if created and instance.usuario_id:
+        _al_confirmar(detector_auditoria.registrar_descarga, instance.usuario_id)
@@ -8,7 +8,6 @@ from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.core.serializers import serialize
 import json
-import hashlib
 from datetime import datetime, time
 
 # Thread local para almacenar información de la request
@@ -63,13 +62,16 @@ def es_fuera_horario():
 
 
 def calcular_hash_archivo(archivo):
-    """Calcula el hash SHA256 de un archivo"""
+    """Calcula el hash SHA256 de un archivo (usa el registrado en la fila si existe)"""
     if not archivo:
         return ''
+    registrado = getattr(getattr(archivo, 'instance', None), 'sha256', '')
+    if registrado:
+        return registrado
     try:
-        archivo.seek(0)
-        return hashlib.sha256(archivo.read()).hexdigest()
-    except:
+        from core.almacenamiento import hash_streaming
+        return hash_streaming(archivo)[0]
+    except Exception:
         return ''
 
 
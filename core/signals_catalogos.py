@@ -0,0 +1,19 @@
+"""
+Invalidación de los catálogos en memoria (ver core.catalogos).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.catalogos import invalidar_catalogos
+
+MODELOS_CATALOGO = ('core.Provincia', 'core.Municipio', 'core.Localidad', 'core.Sexo', 'core.Institucion')
+
+
+def _invalidar(sender, **kwargs):
+    # Al confirmar: otro worker no debe recargar antes de que el cambio sea visible
+    transaction.on_commit(invalidar_catalogos)
+
+
+for _modelo in MODELOS_CATALOGO:
+    receiver([post_save, post_delete], sender=_modelo, dispatch_uid=f'catalogos_{_modelo}')(_invalidar)
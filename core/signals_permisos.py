@@ -0,0 +1,44 @@
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import Profile
+from .permisos import invalidar_permisos as _invalidar_permisos, invalidar_todos as _invalidar_todos
+
+
+# Se invalida al confirmar la transacción: si se borrara antes, un request
+# concurrente podría volver a cachear el snapshot viejo hasta su TTL
+
+
+def invalidar_permisos(*user_ids):
+    transaction.on_commit(lambda: _invalidar_permisos(*user_ids))
+
+
+def invalidar_todos():
+    transaction.on_commit(_invalidar_todos)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_permisos_grupos(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalida snapshots al agregar/quitar grupos (desde el usuario o desde el grupo)"""
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        invalidar_permisos(instance.pk)
+    elif action == 'pre_clear':
+        # En un clear desde el grupo no llega pk_set: tomar los usuarios antes
+        invalidar_permisos(*list(instance.user_set.values_list('pk', flat=True)))
+    elif pk_set:
+        invalidar_permisos(*pk_set)
+
+
+@receiver(post_save, sender=Profile)
+def invalidar_permisos_perfil(sender, instance, **kwargs):
+    invalidar_permisos(instance.user_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidar_permisos_grupo(sender, instance, **kwargs):
+    invalidar_todos()
@@ -0,0 +1,153 @@
+"""
+Tareas periódicas del sistema.
+
+Se registran en ``core.scheduler.programador`` y las ejecuta un único
+proceso del cluster (``manage.py run_scheduler``).
+"""
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .cache_protegido import guardar
+from .scheduler import programador
+
+logger = logging.getLogger(__name__)
+
+MINUTO = 60
+HORA = 60 * MINUTO
+DIA = 24 * HORA
+
+
+@programador.tarea('sesiones_actividad', intervalo=30, timeout=25, jitter=0)
+def sesiones_actividad():
+    """Vuelca en bloque la última actividad de las sesiones registrada en Redis"""
+    from .session_activity import registro_actividad
+    return f"{registro_actividad.volcar()} sesiones actualizadas"
+
+
+@programador.tarea('operaciones_masivas', intervalo=15, timeout=10 * MINUTO, jitter=0)
+def operaciones_masivas():
+    """Ejecuta por lotes las operaciones masivas pendientes o interrumpidas"""
+    from .operaciones_masivas import ejecutar_pendientes
+    return f"{ejecutar_pendientes(limite_segundos=8 * MINUTO)} operaciones ejecutadas"
+
+
+@programador.tarea('alertas_barrido', intervalo=HORA, timeout=30 * MINUTO)
+def alertas_barrido():
+    """Regenera las alertas de los ciudadanos con legajos abiertos"""
+    from legajos.models import LegajoAtencion
+    from legajos.services_alertas import AlertasService
+
+    ciudadanos = (
+        LegajoAtencion.objects
+        .exclude(estado='CERRADO')
+        .values_list('ciudadano_id', flat=True)
+        .distinct()
+    )
+    total = 0
+    for ciudadano_id in ciudadanos.iterator(chunk_size=500):
+        AlertasService.generar_alertas_ciudadano(ciudadano_id)
+        total += 1
+    return f"{total} ciudadanos procesados"
+
+
+@programador.tarea('dashboard_rollup', intervalo=5 * MINUTO, timeout=2 * MINUTO)
+def dashboard_rollup():
+    """Recalcula los contadores del dashboard antes de que venzan en cache"""
+    from django.contrib.auth.models import User
+    from legajos.models import Ciudadano
+    from dashboard.utils import CACHE_TIMEOUT
+
+    usuarios = User.objects.count()
+    ciudadanos = Ciudadano.objects.count()
+    guardar('contar_usuarios', usuarios, CACHE_TIMEOUT, gracia=5 * MINUTO)
+    guardar('contar_ciudadanos', ciudadanos, CACHE_TIMEOUT, gracia=5 * MINUTO)
+    return f"usuarios={usuarios} ciudadanos={ciudadanos}"
+
+
+@programador.tarea('particiones_mantenimiento', intervalo=DIA, timeout=2 * HORA)
+def particiones_mantenimiento():
+    """Crea particiones futuras, archiva las viejas y optimiza índices"""
+    from .advanced_partitioning import partition_manager
+    partition_manager.create_future_partitions()
+    partition_manager.archive_old_partitions()
+    partition_manager.optimize_partition_indexes()
+
+
+@programador.tarea('optimizador_queries', intervalo=5 * MINUTO, timeout=4 * MINUTO)
+def optimizador_queries():
+    """Analiza patrones de queries y genera sugerencias"""
+    from .intelligent_query_optimizer import query_optimizer
+    query_optimizer.analyze_query_patterns()
+    query_optimizer.generate_optimization_suggestions()
+    query_optimizer.update_performance_metrics()
+
+
+@programador.tarea('analisis_indices', intervalo=30 * MINUTO, timeout=15 * MINUTO)
+def analisis_indices():
+    """Analiza uso de índices y genera sugerencias"""
+    from .intelligent_indexing import index_manager
+    index_manager.analyze_query_patterns_for_indexes()
+    index_manager.analyze_existing_index_usage()
+    index_manager.generate_index_suggestions()
+    index_manager.cleanup_unused_indexes()
+
+
+@programador.tarea('estadisticas_fase2', intervalo=5 * MINUTO, timeout=2 * MINUTO)
+def estadisticas_fase2():
+    """Consolida las estadísticas de Fase 2 en cache"""
+    from .phase2_manager import phase2_manager
+    phase2_manager.update_consolidated_stats()
+
+
+@programador.tarea('duplicados_ciudadanos', intervalo=DIA, timeout=HORA)
+def duplicados_ciudadanos():
+    """Agrega a la cola de revisión los posibles ciudadanos duplicados"""
+    from legajos.services_duplicados import DetectorDuplicados
+    resultado = DetectorDuplicados().ejecutar()
+    return f"{resultado.candidatos} candidatos, {resultado.nuevos} nuevos en {resultado.segundos}s"
+
+
+@programador.tarea('series_reconciliar', intervalo=DIA, timeout=30 * MINUTO)
+def series_reconciliar():
+    """Recalcula desde la base los últimos días de las series de tiempo; carga completa las que no están"""
+    from .series_tiempo import DIAS_CARGA_INICIAL, cargada_desde, reconstruir, series_registradas
+    hoy = timezone.localdate()
+    series = series_registradas()
+    cargadas = 0
+    for serie in series:
+        if cargada_desde(serie.metrica) is None:
+            reconstruir(serie, hoy - timedelta(days=DIAS_CARGA_INICIAL), hoy)
+            cargadas += 1
+        else:
+            reconstruir(serie, hoy - timedelta(days=2), hoy)
+    return f"{len(series)} series reconciliadas ({cargadas} cargadas completas)"
+
+
+@programador.tarea('agenda_vencimientos', intervalo=HORA, timeout=15 * MINUTO)
+def agenda_vencimientos():
+    """Recordatorios y alertas de los próximos contactos que vencen; se despierta para el siguiente"""
+    from legajos.services_agenda import procesar_vencimientos
+    recordados, vencidos, siguiente = procesar_vencimientos()
+    return f"{recordados} recordatorios, {vencidos} vencidos, próximo {siguiente.isoformat() if siguiente else '-'}"
+
+
+@programador.tarea('conversaciones_inactivas', intervalo=5 * MINUTO, timeout=4 * MINUTO)
+def conversaciones_inactivas():
+    """Cierra o devuelve a la cola las conversaciones inactivas y rebalancea la carga"""
+    from conversaciones.services import DepuradorInactivas
+    resultado = DepuradorInactivas.depurar()
+    return (
+        f"{resultado['cerradas']} cerradas, {resultado['reasignadas']} devueltas a la cola, "
+        f"{resultado['asignadas']} asignadas"
+    )
+
+
+@programador.tarea('limpiar_historial_tareas', intervalo=DIA, timeout=10 * MINUTO)
+def limpiar_historial_tareas():
+    """Elimina el historial de ejecuciones con más de 30 días"""
+    from .models import EjecucionTarea
+    limite = timezone.now() - timedelta(days=30)
+    eliminadas, _ = EjecucionTarea.objects.filter(inicio__lt=limite).delete()
+    return f"{eliminadas} ejecuciones eliminadas"
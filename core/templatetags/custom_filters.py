@@ -1,14 +1,14 @@
 from django import template
 
+from core.permisos import grupos_usuario
+
 register = template.Library()
 
 
 @register.filter
 def has_group(user, group_name):
     try:
-        if not hasattr(user, "cached_groups"):
-            user.cached_groups = list(user.groups.values_list("name", flat=True))
-        return group_name in user.cached_groups or user.is_superuser
+        return group_name in grupos_usuario(user) or user.is_superuser
     except Exception:
         return False
 
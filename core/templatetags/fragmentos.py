@@ -0,0 +1,58 @@
+from django import template
+
+from core.fragment_cache import TIMEOUT_FRAGMENTO, obtener_fragmento
+
+register = template.Library()
+
+
+class FragmentoNode(template.Node):
+    def __init__(self, nodelist, nombre, objetos, timeout):
+        self.nodelist = nodelist
+        self.nombre = nombre
+        self.objetos = objetos
+        self.timeout = timeout
+
+    def render(self, context):
+        objetos = [obj.resolve(context) for obj in self.objetos]
+        timeout = self.timeout.resolve(context) if self.timeout else TIMEOUT_FRAGMENTO
+        usuario = context.get('user')
+        if usuario is None and context.get('request') is not None:
+            usuario = getattr(context['request'], 'user', None)
+        return obtener_fragmento(
+            self.nombre, objetos, usuario,
+            lambda: self.nodelist.render(context),
+            timeout=int(timeout),
+        )
+
+
+@register.tag
+def fragmento(parser, token):
+    """
+    Cachea un bloque según las versiones de los objetos de los que depende.
+    Usage: {% fragmento "legajo_alertas" legajo legajo.ciudadano timeout=600 %}...{% endfragmento %}
+
+    No usar con bloques que incluyan {% csrf_token %} u otro contenido por request.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' requiere un nombre y al menos un objeto"
+        )
+
+    nombre = bits[1]
+    if not (nombre[0] == nombre[-1] and nombre[0] in ('"', "'")):
+        raise template.TemplateSyntaxError(f"'{bits[0]}': el nombre debe ir entre comillas")
+
+    objetos = []
+    timeout = None
+    for bit in bits[2:]:
+        if bit.startswith('timeout='):
+            timeout = parser.compile_filter(bit[len('timeout='):])
+        else:
+            objetos.append(parser.compile_filter(bit))
+    if not objetos:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' requiere al menos un objeto")
+
+    nodelist = parser.parse(('endfragmento',))
+    parser.delete_first_token()
+    return FragmentoNode(nodelist, nombre[1:-1], objetos, timeout)
@@ -13,6 +13,9 @@ class DailyFileHandler(logging.FileHandler):
 
     Cada instancia genera un archivo de log dentro de una carpeta con la fecha
     actual, facilitando la organización y revisión de registros.
+
+    Legado: la carpeta se elige al construirlo y no cambia de día. La
+    configuración de LOGGING usa ``core.log_asincrono.ManejadorCola``.
     """
 
     def __init__(self, filename, mode="a", encoding=None, delay=False):
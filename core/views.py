@@ -2,35 +2,32 @@
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.shortcuts import render
-from django.views.decorators.http import require_GET
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 
-from core.models import (
-    Localidad,
-    Municipio,
-)
+from core import catalogos
 
 
 @login_required
 @require_GET
+@cache_control(private=True, max_age=catalogos.HTTP_MAX_AGE)
+@condition(etag_func=lambda request: catalogos.etag("m", request.GET.get("provincia_id", "")))
 def load_municipios(request):
     """Carga municipios filtrados por provincia."""
-    provincia_id = request.GET.get("provincia_id")
-    municipios = Municipio.objects.filter(provincia=provincia_id).select_related('provincia')
-    return JsonResponse(list(municipios.values("id", "nombre")), safe=False)
+    provincia_id = catalogos.id_entero(request.GET.get("provincia_id"))
+    municipios = catalogos.obtener_catalogos().municipios_de(provincia_id)
+    return JsonResponse([opcion._asdict() for opcion in municipios], safe=False)
 
 
 @login_required
 @require_GET
+@cache_control(private=True, max_age=catalogos.HTTP_MAX_AGE)
+@condition(etag_func=lambda request: catalogos.etag("l", request.GET.get("municipio_id", "")))
 def load_localidad(request):
     """Carga localidades filtradas por municipio."""
-    municipio_id = request.GET.get("municipio_id")
-
-    if municipio_id:
-        localidades = Localidad.objects.filter(municipio=municipio_id).select_related('municipio')
-    else:
-        localidades = Localidad.objects.none()
-
-    return JsonResponse(list(localidades.values("id", "nombre")), safe=False)
+    municipio_id = catalogos.id_entero(request.GET.get("municipio_id"))
+    localidades = catalogos.obtener_catalogos().localidades_de(municipio_id)
+    return JsonResponse([opcion._asdict() for opcion in localidades], safe=False)
 
 
 @login_required
@@ -7,6 +7,7 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 from django.core.paginator import Paginator
 from django.contrib import messages
+from core.permisos import tiene_grupo
 import csv
 import json
 
@@ -20,7 +21,7 @@ from .models_auditoria_extendida import (
 
 def es_administrador(user):
     """Verificar si el usuario es administrador"""
-    return user.is_authenticated and (user.is_superuser or user.groups.filter(name='Administrador').exists())
+    return tiene_grupo(user, 'Administrador')
 
 
 @login_required
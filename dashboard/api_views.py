@@ -161,30 +161,24 @@ def tendencias_datos(request):
     dias_map = {'7d': 7, '30d': 30, '90d': 90}
     dias = dias_map.get(periodo, 30)
     
+    fecha_inicio = timezone.now().date() - timedelta(days=dias)
+    fecha_fin = fecha_inicio + timedelta(days=dias - 1)
+    labels = [(fecha_inicio + timedelta(days=i)).strftime('%d/%m') for i in range(dias)]
+    try:
+        from core.series_tiempo import vector_diario
+        from legajos.series import LEGAJOS_APERTURA
+        return Response({'labels': labels, 'datos': vector_diario(LEGAJOS_APERTURA.metrica, fecha_inicio, fecha_fin)})
+    except Exception as e:
+        logger.warning(f"Serie de legajos no disponible, se agrega desde la base: {e}")
+
     try:
-        fecha_inicio = timezone.now().date() - timedelta(days=dias)
-        
-        # Optimizado: Una sola query con agregación
-        from django.db.models.functions import TruncDate
         legajos_por_fecha = LegajoAtencion.objects.filter(
-            fecha_apertura__gte=fecha_inicio
-        ).annotate(
-            fecha=TruncDate('fecha_apertura')
-        ).values('fecha').annotate(
+            fecha_apertura__range=(fecha_inicio, fecha_fin)
+        ).values('fecha_apertura').annotate(
             count=Count('id')
-        ).order_by('fecha')
-        
-        # Crear diccionario para lookup rápido
-        datos_dict = {item['fecha']: item['count'] for item in legajos_por_fecha}
-        
-        # Generar arrays completos
-        datos = []
-        labels = []
-        for i in range(dias):
-            fecha = fecha_inicio + timedelta(days=i)
-            datos.append(datos_dict.get(fecha, 0))
-            labels.append(fecha.strftime('%d/%m'))
-        
+        )
+        datos_dict = {item['fecha_apertura']: item['count'] for item in legajos_por_fecha}
+        datos = [datos_dict.get(fecha_inicio + timedelta(days=i), 0) for i in range(dias)]
         return Response({'labels': labels, 'datos': datos})
     except Exception as e:
         logger.error(f"Error en tendencias: {e}", exc_info=True)
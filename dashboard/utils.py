@@ -7,6 +7,7 @@ from django.core.exceptions import ImproperlyConfigured
 from django.db import connection
 from django.db.utils import OperationalError, ProgrammingError
 from django.contrib.auth.models import User
+from core.cache_protegido import obtener_o_calcular
 from legajos.models import Ciudadano
 
 logger = logging.getLogger(__name__)
@@ -33,21 +34,11 @@ CACHE_TIMEOUT = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300)
 
 def contar_usuarios():
     """Contar la cantidad total de usuarios."""
-    cache_key = "contar_usuarios"
-    cached_value = cache.get(cache_key)
-    if cached_value is None:
-        cached_value = User.objects.count()
-        cache.set(cache_key, cached_value, timeout=CACHE_TIMEOUT)
-    return cached_value
+    return obtener_o_calcular("contar_usuarios", User.objects.count, CACHE_TIMEOUT)
 
 def contar_ciudadanos():
     """Contar la cantidad total de ciudadanos."""
-    cache_key = "contar_ciudadanos"
-    cached_value = cache.get(cache_key)
-    if cached_value is None:
-        cached_value = Ciudadano.objects.count()
-        cache.set(cache_key, cached_value, timeout=CACHE_TIMEOUT)
-    return cached_value
+    return obtener_o_calcular("contar_ciudadanos", Ciudadano.objects.count, CACHE_TIMEOUT)
 
 def invalidate_dashboard_cache():
     """Invalida el caché del dashboard."""
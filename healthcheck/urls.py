@@ -1,7 +1,8 @@
 from django.urls import path
 
-from .views import health_check
+from .views import db_pool_status, health_check
 
 urlpatterns = [
     path("health/", health_check, name="health_check"),
+    path("health/db-pool/", db_pool_status, name="db_pool_status"),
 ]
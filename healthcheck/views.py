@@ -1,5 +1,16 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from core.db.pool import estadisticas_pools
 
 
 def health_check(request):
     return HttpResponse("OK", status=200)
+
+
+def db_pool_status(request):
+    """Métricas del pool de conexiones del worker que atiende el request (staff o IPs internas)"""
+    interna = request.META.get("REMOTE_ADDR") in getattr(settings, "INTERNAL_IPS", ())
+    if not interna and not request.user.is_staff:
+        return JsonResponse({"error": "No autorizado"}, status=403)
+    return JsonResponse({"pools": estadisticas_pools()})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Ciudadano, Profesional, LegajoAtencion, Consentimiento, EvaluacionInicial, Objetivo, PlanIntervencion, SeguimientoContacto, Derivacion, EventoCritico, Adjunto, AlertaEventoCritico
+from .models import Ciudadano, Profesional, LegajoAtencion, Consentimiento, EvaluacionInicial, Objetivo, PlanIntervencion, SeguimientoContacto, Derivacion, EventoCritico, Adjunto, AlertaEventoCritico, DuplicadoCiudadano, ItemAgenda
 
 
 @admin.register(Ciudadano)
@@ -163,9 +163,10 @@ class EventoCriticoAdmin(admin.ModelAdmin):
 
 @admin.register(Adjunto)
 class AdjuntoAdmin(admin.ModelAdmin):
-    list_display = ['etiqueta', 'content_type', 'object_id', 'creado']
+    list_display = ['etiqueta', 'nombre_original', 'content_type', 'object_id', 'tamano', 'creado']
     list_filter = ['content_type', 'creado']
-    search_fields = ['etiqueta']
+    search_fields = ['etiqueta', 'nombre_original', 'sha256']
+    readonly_fields = ['sha256', 'tamano']
 
 
 @admin.register(AlertaEventoCritico)
@@ -179,6 +180,57 @@ class AlertaEventoCriticoAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('evento__legajo__ciudadano', 'responsable')
 
 
+
+@admin.register(DuplicadoCiudadano)
+class DuplicadoCiudadanoAdmin(admin.ModelAdmin):
+    list_display = ['ciudadano_a', 'ciudadano_b', 'puntaje', 'estado', 'revisado_por', 'fecha_revision']
+    list_filter = ['estado']
+    search_fields = ['ciudadano_a__dni', 'ciudadano_a__apellido', 'ciudadano_b__dni', 'ciudadano_b__apellido']
+    readonly_fields = ['ciudadano_a', 'ciudadano_b', 'puntaje', 'motivos', 'revisado_por', 'fecha_revision', 'creado', 'modificado']
+    actions = ['fusionar_conservando_a', 'fusionar_conservando_b', 'descartar']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ciudadano_a', 'ciudadano_b', 'revisado_por')
+
+    def _fusionar(self, request, queryset, campo):
+        from .services_duplicados import fusionar
+        fusionados = 0
+        for duplicado in queryset.filter(estado=DuplicadoCiudadano.Estado.PENDIENTE):
+            conflictos = fusionar(duplicado, getattr(duplicado, campo), request.user)
+            if conflictos:
+                self.message_user(request, f"{duplicado}: relaciones sin mover {', '.join(conflictos)}", level='warning')
+            fusionados += 1
+        self.message_user(request, f"{fusionados} pares fusionados")
+
+    @admin.action(description='Fusionar conservando el ciudadano A')
+    def fusionar_conservando_a(self, request, queryset):
+        self._fusionar(request, queryset, 'ciudadano_a_id')
+
+    @admin.action(description='Fusionar conservando el ciudadano B')
+    def fusionar_conservando_b(self, request, queryset):
+        self._fusionar(request, queryset, 'ciudadano_b_id')
+
+    @admin.action(description='Descartar (no son la misma persona)')
+    def descartar(self, request, queryset):
+        from .services_duplicados import descartar
+        pendientes = list(queryset.filter(estado=DuplicadoCiudadano.Estado.PENDIENTE))
+        for duplicado in pendientes:
+            descartar(duplicado, request.user)
+        self.message_user(request, f"{len(pendientes)} pares descartados")
+
+
+@admin.register(ItemAgenda)
+class ItemAgendaAdmin(admin.ModelAdmin):
+    list_display = ['legajo', 'profesional', 'vence', 'estado', 'proximo_aviso']
+    list_filter = ['estado', 'vence']
+    search_fields = ['legajo__codigo', 'legajo__ciudadano__dni', 'profesional__username']
+    readonly_fields = ['contacto', 'legajo', 'profesional', 'alerta', 'recordado', 'creado', 'modificado']
+    date_hierarchy = 'vence'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('legajo', 'profesional')
+
+
 # Registrar modelos de contactos en admin
 try:
     from .models_contactos import (
@@ -187,4 +239,5 @@ try:
     )
     from .admin_contactos import *
 except ImportError:
-    pass
\ No newline at end of file
+    pass
+
@@ -16,6 +16,7 @@ from .serializers import (
 )
 from .services_alertas import AlertasService
 from .services_filtros_usuario import FiltrosUsuarioService
+from core.respuestas_condicionales import RespuestaCondicionalMixin
 
 
 @extend_schema_view(
@@ -26,13 +27,15 @@ from .services_filtros_usuario import FiltrosUsuarioService
     partial_update=extend_schema(description="Actualiza parcialmente un ciudadano"),
     destroy=extend_schema(description="Elimina un ciudadano")
 )
-class CiudadanoViewSet(viewsets.ModelViewSet):
+class CiudadanoViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar ciudadanos.
     
     Permite realizar operaciones CRUD sobre los ciudadanos del sistema.
     """
     queryset = Ciudadano.objects.prefetch_related('legajos__dispositivo', 'legajos__responsable').annotate(legajos_count=Count('legajos'))
+    queryset_validador = Ciudadano.objects.all()
+    agregados_condicionales = ('legajos',)
     serializer_class = CiudadanoSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -50,7 +53,7 @@ class CiudadanoViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(description="Actualiza parcialmente un legajo"),
     destroy=extend_schema(description="Elimina un legajo")
 )
-class LegajoAtencionViewSet(viewsets.ModelViewSet):
+class LegajoAtencionViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar legajos de atención.
     
@@ -60,6 +63,9 @@ class LegajoAtencionViewSet(viewsets.ModelViewSet):
         seguimientos_count=Count('seguimientos'),
         eventos_count=Count('eventos')
     )
+    queryset_validador = LegajoAtencion.objects.all()
+    campos_condicionales = ('modificado', 'ciudadano__modificado')
+    agregados_condicionales = ('legajos',)
     serializer_class = LegajoAtencionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -140,7 +146,7 @@ class LegajoAtencionViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(description="Actualiza parcialmente una evaluación"),
     destroy=extend_schema(description="Elimina una evaluación")
 )
-class EvaluacionInicialViewSet(viewsets.ModelViewSet):
+class EvaluacionInicialViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar evaluaciones iniciales.
     """
@@ -159,7 +165,7 @@ class EvaluacionInicialViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(description="Actualiza parcialmente un plan"),
     destroy=extend_schema(description="Elimina un plan")
 )
-class PlanIntervencionViewSet(viewsets.ModelViewSet):
+class PlanIntervencionViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar planes de intervención.
     """
@@ -178,7 +184,7 @@ class PlanIntervencionViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(description="Actualiza parcialmente un seguimiento"),
     destroy=extend_schema(description="Elimina un seguimiento")
 )
-class SeguimientoContactoViewSet(viewsets.ModelViewSet):
+class SeguimientoContactoViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar seguimientos de contacto.
     """
@@ -198,7 +204,7 @@ class SeguimientoContactoViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(description="Actualiza parcialmente una derivación"),
     destroy=extend_schema(description="Elimina una derivación")
 )
-class DerivacionViewSet(viewsets.ModelViewSet):
+class DerivacionViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar derivaciones entre dispositivos.
     """
@@ -218,7 +224,7 @@ class DerivacionViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(description="Actualiza parcialmente un evento"),
     destroy=extend_schema(description="Elimina un evento")
 )
-class EventoCriticoViewSet(viewsets.ModelViewSet):
+class EventoCriticoViewSet(RespuestaCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar eventos críticos.
     """
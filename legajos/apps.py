@@ -13,4 +13,10 @@ class LegajosConfig(AppConfig):
     
     def ready(self):
         import legajos.signals_alertas
+        import legajos.signals_timeline
+        import legajos.signals_red
+        import legajos.signals_fragmentos
+        import legajos.signals_condicionales
+        import legajos.series
+        import legajos.operaciones_masivas
     verbose_name = 'Legajos'
\ No newline at end of file
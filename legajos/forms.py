@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.models import User
 from django.db import models
 from .models import Ciudadano, LegajoAtencion, Consentimiento, EvaluacionInicial, Objetivo, PlanIntervencion, SeguimientoContacto, Derivacion, EventoCritico, InscriptoActividad, PlanFortalecimiento
+from core.catalogos import asignar_opciones, obtener_catalogos
 from core.models import DispositivoRed
 
 
@@ -363,6 +364,7 @@ class DerivacionForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         
         self.fields['destino'].queryset = self.fields['destino'].queryset.filter(activo=True)
+        asignar_opciones(self.fields['destino'], obtener_catalogos().instituciones_activas, etiqueta='etiqueta')
         self.fields['actividad_destino'].required = False
         
         from .models import PlanFortalecimiento
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from legajos.services_timeline import TimelineService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la línea de tiempo desnormalizada (ActividadCiudadano) desde los modelos de origen'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ciudadano', type=int, help='Reconstruir solo la línea de tiempo de este ciudadano')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tamaño de lote para bulk_create')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Reconstruyendo línea de tiempo de ciudadanos...')
+
+        total = TimelineService.backfill(
+            ciudadano_id=options.get('ciudadano'),
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Línea de tiempo reconstruida: {total} actividades'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from core.almacenamiento import guardar_contenido, hash_streaming
+from legajos.models import Adjunto
+
+
+class Command(BaseCommand):
+    help = 'Registra hash y tamaño de adjuntos anteriores y opcionalmente los pasa al almacenamiento por contenido'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mover', action='store_true', help='Reubicar los archivos como blobs por SHA-256 (deduplicando)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Adjuntos por lote')
+
+    def handle(self, *args, **options):
+        pendientes = Adjunto.objects.filter(sha256='').exclude(archivo='').only('id', 'archivo', 'nombre_original')
+        procesados = duplicados = faltantes = 0
+
+        for adjunto in pendientes.iterator(chunk_size=options['batch_size']):
+            storage = adjunto.archivo.storage
+            nombre_anterior = adjunto.archivo.name
+            if not storage.exists(nombre_anterior):
+                faltantes += 1
+                continue
+
+            nombre_original = adjunto.nombre_original or nombre_anterior.split('/')[-1]
+            with storage.open(nombre_anterior, 'rb') as archivo:
+                if options['mover']:
+                    guardado = guardar_contenido(archivo, nombre_original, prefijo='adjuntos')
+                    sha256, tamano = guardado.sha256, guardado.tamano
+                    duplicados += guardado.duplicado
+                else:
+                    sha256, tamano = hash_streaming(archivo)
+
+            campos = {'sha256': sha256, 'tamano': tamano, 'nombre_original': nombre_original}
+            if options['mover']:
+                campos['archivo'] = guardado.nombre
+            Adjunto.objects.filter(pk=adjunto.pk).update(**campos)
+
+            if options['mover'] and guardado.nombre != nombre_anterior:
+                if not Adjunto.objects.filter(archivo=nombre_anterior).exists():
+                    storage.delete(nombre_anterior)
+            procesados += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Adjuntos procesados: {procesados} (blobs ya existentes: {duplicados}, archivos faltantes: {faltantes})'
+        ))
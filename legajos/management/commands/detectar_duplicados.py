@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from legajos.services_duplicados import MAX_BLOQUE, UMBRAL, VENTANA, DetectorDuplicados
+
+
+class Command(BaseCommand):
+    help = 'Busca ciudadanos duplicados por bloques y los agrega a la cola de revisión'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--umbral', type=float, default=UMBRAL, help='Puntaje mínimo para proponer un par')
+        parser.add_argument('--max-bloque', type=int, default=MAX_BLOQUE, help='Tamaño hasta el que se comparan todos los pares de un bloque')
+        parser.add_argument('--ventana', type=int, default=VENTANA, help='Vecinos comparados en bloques grandes')
+        parser.add_argument('--dry-run', action='store_true', help='No guardar los pares encontrados')
+
+    def handle(self, *args, **options):
+        detector = DetectorDuplicados(umbral=options['umbral'], max_bloque=options['max_bloque'], ventana=options['ventana'])
+        resultado = detector.ejecutar(guardar=not options['dry_run'])
+
+        for esquema, comparaciones in sorted(resultado.por_esquema.items()):
+            self.stdout.write(f'  {esquema}: {comparaciones} comparaciones')
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.ciudadanos} ciudadanos, {resultado.comparaciones} comparaciones, '
+            f'{resultado.candidatos} candidatos ({resultado.nuevos} nuevos) en {resultado.segundos}s'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from legajos.services_agenda import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Carga la agenda de próximos contactos desde el historial reciente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help='Días hacia atrás de vencimientos a cargar')
+
+    def handle(self, *args, **options):
+        total = reconstruir(options['dias'])
+        self.stdout.write(self.style.SUCCESS(f'{total} ítems de agenda sincronizados'))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-19 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('legajos', '0014_remove_derivacion_origen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActividadCiudadano',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('APERTURA', 'Apertura'), ('CIERRE', 'Cierre'), ('SEGUIMIENTO', 'Seguimiento'), ('EVALUACION', 'Evaluación'), ('PLAN', 'Plan de intervención'), ('DERIVACION', 'Derivación'), ('EVENTO', 'Evento crítico'), ('VINCULO', 'Vínculo'), ('ADJUNTO', 'Adjunto')], max_length=20)),
+                ('fecha', models.DateTimeField()),
+                ('descripcion', models.CharField(max_length=300)),
+                ('usuario_nombre', models.CharField(default='Sistema', max_length=150)),
+                ('legajo_codigo', models.CharField(default='General', max_length=40)),
+                ('object_id', models.CharField(max_length=64)),
+                ('ciudadano', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actividades_timeline', to='legajos.ciudadano')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('legajo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='actividades_timeline', to='legajos.legajoatencion')),
+            ],
+            options={
+                'verbose_name': 'Actividad de Ciudadano',
+                'verbose_name_plural': 'Actividades de Ciudadanos',
+                'ordering': ['-fecha', '-id'],
+                'indexes': [models.Index(fields=['ciudadano', '-fecha', '-id'], name='legajos_act_ciudada_35f096_idx'), models.Index(fields=['legajo', '-fecha'], name='legajos_act_legajo__46684f_idx')],
+                'unique_together': {('content_type', 'object_id', 'tipo')},
+            },
+        ),
+    ]
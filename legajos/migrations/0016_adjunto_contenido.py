@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legajos', '0015_actividadciudadano'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adjunto',
+            name='nombre_original',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='adjunto',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='adjunto',
+            name='tamano',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.20 on 2026-10-19 16:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('legajos', '0016_adjunto_contenido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicadoCiudadano',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('modificado', models.DateTimeField(auto_now=True)),
+                ('puntaje', models.FloatField(help_text='Similitud entre 0 y 1')),
+                ('motivos', models.JSONField(blank=True, default=dict)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('DESCARTADO', 'Descartado'), ('FUSIONADO', 'Fusionado')], default='PENDIENTE', max_length=12)),
+                ('fecha_revision', models.DateTimeField(blank=True, null=True)),
+                ('ciudadano_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicados_como_a', to='legajos.ciudadano')),
+                ('ciudadano_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicados_como_b', to='legajos.ciudadano')),
+                ('revisado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Posible Duplicado',
+                'verbose_name_plural': 'Posibles Duplicados',
+                'ordering': ['-puntaje'],
+                'indexes': [models.Index(fields=['estado', '-puntaje'], name='legajos_dup_estado_b41059_idx')],
+                'unique_together': {('ciudadano_a', 'ciudadano_b')},
+            },
+        ),
+    ]
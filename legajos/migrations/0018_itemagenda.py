@@ -0,0 +1,42 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('legajos', '0017_duplicadociudadano'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemAgenda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('modificado', models.DateTimeField(auto_now=True)),
+                ('vence', models.DateField()),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('RECORDADO', 'Recordado'), ('VENCIDO', 'Vencido'), ('CUMPLIDO', 'Cumplido')], default='PENDIENTE', max_length=12)),
+                ('proximo_aviso', models.DateTimeField(blank=True, null=True)),
+                ('recordado', models.DateTimeField(blank=True, null=True)),
+                ('alerta', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='legajos.alertaciudadano')),
+                ('contacto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='item_agenda', to='legajos.historialcontacto')),
+                ('legajo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agenda', to='legajos.legajoatencion')),
+                ('profesional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agenda', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Ítem de Agenda',
+                'verbose_name_plural': 'Agenda de Seguimientos',
+                'ordering': ['vence'],
+                'indexes': [
+                    models.Index(fields=['proximo_aviso'], name='legajos_ite_proximo_52bb46_idx'),
+                    models.Index(fields=['profesional', 'estado', 'vence'], name='legajos_ite_profesi_765593_idx'),
+                    models.Index(fields=['legajo', 'estado'], name='legajos_ite_legajo__6bc2b7_idx'),
+                ],
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+import os
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
@@ -546,6 +548,9 @@ class Adjunto(TimeStamped):
     content_object = GenericForeignKey("content_type", "object_id")
     archivo = models.FileField(upload_to="adjuntos/")
     etiqueta = models.CharField(max_length=120, blank=True)
+    nombre_original = models.CharField(max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    tamano = models.PositiveBigIntegerField(null=True, blank=True)
     
     class Meta:
         verbose_name = "Adjunto"
@@ -556,7 +561,26 @@ class Adjunto(TimeStamped):
         ]
     
     def __str__(self):
-        return f"Adjunto - {self.etiqueta or self.archivo.name}"
+        return f"Adjunto - {self.etiqueta or self.nombre_visible}"
+    
+    @property
+    def nombre_visible(self):
+        return self.nombre_original or self.archivo.name.split("/")[-1]
+    
+    def save(self, *args, **kwargs):
+        # Un archivo recién subido se guarda por contenido (ver core.almacenamiento)
+        if self.archivo and not self.archivo._committed:
+            from core.almacenamiento import guardar_contenido
+            
+            subido = self.archivo.file
+            nombre = os.path.basename(subido.name or self.archivo.name)
+            guardado = guardar_contenido(subido, nombre, prefijo="adjuntos")
+            self.archivo.name = guardado.nombre
+            self.archivo._committed = True
+            self.nombre_original = self.nombre_original or nombre
+            self.sha256 = guardado.sha256
+            self.tamano = guardado.tamano
+        super().save(*args, **kwargs)
 
 
 class AlertaEventoCritico(TimeStamped):
@@ -984,6 +1008,9 @@ from .models_contactos import (
     HistorialContacto, VinculoFamiliar, ProfesionalTratante,
     DispositivoVinculado, ContactoEmergencia
 )
+from .models_timeline import ActividadCiudadano
+from .models_duplicados import DuplicadoCiudadano
+from .models_agenda import ItemAgenda
 
 # Importar timezone
 from django.utils import timezone
@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+from core.models import TimeStamped
+from .models import AlertaCiudadano, LegajoAtencion
+from .models_contactos import HistorialContacto
+
+
+class ItemAgenda(TimeStamped):
+    """Próximo contacto comprometido en un ``HistorialContacto``.
+
+    Lo mantiene ``services_agenda``: ``proximo_aviso`` es el momento del
+    siguiente evento (recordatorio el día del vencimiento, alerta al día
+    siguiente) y queda en null cuando no hay más eventos.
+    """
+
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        RECORDADO = "RECORDADO", "Recordado"
+        VENCIDO = "VENCIDO", "Vencido"
+        CUMPLIDO = "CUMPLIDO", "Cumplido"
+
+    contacto = models.OneToOneField(
+        HistorialContacto,
+        on_delete=models.CASCADE,
+        related_name="item_agenda"
+    )
+    legajo = models.ForeignKey(
+        LegajoAtencion,
+        on_delete=models.CASCADE,
+        related_name="agenda"
+    )
+    profesional = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="agenda"
+    )
+    vence = models.DateField()
+    estado = models.CharField(max_length=12, choices=Estado.choices, default=Estado.PENDIENTE)
+    proximo_aviso = models.DateTimeField(null=True, blank=True)
+    recordado = models.DateTimeField(null=True, blank=True)
+    alerta = models.ForeignKey(
+        AlertaCiudadano,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+
+    class Meta:
+        verbose_name = "Ítem de Agenda"
+        verbose_name_plural = "Agenda de Seguimientos"
+        ordering = ["vence"]
+        indexes = [
+            models.Index(fields=["proximo_aviso"]),
+            models.Index(fields=["profesional", "estado", "vence"]),
+            models.Index(fields=["legajo", "estado"]),
+        ]
+
+    def __str__(self):
+        return f"{self.legajo_id} - {self.vence} ({self.get_estado_display()})"
@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+from core.models import TimeStamped
+from .models import Ciudadano
+
+
+class DuplicadoCiudadano(TimeStamped):
+    """Par de ciudadanos que podrían ser la misma persona (cola de revisión).
+
+    Los genera ``services_duplicados.DetectorDuplicados``; ``ciudadano_a`` es
+    siempre el de menor id.
+    """
+
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        DESCARTADO = "DESCARTADO", "Descartado"
+        FUSIONADO = "FUSIONADO", "Fusionado"
+
+    ciudadano_a = models.ForeignKey(
+        Ciudadano,
+        on_delete=models.CASCADE,
+        related_name="duplicados_como_a"
+    )
+    ciudadano_b = models.ForeignKey(
+        Ciudadano,
+        on_delete=models.CASCADE,
+        related_name="duplicados_como_b"
+    )
+    puntaje = models.FloatField(help_text="Similitud entre 0 y 1")
+    motivos = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=12, choices=Estado.choices, default=Estado.PENDIENTE)
+    revisado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    fecha_revision = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Posible Duplicado"
+        verbose_name_plural = "Posibles Duplicados"
+        ordering = ["-puntaje"]
+        unique_together = ["ciudadano_a", "ciudadano_b"]
+        indexes = [
+            models.Index(fields=["estado", "-puntaje"]),
+        ]
+
+    def __str__(self):
+        return f"{self.ciudadano_a_id} ~ {self.ciudadano_b_id} ({self.puntaje:.2f})"
@@ -0,0 +1,69 @@
+from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from .models import Ciudadano, LegajoAtencion
+
+
+class ActividadCiudadano(models.Model):
+    """Línea de tiempo desnormalizada de actividades de un ciudadano.
+
+    Cada fila es un snapshot listo para mostrar de un hecho registrado en
+    otro modelo (seguimiento, plan, derivación, etc.). Se mantiene mediante
+    signals y se reconstruye con el comando ``backfill_actividades``.
+    """
+
+    class Tipo(models.TextChoices):
+        APERTURA = "APERTURA", "Apertura"
+        CIERRE = "CIERRE", "Cierre"
+        SEGUIMIENTO = "SEGUIMIENTO", "Seguimiento"
+        EVALUACION = "EVALUACION", "Evaluación"
+        PLAN = "PLAN", "Plan de intervención"
+        DERIVACION = "DERIVACION", "Derivación"
+        EVENTO = "EVENTO", "Evento crítico"
+        VINCULO = "VINCULO", "Vínculo"
+        ADJUNTO = "ADJUNTO", "Adjunto"
+
+    ciudadano = models.ForeignKey(
+        Ciudadano,
+        on_delete=models.CASCADE,
+        related_name="actividades_timeline"
+    )
+    legajo = models.ForeignKey(
+        LegajoAtencion,
+        on_delete=models.CASCADE,
+        related_name="actividades_timeline",
+        null=True,
+        blank=True
+    )
+    tipo = models.CharField(max_length=20, choices=Tipo.choices)
+    fecha = models.DateTimeField()
+    descripcion = models.CharField(max_length=300)
+    usuario_nombre = models.CharField(max_length=150, default="Sistema")
+    legajo_codigo = models.CharField(max_length=40, default="General")
+
+    # Registro de origen (para actualizar/eliminar la entrada desde signals)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.CharField(max_length=64)
+
+    class Meta:
+        verbose_name = "Actividad de Ciudadano"
+        verbose_name_plural = "Actividades de Ciudadanos"
+        ordering = ["-fecha", "-id"]
+        unique_together = ["content_type", "object_id", "tipo"]
+        indexes = [
+            models.Index(fields=["ciudadano", "-fecha", "-id"]),
+            models.Index(fields=["legajo", "-fecha"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.ciudadano_id} ({self.fecha})"
+
+    def as_dict(self):
+        """Representación usada por la API de actividades"""
+        return {
+            'fecha_hora': self.fecha.isoformat(),
+            'tipo': self.tipo,
+            'descripcion': self.descripcion,
+            'usuario_nombre': self.usuario_nombre,
+            'legajo_id': str(self.legajo_id) if self.legajo_id else '-',
+            'legajo_codigo': self.legajo_codigo,
+        }
@@ -0,0 +1,146 @@
+"""
+Acciones masivas sobre legajos y ciudadanos (ver core.operaciones_masivas).
+
+Cada acción trabaja sobre un lote completo con bulk_update/update, así que
+no dispara las señales por fila: la auditoría queda en el ``LogAccion`` del
+lote y la línea de tiempo, las alertas y la cache se actualizan acá.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache_decorators import invalidate_cache_pattern
+from core.cache_utils import invalidate_cache_keys, invalidate_dashboard_cache
+from core.fragment_cache import incrementar_version
+from core.operaciones_masivas import accion_masiva
+from core.permisos import grupos_usuario
+
+from .models import Ciudadano, LegajoAtencion, SeguimientoContacto
+
+CAMBIAR_RESPONSABLE = 'legajos.cambiar_responsable'
+CERRAR_LEGAJOS = 'legajos.cerrar'
+DESACTIVAR_CIUDADANOS = 'legajos.desactivar_ciudadanos'
+
+
+def _nombre(usuario):
+    return usuario.get_full_name() or usuario.username
+
+
+def _invalidar_legajos():
+    invalidate_cache_pattern('legajos_list')
+
+
+def _invalidar_fragmentos(legajos):
+    """bulk_update no envía post_save: se hace lo de ``signals_fragmentos`` al confirmar"""
+    dependientes = {(LegajoAtencion, legajo.pk) for legajo in legajos}
+    dependientes |= {(Ciudadano, legajo.ciudadano_id) for legajo in legajos}
+
+    def invalidar():
+        for modelo, pk in dependientes:
+            incrementar_version(modelo, pk)
+    transaction.on_commit(invalidar)
+
+
+def _regenerar_alertas(ciudadano_ids):
+    from .services_alertas import AlertasService
+
+    def regenerar():
+        for ciudadano_id in ciudadano_ids:
+            AlertasService.generar_alertas_ciudadano(ciudadano_id)
+        _invalidar_legajos()
+    return regenerar
+
+
+@accion_masiva(CAMBIAR_RESPONSABLE, 'LegajoAtencion')
+def cambiar_responsable(lote):
+    """Asigna ``responsable_id`` a los legajos y deja constancia en las notas"""
+    nuevo = User.objects.filter(pk=lote.parametros.get('responsable_id'), is_active=True).first()
+    if nuevo is None or 'Ciudadanos' not in grupos_usuario(nuevo):
+        for pk in lote.ids:
+            lote.fallo(pk, 'El usuario seleccionado no tiene el rol adecuado')
+        return
+
+    operador = lote.operacion.usuario
+    es_admin = operador is not None and 'Administrador' in grupos_usuario(operador)
+    autor = _nombre(operador) if operador else 'operación masiva'
+
+    legajos = list(LegajoAtencion.objects.filter(pk__in=lote.ids).select_related('responsable'))
+    lote.marcar_faltantes(legajo.pk for legajo in legajos)
+    ahora = timezone.now()
+    modificados = []
+    for legajo in legajos:
+        if not es_admin and legajo.responsable_id != lote.operacion.usuario_id:
+            lote.fallo(legajo.pk, 'No tiene permisos para cambiar el responsable')
+            continue
+        if legajo.responsable_id != nuevo.pk:
+            nota = f"Responsable cambiado de {_nombre(legajo.responsable)} a {_nombre(nuevo)} por {autor}"
+            legajo.notas = f"{legajo.notas}\n\n{nota}" if legajo.notas else nota
+            legajo.responsable = nuevo
+            legajo.modificado = ahora
+            modificados.append(legajo)
+        lote.ok(legajo.pk)
+
+    LegajoAtencion.objects.bulk_update(modificados, ['responsable', 'notas', 'modificado'])
+    lote.resumen['responsable_id'] = nuevo.pk
+    _invalidar_fragmentos(modificados)
+    transaction.on_commit(_invalidar_legajos)
+
+
+@accion_masiva(CERRAR_LEGAJOS, 'LegajoAtencion')
+def cerrar_legajos(lote):
+    """Cierra los legajos con las mismas reglas que ``LegajoAtencion.cerrar``"""
+    from .services_timeline import TimelineService
+
+    motivo = (lote.parametros.get('motivo') or '').strip()
+    legajos = list(LegajoAtencion.objects.filter(pk__in=lote.ids))
+    lote.marcar_faltantes(legajo.pk for legajo in legajos)
+
+    hoy = timezone.localdate()
+    con_seguimiento = set(
+        SeguimientoContacto.objects.filter(
+            legajo_id__in=[legajo.pk for legajo in legajos],
+            creado__date__gte=hoy - timedelta(days=30),
+        ).values_list('legajo_id', flat=True).distinct()
+    )
+    ahora = timezone.now()
+    cerrados = []
+    for legajo in legajos:
+        if legajo.estado == LegajoAtencion.Estado.CERRADO:
+            lote.fallo(legajo.pk, 'El legajo ya está cerrado')
+            continue
+        if legajo.plan_vigente and legajo.pk not in con_seguimiento and not motivo:
+            lote.fallo(legajo.pk, 'Requiere seguimiento reciente o justificación para cerrar')
+            continue
+        legajo.estado = LegajoAtencion.Estado.CERRADO
+        legajo.fecha_cierre = hoy
+        if motivo:
+            nota = f"Motivo de cierre: {motivo}"
+            legajo.notas = f"{legajo.notas}\n\n{nota}" if legajo.notas else nota
+        legajo.modificado = ahora
+        cerrados.append(legajo)
+        lote.ok(legajo.pk)
+
+    LegajoAtencion.objects.bulk_update(cerrados, ['estado', 'fecha_cierre', 'notas', 'modificado'])
+    for legajo in cerrados:
+        TimelineService.sincronizar(legajo)
+    _invalidar_fragmentos(cerrados)
+    transaction.on_commit(_regenerar_alertas({legajo.ciudadano_id for legajo in cerrados}))
+
+
+@accion_masiva(DESACTIVAR_CIUDADANOS, 'Ciudadano')
+def desactivar_ciudadanos(lote):
+    """Marca los ciudadanos como inactivos"""
+    activos = dict(Ciudadano.objects.filter(pk__in=lote.ids).values_list('pk', 'activo'))
+    lote.marcar_faltantes(activos)
+    Ciudadano.objects.filter(pk__in=[pk for pk, activo in activos.items() if activo]).update(
+        activo=False, modificado=timezone.now(),
+    )
+    for pk in activos:
+        lote.ok(pk)
+
+    def invalidar():
+        invalidate_cache_keys(*[f"ciudadano_{pk}" for pk in activos])
+        invalidate_dashboard_cache()
+    transaction.on_commit(invalidar)
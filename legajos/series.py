@@ -0,0 +1,11 @@
+"""
+Series de tiempo de legajos (ver core.series_tiempo).
+"""
+from core.series_tiempo import registrar_serie
+
+CONTACTOS = registrar_serie(
+    'contactos', 'legajos.HistorialContacto', 'fecha_contacto', dimensiones=('tipo_contacto', 'estado'),
+)
+LEGAJOS_APERTURA = registrar_serie(
+    'legajos_apertura', 'legajos.LegajoAtencion', 'fecha_apertura', dimensiones=('estado', 'dispositivo_id'),
+)
@@ -0,0 +1,218 @@
+"""
+Agenda de próximos contactos por profesional.
+
+Cada ``HistorialContacto`` con ``fecha_proximo_contacto`` tiene un
+``ItemAgenda`` con el momento de su próximo evento en ``proximo_aviso``
+(indexado):
+
+- PENDIENTE: el día del vencimiento a las ``HORA_RECORDATORIO`` se le
+  recuerda al profesional (pasa a RECORDADO).
+- RECORDADO: si termina ese día sin contacto se genera la alerta de
+  seguimiento vencido (pasa a VENCIDO).
+- Un contacto exitoso posterior en el mismo legajo cierra los ítems abiertos
+  (CUMPLIDO) y sus alertas.
+
+La tarea ``agenda_vencimientos`` lee solo los ítems con
+``proximo_aviso <= ahora`` y se despierta para el siguiente, en vez de
+recorrer todos los legajos buscando seguimientos vencidos.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .models import AlertaCiudadano
+from .models_agenda import ItemAgenda
+from .models_contactos import EstadoContacto, HistorialContacto
+
+logger = logging.getLogger(__name__)
+
+TAREA = 'agenda_vencimientos'
+HORA_RECORDATORIO = 8
+LOTE = 500
+REINTENTO = timedelta(hours=1)
+MAX_ATRASADOS = 100
+
+Estado = ItemAgenda.Estado
+ABIERTOS = (Estado.PENDIENTE, Estado.RECORDADO, Estado.VENCIDO)
+
+
+def _momento(fecha, hora=0):
+    return timezone.make_aware(datetime.combine(fecha, time(hora)))
+
+
+def proximo_aviso(vence, estado):
+    """Momento del siguiente evento de un ítem en ese estado"""
+    if estado == Estado.PENDIENTE:
+        return _momento(vence, HORA_RECORDATORIO)
+    if estado == Estado.RECORDADO:
+        return _momento(vence + timedelta(days=1))
+    return None
+
+
+def despertar(momento):
+    """Adelanta la tarea de vencimientos si ``momento`` llega antes"""
+    if momento is None:
+        return
+    try:
+        from core.scheduler import programador
+        programador.despertar(TAREA, momento.timestamp())
+    except Exception as e:
+        # La tarea corre igual por intervalo
+        logger.warning(f"No se pudo despertar {TAREA}: {e}")
+
+
+def _cerrar_alertas(alerta_ids, ahora):
+    alerta_ids = [a for a in alerta_ids if a]
+    if alerta_ids:
+        AlertaCiudadano.objects.filter(pk__in=alerta_ids, activa=True).update(activa=False, fecha_cierre=ahora)
+
+
+# --- Altas y cambios ---
+
+def cerrar_cumplidos(contacto):
+    """Un contacto exitoso cumple los próximos contactos anteriores del legajo"""
+    ahora = timezone.now()
+    abiertos = ItemAgenda.objects.filter(
+        legajo_id=contacto.legajo_id,
+        estado__in=ABIERTOS,
+        contacto__fecha_contacto__lt=contacto.fecha_contacto,
+    ).exclude(contacto=contacto)
+    _cerrar_alertas(abiertos.values_list('alerta_id', flat=True), ahora)
+    # update() no toca auto_now: modificado se pone a mano para los validadores
+    return abiertos.update(estado=Estado.CUMPLIDO, proximo_aviso=None, modificado=ahora)
+
+
+def sincronizar(contacto, creado=False):
+    """Crea, reprograma o quita el ítem de agenda del contacto"""
+    if creado and contacto.estado == EstadoContacto.EXITOSO:
+        cerrar_cumplidos(contacto)
+
+    item = ItemAgenda.objects.filter(contacto=contacto).first()
+    if contacto.fecha_proximo_contacto is None:
+        if item is not None:
+            _cerrar_alertas([item.alerta_id], timezone.now())
+            item.delete()
+        return None
+
+    if item is not None and item.vence == contacto.fecha_proximo_contacto:
+        if item.profesional_id != contacto.profesional_id:
+            item.profesional_id = contacto.profesional_id
+            item.save(update_fields=['profesional', 'modificado'])
+        return item
+
+    if item is None:
+        item = ItemAgenda(contacto=contacto)
+    else:
+        # Fecha reprogramada: la alerta anterior ya no corresponde
+        _cerrar_alertas([item.alerta_id], timezone.now())
+    item.legajo_id = contacto.legajo_id
+    item.profesional_id = contacto.profesional_id
+    item.vence = contacto.fecha_proximo_contacto
+    item.estado = Estado.PENDIENTE
+    item.recordado = None
+    item.alerta = None
+    item.proximo_aviso = proximo_aviso(item.vence, item.estado)
+    item.save()
+    despertar(item.proximo_aviso)
+    return item
+
+
+def reconstruir(dias=30):
+    """Carga la agenda desde los contactos recientes (instalación inicial)"""
+    limite = timezone.localdate() - timedelta(days=dias)
+    contactos = HistorialContacto.objects.filter(
+        Q(fecha_proximo_contacto__gte=limite)
+        | Q(fecha_contacto__gte=_momento(limite), estado=EstadoContacto.EXITOSO)
+    ).order_by('fecha_contacto')
+    total = 0
+    for contacto in contactos.iterator():
+        if sincronizar(contacto, creado=True) is not None:
+            total += 1
+    return total
+
+
+# --- Vencimientos ---
+
+def _notificar_recordatorio(item):
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            f'agenda_usuario_{item.profesional_id}',
+            {
+                'type': 'recordatorio_agenda',
+                'item': {
+                    'id': item.id,
+                    'legajo_id': str(item.legajo_id),
+                    'ciudadano': item.legajo.ciudadano.nombre_completo,
+                    'vence': item.vence.isoformat(),
+                    'motivo': item.contacto.motivo,
+                },
+            }
+        )
+    except Exception as e:
+        logger.warning(f"No se pudo enviar el recordatorio de agenda {item.id}: {e}")
+
+
+def _recordar(item, ahora):
+    item.estado = Estado.RECORDADO
+    item.recordado = ahora
+    item.proximo_aviso = proximo_aviso(item.vence, item.estado)
+    item.save(update_fields=['estado', 'recordado', 'proximo_aviso', 'modificado'])
+    _notificar_recordatorio(item)
+
+
+def _vencer(item):
+    from .services_alertas import AlertasService
+    item.alerta = AlertasService.generar_alerta_seguimiento_vencido(item.contacto)
+    item.estado = Estado.VENCIDO
+    item.proximo_aviso = None
+    item.save(update_fields=['alerta', 'estado', 'proximo_aviso', 'modificado'])
+
+
+def procesar_vencimientos(ahora=None):
+    """Recordatorios y alertas de los ítems cuyo evento ya llegó.
+
+    Devuelve (recordados, vencidos, próximo aviso pendiente).
+    """
+    ahora = ahora or timezone.now()
+    hoy = timezone.localdate(ahora)
+    recordados = vencidos = 0
+    while True:
+        items = list(
+            ItemAgenda.objects.filter(proximo_aviso__lte=ahora)
+            .select_related('contacto__legajo__ciudadano', 'legajo__ciudadano')
+            .order_by('proximo_aviso')[:LOTE]
+        )
+        for item in items:
+            try:
+                if item.vence < hoy:
+                    _vencer(item)
+                    vencidos += 1
+                else:
+                    _recordar(item, ahora)
+                    recordados += 1
+            except Exception as e:
+                # Sin esto el ítem volvería en el mismo lote indefinidamente
+                logger.error(f"Error procesando ítem de agenda {item.id}: {e}")
+                ItemAgenda.objects.filter(pk=item.pk).update(proximo_aviso=ahora + REINTENTO)
+        if len(items) < LOTE:
+            break
+
+    siguiente = ItemAgenda.objects.aggregate(siguiente=Min('proximo_aviso'))['siguiente']
+    despertar(siguiente)
+    return recordados, vencidos, siguiente
+
+
+# --- Consultas ---
+
+def agenda_semana(usuario, desde=None, dias=7):
+    """(ítems abiertos de la semana, vencidos anteriores) del profesional"""
+    desde = desde or timezone.localdate()
+    hasta = desde + timedelta(days=dias - 1)
+    base = ItemAgenda.objects.filter(profesional=usuario).select_related('legajo__ciudadano', 'contacto')
+    semana = base.filter(estado__in=ABIERTOS, vence__range=(desde, hasta)).order_by('vence')
+    atrasados = base.filter(estado=Estado.VENCIDO, vence__lt=desde).order_by('vence')[:MAX_ATRASADOS]
+    return list(semana), list(atrasados)
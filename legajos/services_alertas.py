@@ -5,7 +5,7 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .models import (
     AlertaCiudadano, LegajoAtencion, Ciudadano, EvaluacionInicial,
-    PlanIntervencion, EventoCritico, Derivacion, Consentimiento
+    PlanIntervencion, EventoCritico, Derivacion, Consentimiento, SeguimientoContacto
 )
 from .models_contactos import HistorialContacto, VinculoFamiliar
 
@@ -138,22 +138,8 @@ class AlertasService:
                 f'{derivaciones_pendientes} derivación(es) pendiente(s)'
             ))
         
-        # 9. Seguimientos Vencidos
-        try:
-            from .models import SeguimientoContacto
-            seguimientos_vencidos = SeguimientoContacto.objects.filter(
-                legajo=legajo,
-                fecha_proximo_contacto__lt=timezone.now().date(),
-                fecha_proximo_contacto__isnull=False
-            ).count()
-            
-            if seguimientos_vencidos > 0:
-                alertas.append(AlertasService._crear_alerta(
-                    legajo.ciudadano, legajo, 'SEGUIMIENTO_VENCIDO', 'ALTA',
-                    f'{seguimientos_vencidos} seguimiento(s) vencido(s)'
-                ))
-        except:
-            pass
+        # 9. Seguimientos Vencidos: los genera la agenda (services_agenda) cuando
+        # vence cada próximo contacto, sin recorrer todos los legajos
         
         # 10. Adherencia Baja
         try:
@@ -0,0 +1,647 @@
+"""
+Detección y fusión de ciudadanos duplicados.
+
+Comparar todos contra todos es O(n²). Acá cada ciudadano se proyecta sobre
+varias claves de bloqueo y solo se comparan los que comparten alguna:
+
+- ``AN``: fonética del primer apellido + fonética del primer nombre
+- ``T``: conjunto ordenado de las fonéticas de todos los nombres (nombres
+  invertidos entre nombre y apellido)
+- ``FN`` / ``FA``: fecha de nacimiento + fonética del nombre / del apellido
+- ``DS`` / ``DT``: DNI con una posición comodín (un dígito mal tipeado) o con
+  dos dígitos contiguos ordenados (dígitos transpuestos), una pasada por
+  posición
+
+Cada esquema se resuelve ordenando una lista de ``(clave, fila)`` y
+recorriendo los grupos, así la memoria no crece con la cantidad de
+esquemas. Un bloque chico se compara completo; uno grande (apellidos
+comunes) con vecindario ordenado: cada registro contra los ``VENTANA``
+siguientes por fecha de nacimiento.
+
+Los pares de todos los bloques del esquema se puntúan juntos con numpy, en
+lotes de ``LOTE_PARES``, sobre matrices de caracteres armadas una vez al
+cargar (``_Matrices``). DNI, fecha y género se calculan para todos los
+pares; Jaro-Winkler solo para los que todavía pueden llegar al umbral.
+``puntuar`` queda como referencia escalar del mismo cálculo.
+
+Los pares con puntaje >= ``UMBRAL`` quedan en ``DuplicadoCiudadano`` para
+revisión al terminar cada esquema, así un timeout no pierde lo ya
+encontrado; la fusión reasigna las relaciones al ciudadano conservado.
+"""
+import logging
+import re
+import time
+import unicodedata
+from datetime import date, datetime
+from dataclasses import dataclass, field
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from core.fragment_cache import incrementar_version
+
+from .models import Ciudadano, DuplicadoCiudadano, LegajoAtencion
+
+logger = logging.getLogger(__name__)
+
+UMBRAL = 0.7
+MAX_BLOQUE = 60  # hasta este tamaño se comparan todos los pares del bloque
+VENTANA = 15
+TAMANO_LOTE = 1000
+LOTE_PARES = 200_000
+LARGO_DNI_MINIMO = 6
+
+PESO_NOMBRE = 0.45
+PESO_DNI = 0.30
+PESO_FECHA = 0.25
+PENALIZACION_GENERO = 0.10
+
+_NO_LETRA = re.compile(r'[^a-z ]+')
+_REPETIDAS = re.compile(r'(.)\1+')
+_VOCALES = re.compile(r'[aeiou]')
+
+
+# --- Normalización ---
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y solo letras separadas por un espacio"""
+    descompuesto = unicodedata.normalize('NFKD', (texto or '').casefold())
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(_NO_LETRA.sub(' ', sin_acentos).split())
+
+
+def clave_fonetica(palabra):
+    """Clave fonética para español: b/v, c/s/z, c/k/q, g/j, ll/y, h muda, sin vocales internas"""
+    p = palabra
+    if not p:
+        return ''
+    p = p.replace('ch', 'x').replace('ll', 'y').replace('qu', 'k')
+    p = re.sub(r'gu(?=[ei])', 'g', p)
+    p = re.sub(r'c(?=[ei])', 's', p)
+    p = re.sub(r'g(?=[ei])', 'j', p)
+    p = p.replace('c', 'k').replace('z', 's').replace('v', 'b').replace('w', 'b').replace('h', '').replace('y', 'i')
+    p = _REPETIDAS.sub(r'\1', p)
+    if not p:
+        return ''
+    return p[0] + _VOCALES.sub('', p[1:])
+
+
+def solo_digitos(dni):
+    return ''.join(c for c in dni or '' if c.isdigit())
+
+
+@dataclass(frozen=True)
+class Registro:
+    id: int
+    dni: str
+    nombre: str
+    apellido: str
+    fecha: object
+    genero: str
+    fon_nombres: tuple
+    fon_apellidos: tuple
+
+    @classmethod
+    def desde_fila(cls, id_, dni, nombre, apellido, fecha, genero):
+        nombre = normalizar(nombre)
+        apellido = normalizar(apellido)
+        return cls(
+            id_, solo_digitos(dni), nombre, apellido, fecha, genero or '',
+            tuple(filter(None, map(clave_fonetica, nombre.split()))),
+            tuple(filter(None, map(clave_fonetica, apellido.split()))),
+        )
+
+
+# --- Similitud ---
+
+def jaro_winkler(a, b):
+    if a == b:
+        return 1.0
+    largo_a, largo_b = len(a), len(b)
+    if not largo_a or not largo_b:
+        return 0.0
+    rango = max(largo_a, largo_b) // 2 - 1
+    usados_b = [False] * largo_b
+    coincidencias_a = []
+    for i, caracter in enumerate(a):
+        for j in range(max(0, i - rango), min(largo_b, i + rango + 1)):
+            if not usados_b[j] and b[j] == caracter:
+                usados_b[j] = True
+                coincidencias_a.append(caracter)
+                break
+    m = len(coincidencias_a)
+    if not m:
+        return 0.0
+    coincidencias_b = [b[j] for j in range(largo_b) if usados_b[j]]
+    transposiciones = sum(x != y for x, y in zip(coincidencias_a, coincidencias_b)) / 2
+    jaro = (m / largo_a + m / largo_b + (m - transposiciones) / m) / 3
+    prefijo = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefijo += 1
+    return jaro + prefijo * 0.1 * (1 - jaro)
+
+
+def similitud_dni(a, b):
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    if len(a) == len(b):
+        diferencias = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diferencias) == 1:
+            return 0.9
+        if len(diferencias) == 2 and diferencias[1] == diferencias[0] + 1 and a[diferencias[0]] == b[diferencias[1]] and a[diferencias[1]] == b[diferencias[0]]:
+            return 0.9
+        return 0.0
+    if abs(len(a) - len(b)) == 1:
+        largo, corto = (a, b) if len(a) > len(b) else (b, a)
+        if any(largo[:i] + largo[i + 1:] == corto for i in range(len(largo))):
+            return 0.7
+    return 0.0
+
+
+def similitud_fecha(a, b):
+    if a is None or b is None:
+        return 0.5
+    if a == b:
+        return 1.0
+    iguales = (a.year == b.year) + (a.month == b.month) + (a.day == b.day)
+    if iguales == 2 or (a.year == b.year and a.month == b.day and a.day == b.month):
+        return 0.8
+    return 0.0
+
+
+def similitud_nombre(r1, r2):
+    completo_1 = f"{r1.nombre} {r1.apellido}"
+    return max(
+        jaro_winkler(completo_1, f"{r2.nombre} {r2.apellido}"),
+        jaro_winkler(completo_1, f"{r2.apellido} {r2.nombre}"),
+        jaro_winkler(' '.join(sorted(completo_1.split())), ' '.join(sorted(f"{r2.nombre} {r2.apellido}".split()))),
+    )
+
+
+def puntuar(r1, r2):
+    """Puntaje 0..1 y su desglose"""
+    nombre = similitud_nombre(r1, r2)
+    dni = similitud_dni(r1.dni, r2.dni)
+    fecha = similitud_fecha(r1.fecha, r2.fecha)
+    puntaje = PESO_NOMBRE * nombre + PESO_DNI * dni + PESO_FECHA * fecha
+    if r1.genero and r2.genero and r1.genero != r2.genero:
+        puntaje -= PENALIZACION_GENERO
+    return max(0.0, puntaje), {'nombre': round(nombre, 3), 'dni': dni, 'fecha': fecha}
+
+
+# --- Similitud por lotes de pares (numpy) ---
+#
+# Mismo cálculo que las funciones de arriba, fila a fila sobre matrices de
+# caracteres (uint8, 0 de relleno) y arrays de largos.
+
+ANCHO_MAXIMO_NOMBRE = 64  # nombres más largos se truncan al codificar
+
+
+def _codificar(textos, ancho_maximo=None):
+    """Matriz (n, ancho) de bytes y array de largos"""
+    ancho = max((len(t) for t in textos), default=0)
+    if ancho_maximo is not None:
+        ancho = min(ancho, ancho_maximo)
+    ancho = max(ancho, 1)
+    crudo = b''.join(t.encode('ascii', 'replace')[:ancho].ljust(ancho, b'\0') for t in textos)
+    matriz = np.frombuffer(crudo, dtype=np.uint8).reshape(len(textos), ancho)
+    largos = np.fromiter((min(len(t), ancho) for t in textos), dtype=np.int32, count=len(textos))
+    return matriz, largos
+
+
+def _jaro_winkler_pares(a, largo_a, b, largo_b):
+    """``jaro_winkler`` de cada fila de ``a`` contra la misma fila de ``b``"""
+    ancho = int(max(largo_a.max(initial=0), largo_b.max(initial=0), 1))
+    a, b = a[:, :ancho], b[:, :ancho]
+    posiciones = np.arange(ancho)
+    rango = np.maximum(largo_a, largo_b) // 2 - 1
+    usados_b = np.zeros(a.shape, dtype=bool)
+    coincide_a = np.zeros(a.shape, dtype=bool)
+    for i in range(ancho):
+        activos = np.flatnonzero(largo_a > i)
+        if not len(activos):
+            break
+        r = rango[activos, None]
+        candidatos = (
+            (posiciones >= i - r) & (posiciones <= i + r) & (posiciones < largo_b[activos, None])
+            & ~usados_b[activos] & (b[activos] == a[activos, i, None])
+        )
+        hay = candidatos.any(axis=1)
+        filas = activos[hay]
+        usados_b[filas, candidatos[hay].argmax(axis=1)] = True
+        coincide_a[filas, i] = True
+
+    m = coincide_a.sum(axis=1)
+    # Caracteres coincidentes en orden, compactados al principio de la fila
+    en_orden_a = np.take_along_axis(a, np.argsort(~coincide_a, axis=1, kind='stable'), axis=1)
+    en_orden_b = np.take_along_axis(b, np.argsort(~usados_b, axis=1, kind='stable'), axis=1)
+    transposiciones = ((en_orden_a != en_orden_b) & (posiciones < m[:, None])).sum(axis=1) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jaro = (m / largo_a + m / largo_b + (m - transposiciones) / m) / 3
+    jaro = np.where(m > 0, jaro, 0.0)
+    k = min(4, ancho)
+    en_prefijo = (a[:, :k] == b[:, :k]) & (posiciones[:k] < np.minimum(largo_a, largo_b)[:, None])
+    prefijo = np.cumprod(en_prefijo, axis=1).sum(axis=1)
+    resultado = jaro + prefijo * 0.1 * (1 - jaro)
+    iguales = (largo_a == largo_b) & (a == b).all(axis=1)
+    return np.where(iguales, 1.0, resultado)
+
+
+def _similitud_dni_pares(a, largo_a, b, largo_b):
+    """``similitud_dni`` fila a fila"""
+    resultado = np.zeros(len(a))
+    vacio = (largo_a == 0) | (largo_b == 0)
+    filas = np.arange(len(a))
+    ancho = a.shape[1]
+
+    distintos = a != b
+    n_distintos = distintos.sum(axis=1)
+    primero = distintos.argmax(axis=1)
+    ultimo = ancho - 1 - distintos[:, ::-1].argmax(axis=1)
+    transpuestos = (
+        (n_distintos == 2) & (ultimo == primero + 1)
+        & (a[filas, primero] == b[filas, ultimo]) & (a[filas, ultimo] == b[filas, primero])
+    )
+    mismo_largo = (largo_a == largo_b) & ~vacio
+    resultado[mismo_largo & ((n_distintos == 1) | transpuestos)] = 0.9
+    resultado[mismo_largo & (n_distintos == 0)] = 1.0
+
+    # Un dígito de más: existe i con largo[:i] == corto[:i] y largo[i+1:] == corto[i:]
+    un_digito = np.flatnonzero((np.abs(largo_a - largo_b) == 1) & ~vacio)
+    if len(un_digito):
+        a_es_largo = (largo_a[un_digito] > largo_b[un_digito])[:, None]
+        largo = np.where(a_es_largo, a[un_digito], b[un_digito])
+        corto = np.where(a_es_largo, b[un_digito], a[un_digito])
+        largo_corto = np.minimum(largo_a[un_digito], largo_b[un_digito])
+        dentro = np.arange(ancho) < largo_corto[:, None]
+        prefijo = np.cumprod((largo == corto) & dentro, axis=1).sum(axis=1)
+        desplazado = np.concatenate([largo[:, 1:], np.zeros((len(largo), 1), dtype=largo.dtype)], axis=1)
+        malos = (desplazado != corto) & dentro
+        ultimo_malo = np.where(malos.any(axis=1), ancho - 1 - malos[:, ::-1].argmax(axis=1), -1)
+        sufijo = largo_corto - 1 - ultimo_malo
+        resultado[un_digito[prefijo + sufijo >= largo_corto]] = 0.7
+    return resultado
+
+
+class _Matrices:
+    """Registros codificados como arrays, indexados por fila"""
+
+    def __init__(self, registros):
+        n = len(registros)
+        self.ids = np.fromiter((r.id for r in registros), dtype=np.int64, count=n)
+        self.dni, self.largo_dni = _codificar([r.dni for r in registros])
+
+        completos = [f"{r.nombre} {r.apellido}" for r in registros]
+        invertidos = [f"{r.apellido} {r.nombre}" for r in registros]
+        ordenados = [' '.join(sorted(c.split())) for c in completos]
+        self.completo, self.largo_completo = _codificar(completos, ANCHO_MAXIMO_NOMBRE)
+        self.invertido, self.largo_invertido = _codificar(invertidos, ANCHO_MAXIMO_NOMBRE)
+        self.ordenado, self.largo_ordenado = _codificar(ordenados, ANCHO_MAXIMO_NOMBRE)
+        ancho = max(self.completo.shape[1], self.invertido.shape[1], self.ordenado.shape[1])
+        self.completo, self.invertido, self.ordenado = (
+            np.pad(m, ((0, 0), (0, ancho - m.shape[1]))) for m in (self.completo, self.invertido, self.ordenado)
+        )
+
+        # Año 0 = sin fecha
+        self.anio = np.fromiter((r.fecha.year if r.fecha else 0 for r in registros), dtype=np.int16, count=n)
+        self.mes = np.fromiter((r.fecha.month if r.fecha else 0 for r in registros), dtype=np.int8, count=n)
+        self.dia = np.fromiter((r.fecha.day if r.fecha else 0 for r in registros), dtype=np.int8, count=n)
+
+        codigos = {'': 0}
+        self.genero = np.fromiter(
+            (codigos.setdefault(r.genero, len(codigos)) for r in registros), dtype=np.int16, count=n
+        )
+
+    def _similitud_fecha(self, i, j):
+        anio, mes, dia = self.anio, self.mes, self.dia
+        mismo_anio = anio[i] == anio[j]
+        iguales = mismo_anio.astype(np.int8) + (mes[i] == mes[j]) + (dia[i] == dia[j])
+        invertida = mismo_anio & (mes[i] == dia[j]) & (dia[i] == mes[j])
+        resultado = np.where(iguales == 3, 1.0, np.where((iguales == 2) | invertida, 0.8, 0.0))
+        return np.where((anio[i] == 0) | (anio[j] == 0), 0.5, resultado)
+
+    def _similitud_nombre(self, i, j):
+        completo, largo = self.completo, self.largo_completo
+        return np.maximum.reduce([
+            _jaro_winkler_pares(completo[i], largo[i], completo[j], largo[j]),
+            _jaro_winkler_pares(completo[i], largo[i], self.invertido[j], self.largo_invertido[j]),
+            _jaro_winkler_pares(self.ordenado[i], self.largo_ordenado[i], self.ordenado[j], self.largo_ordenado[j]),
+        ])
+
+    def puntuar(self, i, j, umbral):
+        """``puntuar`` de los pares de filas (i[k], j[k]) que llegan al umbral.
+
+        Devuelve (posiciones en i/j, puntaje, nombre, dni, fecha). Jaro-Winkler
+        solo se calcula para los pares que con nombre idéntico llegarían.
+        """
+        dni = _similitud_dni_pares(self.dni[i], self.largo_dni[i], self.dni[j], self.largo_dni[j])
+        fecha = self._similitud_fecha(i, j)
+        genero_i, genero_j = self.genero[i], self.genero[j]
+        penalizacion = PENALIZACION_GENERO * ((genero_i != 0) & (genero_j != 0) & (genero_i != genero_j))
+        cota = PESO_NOMBRE + PESO_DNI * dni + PESO_FECHA * fecha - penalizacion
+        posibles = np.flatnonzero(cota >= umbral - 1e-9)
+
+        dni, fecha, penalizacion = dni[posibles], fecha[posibles], penalizacion[posibles]
+        nombre = self._similitud_nombre(i[posibles], j[posibles])
+        puntaje = np.maximum(0.0, PESO_NOMBRE * nombre + PESO_DNI * dni + PESO_FECHA * fecha - penalizacion)
+        aceptados = puntaje >= umbral
+        return posibles[aceptados], puntaje[aceptados], nombre[aceptados], dni[aceptados], fecha[aceptados]
+
+
+# --- Bloqueo ---
+
+def _claves_nombres(registro):
+    claves = []
+    if registro.fon_apellidos and registro.fon_nombres:
+        claves.append(('AN', f"{registro.fon_apellidos[0]}|{registro.fon_nombres[0]}"))
+    todas = sorted(registro.fon_nombres + registro.fon_apellidos)
+    if len(todas) >= 2:
+        claves.append(('T', '|'.join(todas)))
+    if registro.fecha is not None:
+        if registro.fon_nombres:
+            claves.append(('FN', f"{registro.fecha.isoformat()}|{registro.fon_nombres[0]}"))
+        if registro.fon_apellidos:
+            claves.append(('FA', f"{registro.fecha.isoformat()}|{registro.fon_apellidos[0]}"))
+    return claves
+
+
+def _esquemas_dni(largo_maximo):
+    """Funciones de clave para las pasadas de DNI (sustitución y transposición por posición)"""
+    def sustitucion(posicion):
+        return lambda d: d[:posicion] + '?' + d[posicion + 1:] if posicion < len(d) else None
+
+    def transposicion(posicion):
+        return lambda d: d[:posicion] + ''.join(sorted(d[posicion:posicion + 2])) + d[posicion + 2:] if posicion + 1 < len(d) else None
+
+    for posicion in range(largo_maximo):
+        yield f'DS{posicion}', sustitucion(posicion)
+    for posicion in range(largo_maximo - 1):
+        yield f'DT{posicion}', transposicion(posicion)
+
+
+@dataclass
+class ResultadoDeteccion:
+    ciudadanos: int = 0
+    comparaciones: int = 0
+    candidatos: int = 0
+    nuevos: int = 0
+    segundos: float = 0.0
+    por_esquema: dict = field(default_factory=dict)
+
+
+class DetectorDuplicados:
+    """Genera pares candidatos por bloques y los deja en la cola de revisión"""
+
+    def __init__(self, umbral=UMBRAL, max_bloque=MAX_BLOQUE, ventana=VENTANA):
+        self.umbral = umbral
+        self.max_bloque = max_bloque
+        self.ventana = ventana
+        self.registros = []
+        self.matrices = None
+        self.encontrados = {}  # (id_a, id_b) -> (puntaje, motivos)
+        self.resultado = ResultadoDeteccion()
+        self._codigos = np.empty(0, dtype=np.int64)  # pares encontrados, como fila_menor * n + fila_mayor
+        self._pendientes = []  # claves encontradas todavía sin guardar
+        self._rango = []  # posición de cada fila ordenada por fecha y DNI
+
+    def cargar(self, queryset=None):
+        queryset = queryset if queryset is not None else Ciudadano.objects.filter(activo=True)
+        filas = queryset.values_list('id', 'dni', 'nombre', 'apellido', 'fecha_nacimiento', 'genero')
+        self.registros = [Registro.desde_fila(*fila) for fila in filas.iterator(chunk_size=10000)]
+        self.matrices = _Matrices(self.registros)
+        orden = sorted(
+            range(len(self.registros)),
+            key=lambda f: (self.registros[f].fecha is None, self.registros[f].fecha or date.min, self.registros[f].dni),
+        )
+        self._rango = [0] * len(orden)
+        for posicion, fila in enumerate(orden):
+            self._rango[fila] = posicion
+        self.resultado.ciudadanos = len(self.registros)
+
+    def ejecutar(self, guardar=True):
+        inicio = time.monotonic()
+        if not self.registros:
+            self.cargar()
+
+        # Esquemas por nombre/fecha: una lista de claves por esquema, ordenada
+        pares_por_esquema = {}
+        for fila, registro in enumerate(self.registros):
+            for esquema, clave in _claves_nombres(registro):
+                pares_por_esquema.setdefault(esquema, []).append((clave, fila))
+        for esquema, claves in pares_por_esquema.items():
+            self._procesar_esquema(esquema, claves, guardar)
+        pares_por_esquema.clear()
+
+        largo_maximo = max((len(r.dni) for r in self.registros), default=0)
+        for esquema, funcion in _esquemas_dni(largo_maximo):
+            claves = []
+            for fila, registro in enumerate(self.registros):
+                if len(registro.dni) >= LARGO_DNI_MINIMO:
+                    clave = funcion(registro.dni)
+                    if clave is not None:
+                        claves.append((clave, fila))
+            self._procesar_esquema(esquema, claves, guardar)
+
+        self.resultado.candidatos = len(self.encontrados)
+        self.resultado.segundos = round(time.monotonic() - inicio, 1)
+        logger.info(
+            f"Duplicados: {self.resultado.ciudadanos} ciudadanos, {self.resultado.comparaciones} comparaciones, "
+            f"{self.resultado.candidatos} candidatos ({self.resultado.nuevos} nuevos) en {self.resultado.segundos}s"
+        )
+        return self.resultado
+
+    def _procesar_esquema(self, esquema, claves, guardar=False):
+        # Dentro de cada bloque, ordenado por fecha y DNI para el vecindario
+        rango = self._rango
+        claves.sort(key=lambda c: (c[0], rango[c[1]]))
+        filas = np.fromiter((fila for _, fila in claves), dtype=np.int64, count=len(claves))
+        inicios, tamanos = [], []
+        posicion = 0
+        for _, grupo in groupby(claves, key=itemgetter(0)):
+            tamano = sum(1 for _ in grupo)
+            if tamano >= 2:
+                inicios.append(posicion)
+                tamanos.append(tamano)
+            posicion += tamano
+
+        comparaciones = 0
+        for i, j in self._pares(np.array(inicios, dtype=np.int64), np.array(tamanos, dtype=np.int64)):
+            for desde in range(0, len(i), LOTE_PARES):
+                comparaciones += self._comparar_pares(
+                    esquema, filas[i[desde:desde + LOTE_PARES]], filas[j[desde:desde + LOTE_PARES]]
+                )
+        self.resultado.comparaciones += comparaciones
+        self.resultado.por_esquema[esquema] = comparaciones
+        if guardar:
+            self.resultado.nuevos += self.guardar()
+
+    def _pares(self, inicios, tamanos):
+        """Posiciones (i, j) de los pares a comparar, agrupadas por forma de bloque"""
+        chicos = tamanos <= self.max_bloque
+        for tamano in np.unique(tamanos[chicos]):
+            desde = inicios[chicos & (tamanos == tamano)][:, None]
+            i, j = np.triu_indices(tamano, 1)
+            yield (desde + i).ravel(), (desde + j).ravel()
+        # Vecindario ordenado para bloques grandes: cada uno contra los VENTANA siguientes
+        for inicio, tamano in zip(inicios[~chicos], tamanos[~chicos]):
+            saltos = range(1, min(self.ventana, tamano - 1) + 1)
+            yield (
+                np.concatenate([np.arange(inicio, inicio + tamano - s) for s in saltos]),
+                np.concatenate([np.arange(inicio + s, inicio + tamano) for s in saltos]),
+            )
+
+    def _comparar_pares(self, esquema, filas_a, filas_b):
+        ids = self.matrices.ids
+        codigos = np.minimum(filas_a, filas_b) * len(self.registros) + np.maximum(filas_a, filas_b)
+        conocidos = np.isin(codigos, self._codigos)
+        for fila_a, fila_b in zip(filas_a[conocidos].tolist(), filas_b[conocidos].tolist()):
+            # Ya aceptado por otro esquema; los rechazados no se recuerdan
+            # para no guardar un set del tamaño de las comparaciones
+            id_a, id_b = sorted((int(ids[fila_a]), int(ids[fila_b])))
+            self.encontrados[(id_a, id_b)][1]['bloques'].append(esquema)
+
+        nuevos = ~conocidos
+        filas_a, filas_b, codigos = filas_a[nuevos], filas_b[nuevos], codigos[nuevos]
+        if not len(codigos):
+            return 0
+        posiciones, puntajes, nombres, dnis, fechas = self.matrices.puntuar(filas_a, filas_b, self.umbral)
+        for fila_a, fila_b, puntaje, nombre, dni, fecha in zip(
+            filas_a[posiciones].tolist(), filas_b[posiciones].tolist(),
+            puntajes.tolist(), nombres.tolist(), dnis.tolist(), fechas.tolist(),
+        ):
+            clave = tuple(sorted((int(ids[fila_a]), int(ids[fila_b]))))
+            self.encontrados[clave] = (
+                puntaje, {'nombre': round(nombre, 3), 'dni': dni, 'fecha': fecha, 'bloques': [esquema]}
+            )
+            self._pendientes.append(clave)
+        if len(posiciones):
+            self._codigos = np.union1d(self._codigos, codigos[posiciones])
+        return len(codigos)
+
+    def guardar(self):
+        """Agrega a la cola los pares encontrados desde el último guardado; los ya revisados no se tocan"""
+        antes = DuplicadoCiudadano.objects.count()
+        lote = []
+        for id_a, id_b in self._pendientes:
+            puntaje, motivos = self.encontrados[(id_a, id_b)]
+            lote.append(DuplicadoCiudadano(
+                ciudadano_a_id=id_a, ciudadano_b_id=id_b, puntaje=round(puntaje, 4), motivos=motivos,
+            ))
+            if len(lote) >= TAMANO_LOTE:
+                DuplicadoCiudadano.objects.bulk_create(lote, ignore_conflicts=True)
+                lote = []
+        if lote:
+            DuplicadoCiudadano.objects.bulk_create(lote, ignore_conflicts=True)
+        self._pendientes = []
+        return DuplicadoCiudadano.objects.count() - antes
+
+
+# --- Revisión y fusión ---
+
+# Relaciones que no se reasignan al fusionar (historial propio de cada registro)
+RELACIONES_EXCLUIDAS = {('core', 'auditoriaciudadano'), ('legajos', 'duplicadociudadano')}
+CAMPOS_COMPLETABLES = ('fecha_nacimiento', 'genero', 'telefono', 'email', 'domicilio')
+
+
+def descartar(duplicado, usuario):
+    duplicado.estado = DuplicadoCiudadano.Estado.DESCARTADO
+    duplicado.revisado_por = usuario
+    duplicado.fecha_revision = timezone.now()
+    duplicado.save(update_fields=['estado', 'revisado_por', 'fecha_revision', 'modificado'])
+
+
+def _invalidar_caches(conservar_id, eliminar_id, movidos):
+    """update() no envía señales: fragmentos, grafo y series se invalidan a mano"""
+    from core import series_tiempo
+    from .services_grafo import RedContactosService
+
+    for pk in (conservar_id, eliminar_id):
+        incrementar_version(Ciudadano, pk)
+    for pk in movidos.get(LegajoAtencion, ()):
+        incrementar_version(LegajoAtencion, pk)
+
+    RedContactosService.invalidar()
+
+    for serie in series_tiempo.series_registradas():
+        pks = movidos.get(serie.model)
+        if not pks:
+            continue
+        try:
+            rango = serie.model._base_manager.filter(pk__in=pks).aggregate(
+                desde=Min(serie.campo_fecha), hasta=Max(serie.campo_fecha)
+            )
+            if rango['desde'] is not None:
+                series_tiempo.reconstruir(serie, _fecha(rango['desde']), _fecha(rango['hasta']))
+        except Exception as e:
+            logger.warning(f"No se pudo reconstruir la serie {serie.metrica} tras la fusión: {e}")
+
+
+def _fecha(valor):
+    return timezone.localdate(valor) if isinstance(valor, datetime) else valor
+
+
+def fusionar(duplicado, conservar_id, usuario):
+    """
+    Reasigna al ciudadano conservado todo lo que apunta al otro, completa sus
+    datos vacíos y desactiva el duplicado. Devuelve las relaciones que no se
+    pudieron mover por restricciones de unicidad.
+    """
+    if conservar_id not in (duplicado.ciudadano_a_id, duplicado.ciudadano_b_id):
+        raise ValueError('El ciudadano a conservar no pertenece al par')
+    eliminar_id = duplicado.ciudadano_b_id if conservar_id == duplicado.ciudadano_a_id else duplicado.ciudadano_a_id
+
+    conflictos = []
+    movidos = {}  # modelo -> pks reasignados
+    with transaction.atomic():
+        conservar = Ciudadano.objects.select_for_update().get(pk=conservar_id)
+        eliminar = Ciudadano.objects.select_for_update().get(pk=eliminar_id)
+
+        for relacion in Ciudadano._meta.related_objects:
+            modelo = relacion.related_model
+            if (modelo._meta.app_label, modelo._meta.model_name) in RELACIONES_EXCLUIDAS:
+                continue
+            if relacion.many_to_many:
+                campo = relacion.field
+                modelo = campo.remote_field.through
+                nombre = campo.m2m_reverse_field_name()
+            else:
+                nombre = relacion.field.name
+            try:
+                with transaction.atomic():
+                    filas = modelo._base_manager.filter(**{nombre: eliminar})
+                    pks = list(filas.values_list('pk', flat=True))
+                    filas.update(**{nombre: conservar})
+            except IntegrityError:
+                conflictos.append(modelo.__name__)
+            else:
+                if pks:
+                    movidos[modelo] = pks
+
+        for campo in CAMPOS_COMPLETABLES:
+            if not getattr(conservar, campo) and getattr(eliminar, campo):
+                setattr(conservar, campo, getattr(eliminar, campo))
+        conservar._motivo_cambio = f'Fusión con ciudadano DNI {eliminar.dni}'
+        conservar.save()
+
+        eliminar.activo = False
+        eliminar._motivo_cambio = f'Fusionado en ciudadano DNI {conservar.dni}'
+        eliminar.save()
+
+        duplicado.estado = DuplicadoCiudadano.Estado.FUSIONADO
+        duplicado.revisado_por = usuario
+        duplicado.fecha_revision = timezone.now()
+        duplicado.motivos = {**(duplicado.motivos or {}), 'conservado': conservar_id, 'conflictos': conflictos}
+        duplicado.save()
+        transaction.on_commit(lambda: _invalidar_caches(conservar_id, eliminar_id, movidos))
+
+    if conflictos:
+        logger.warning(f"Fusión {eliminar_id} -> {conservar_id}: relaciones sin mover {conflictos}")
+    return conflictos
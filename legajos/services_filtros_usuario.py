@@ -2,6 +2,7 @@ from django.db.models import Q
 from django.contrib.auth.models import User
 from .models import AlertaCiudadano, LegajoAtencion
 from users.models import Profile
+from core.permisos import grupos_usuario
 
 
 class FiltrosUsuarioService:
@@ -50,13 +51,13 @@ class FiltrosUsuarioService:
             pass
         
         # 3. Verificar grupos del usuario para permisos adicionales
-        grupos_usuario = usuario.groups.values_list('name', flat=True)
+        grupos = grupos_usuario(usuario)
         
-        if 'Administrador' in grupos_usuario:
+        if 'Administrador' in grupos:
             # Administradores ven todas las alertas
             return AlertaCiudadano.objects.filter(activa=True)
         
-        elif 'Supervisor' in grupos_usuario:
+        elif 'Supervisor' in grupos:
             # Supervisores ven alertas de su provincia o región
             try:
                 profile = usuario.profile
@@ -0,0 +1,398 @@
+"""
+Grafo en memoria de la red de contactos.
+
+Mantiene un índice de adyacencia compacto (CSR sobre ``array``) con los
+vínculos familiares, profesionales tratantes y dispositivos vinculados, y
+responde consultas de alcance (BFS), componentes conexas y vecinos
+compartidos sin recorrer el ORM.
+
+Nodos: ``('C', id)`` ciudadano, ``('U', id)`` usuario, ``('D', id)`` dispositivo.
+"""
+
+import logging
+import threading
+import time
+from array import array
+from collections import deque, namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION_KEY = "red_contactos:version"
+INTERVALO_VERIFICACION = 5  # segundos entre chequeos de versión compartida
+UMBRAL_COMPACTACION = 512  # ajustes pendientes antes de reconstruir el CSR
+
+# Tipos de arista (máscara de bits)
+VINCULO = 1
+CONVIVE = 2
+EMERGENCIA = 4
+PROFESIONAL = 8
+DISPOSITIVO = 16
+TODOS = VINCULO | CONVIVE | EMERGENCIA | PROFESIONAL | DISPOSITIVO
+
+TIPOS_ARISTA = {
+    'vinculo': VINCULO,
+    'convive': CONVIVE,
+    'emergencia': EMERGENCIA,
+    'profesional': PROFESIONAL,
+    'dispositivo': DISPOSITIVO,
+}
+
+
+def mascara_desde_nombres(nombres, defecto=TODOS):
+    """Convierte ``"vinculo,convive"`` en una máscara de tipos de arista"""
+    if not nombres:
+        return defecto
+    mascara = 0
+    for nombre in nombres.split(','):
+        mascara |= TIPOS_ARISTA.get(nombre.strip().lower(), 0)
+    return mascara or defecto
+
+
+def nombres_desde_mascara(mascara):
+    return [nombre for nombre, bit in TIPOS_ARISTA.items() if mascara & bit]
+
+
+# Estado que leen las consultas; se reemplaza entero, nunca se modifica en el lugar
+_Foto = namedtuple('_Foto', 'indptr indices tipos ajustes extra')
+
+
+def _par(i, j):
+    return (i, j) if i < j else (j, i)
+
+
+class GrafoContactos:
+    """Grafo no dirigido con adyacencia CSR y un overlay de ajustes incrementales.
+
+    ``_origenes`` guarda, por registro de origen (``('V', pk)``, ``('P', pk)``,
+    ``('DV', pk)``), la arista que aporta, y ``_por_par`` los orígenes de cada
+    par. El CSR es una foto compacta de esas aristas; los cambios posteriores
+    se aplican en ``ajustes`` (par -> flags, 0 = eliminada) hasta que se supera
+    ``UMBRAL_COMPACTACION`` y se reconstruye.
+
+    Las escrituras se serializan con ``_lock`` y publican una ``_Foto`` nueva;
+    cada consulta toma la foto una vez al empezar, así que no ve estados a
+    medio aplicar ni necesita el lock.
+    """
+
+    def __init__(self, origenes=None):
+        self.nodos = []
+        self.indice = {}
+        self._origenes = {}
+        self._por_par = {}
+        self._lock = threading.RLock()
+        for origen, (a, b, flags) in (origenes or {}).items():
+            i, j = self._nodo(a), self._nodo(b)
+            self._origenes[origen] = (i, j, flags)
+            self._por_par.setdefault(_par(i, j), set()).add(origen)
+        self._compactar()
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+
+    def _nodo(self, clave):
+        idx = self.indice.get(clave)
+        if idx is None:
+            idx = len(self.nodos)
+            self.nodos.append(clave)
+            self.indice[clave] = idx
+        return idx
+
+    def _flags_por_par(self):
+        pares = {}
+        for par in self._por_par:
+            if par[0] != par[1]:
+                flags = self._recalcular_par(par)
+                if flags:
+                    pares[par] = flags
+        return pares
+
+    def _compactar(self):
+        """Reconstruye los arrays CSR a partir de ``_origenes`` (sin consultar la DB)"""
+        pares = self._flags_por_par()
+        n = len(self.nodos)
+        grado = array('l', [0]) * (n + 1)
+        for i, j in pares:
+            grado[i + 1] += 1
+            grado[j + 1] += 1
+        for k in range(n):
+            grado[k + 1] += grado[k]
+        indptr = grado
+        posicion = array('l', indptr[:n]) if n else array('l')
+        indices = array('l', [0]) * (2 * len(pares))
+        tipos = array('B', [0]) * (2 * len(pares))
+        for (i, j), flags in pares.items():
+            indices[posicion[i]] = j
+            tipos[posicion[i]] = flags
+            posicion[i] += 1
+            indices[posicion[j]] = i
+            tipos[posicion[j]] = flags
+            posicion[j] += 1
+        self._foto = _Foto(indptr, indices, tipos, {}, {})
+
+    # ------------------------------------------------------------------
+    # Actualización incremental
+    # ------------------------------------------------------------------
+
+    def aplicar(self, origen, arista):
+        """Registra/reemplaza la arista de un origen; ``arista=None`` la elimina"""
+        with self._lock:
+            afectados = set()
+            anterior = self._origenes.pop(origen, None)
+            if anterior:
+                par = _par(*anterior[:2])
+                afectados.add(par)
+                self._por_par[par].discard(origen)
+                if not self._por_par[par]:
+                    del self._por_par[par]
+            if arista:
+                a, b, flags = arista
+                i, j = self._nodo(a), self._nodo(b)
+                self._origenes[origen] = (i, j, flags)
+                par = _par(i, j)
+                afectados.add(par)
+                self._por_par.setdefault(par, set()).add(origen)
+            if not afectados:
+                return
+
+            foto = self._foto
+            ajustes = dict(foto.ajustes)
+            extra = dict(foto.extra)
+            for par in afectados:
+                i, j = par
+                if i == j:
+                    continue  # igual que en _compactar: sin lazos
+                ajustes[par] = self._recalcular_par(par)
+                extra[i] = extra.get(i, frozenset()) | {j}
+                extra[j] = extra.get(j, frozenset()) | {i}
+
+            if len(ajustes) > UMBRAL_COMPACTACION:
+                self._compactar()
+            else:
+                self._foto = foto._replace(ajustes=ajustes, extra=extra)
+
+    def _recalcular_par(self, par):
+        flags = 0
+        for origen in self._por_par.get(par, ()):
+            flags |= self._origenes[origen][2]
+        return flags
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def vecinos(self, idx, mascara=TODOS, foto=None):
+        """Itera ``(vecino, flags)`` de un nodo filtrando por tipos de arista"""
+        foto = foto or self._foto
+        vistos = set()
+        if idx + 1 < len(foto.indptr):
+            for k in range(foto.indptr[idx], foto.indptr[idx + 1]):
+                j = foto.indices[k]
+                flags = foto.ajustes.get(_par(idx, j), foto.tipos[k])
+                vistos.add(j)
+                if flags & mascara:
+                    yield j, flags
+        for j in foto.extra.get(idx, ()):
+            if j in vistos:
+                continue
+            flags = foto.ajustes.get(_par(idx, j), 0)
+            if flags & mascara:
+                yield j, flags
+
+    def bfs(self, origen, max_saltos=2, mascara=TODOS, max_nodos=500):
+        """Nodos alcanzables desde ``origen`` en hasta ``max_saltos`` saltos.
+
+        Devuelve una lista de ``(clave, distancia, clave_padre, flags)``.
+        """
+        inicio = self.indice.get(origen)
+        if inicio is None:
+            return []
+        foto = self._foto
+        distancia = {inicio: 0}
+        resultado = []
+        cola = deque([inicio])
+        while cola and len(resultado) < max_nodos:
+            actual = cola.popleft()
+            if distancia[actual] >= max_saltos:
+                continue
+            for vecino, flags in self.vecinos(actual, mascara, foto):
+                if vecino in distancia:
+                    continue
+                distancia[vecino] = distancia[actual] + 1
+                resultado.append((self.nodos[vecino], distancia[vecino], self.nodos[actual], flags))
+                cola.append(vecino)
+                if len(resultado) >= max_nodos:
+                    break
+        return resultado
+
+    def componente(self, origen, mascara=TODOS, max_nodos=5000):
+        """Componente conexa de ``origen`` usando solo aristas de ``mascara``"""
+        inicio = self.indice.get(origen)
+        if inicio is None:
+            return [origen]
+        foto = self._foto
+        visitados = {inicio}
+        cola = deque([inicio])
+        while cola and len(visitados) < max_nodos:
+            actual = cola.popleft()
+            for vecino, _ in self.vecinos(actual, mascara, foto):
+                if vecino not in visitados:
+                    visitados.add(vecino)
+                    cola.append(vecino)
+        return [self.nodos[i] for i in visitados]
+
+    def vecinos_compartidos(self, a, b, mascara=TODOS):
+        """Nodos directamente conectados tanto con ``a`` como con ``b``"""
+        ia, ib = self.indice.get(a), self.indice.get(b)
+        if ia is None or ib is None:
+            return []
+        foto = self._foto
+        de_a = {j for j, _ in self.vecinos(ia, mascara, foto)}
+        return [self.nodos[j] for j, _ in self.vecinos(ib, mascara, foto) if j in de_a]
+
+    def compartidos_via(self, origen, mascara=EMERGENCIA):
+        """Otros ciudadanos que comparten un vecino (p. ej. contacto de emergencia) con ``origen``.
+
+        Devuelve ``{ciudadano: [vecinos compartidos]}``.
+        """
+        inicio = self.indice.get(origen)
+        if inicio is None:
+            return {}
+        foto = self._foto
+        resultado = {}
+        for intermedio, _ in self.vecinos(inicio, mascara, foto):
+            for otro, _ in self.vecinos(intermedio, mascara, foto):
+                if otro == inicio or self.nodos[otro][0] != 'C':
+                    continue
+                resultado.setdefault(self.nodos[otro], []).append(self.nodos[intermedio])
+        return resultado
+
+
+def _arista_vinculo(ciudadano_principal_id, ciudadano_vinculado_id, convive, emergencia):
+    flags = VINCULO
+    if convive:
+        flags |= CONVIVE
+    if emergencia:
+        flags |= EMERGENCIA
+    return ('C', ciudadano_principal_id), ('C', ciudadano_vinculado_id), flags
+
+
+class RedContactosService:
+    """Acceso al grafo por proceso, con invalidación entre workers por versión en cache"""
+
+    _grafo = None
+    _version = None
+    _ultima_verificacion = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def obtener_grafo(cls):
+        ahora = time.monotonic()
+        if cls._grafo is not None and ahora - cls._ultima_verificacion < INTERVALO_VERIFICACION:
+            return cls._grafo
+        version = cache.get(CACHE_VERSION_KEY, 0)
+        with cls._lock:
+            cls._ultima_verificacion = ahora
+            if cls._grafo is None or version != cls._version:
+                inicio = time.monotonic()
+                cls._grafo = GrafoContactos(cls._cargar_origenes())
+                cls._version = version
+                logger.info(
+                    "Grafo de red de contactos cargado: %s nodos en %.1f ms",
+                    len(cls._grafo.nodos), (time.monotonic() - inicio) * 1000
+                )
+        return cls._grafo
+
+    @staticmethod
+    def _cargar_origenes():
+        """Carga todas las aristas con tres consultas ``values_list``"""
+        from .models_contactos import VinculoFamiliar, ProfesionalTratante, DispositivoVinculado
+
+        origenes = {}
+        vinculos = VinculoFamiliar.objects.filter(activo=True).values_list(
+            'id', 'ciudadano_principal_id', 'ciudadano_vinculado_id', 'convive', 'es_contacto_emergencia'
+        )
+        for pk, principal, vinculado, convive, emergencia in vinculos.iterator():
+            origenes[('V', pk)] = _arista_vinculo(principal, vinculado, convive, emergencia)
+
+        profesionales = ProfesionalTratante.objects.filter(activo=True).values_list(
+            'id', 'legajo__ciudadano_id', 'usuario_id'
+        )
+        for pk, ciudadano_id, usuario_id in profesionales.iterator():
+            origenes[('P', pk)] = (('C', ciudadano_id), ('U', usuario_id), PROFESIONAL)
+
+        dispositivos = DispositivoVinculado.objects.filter(
+            estado=DispositivoVinculado.EstadoAdmision.ACTIVO
+        ).values_list('id', 'legajo__ciudadano_id', 'dispositivo_id')
+        for pk, ciudadano_id, dispositivo_id in dispositivos.iterator():
+            origenes[('DV', pk)] = (('C', ciudadano_id), ('D', dispositivo_id), DISPOSITIVO)
+
+        return origenes
+
+    @classmethod
+    def _publicar_version(cls):
+        try:
+            cache.add(CACHE_VERSION_KEY, 0, None)
+            nueva = cache.incr(CACHE_VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"No se pudo publicar la versión del grafo de contactos: {e}")
+            return
+        # Este proceso ya aplicó el cambio: no necesita recargar
+        if cls._version is not None and nueva == cls._version + 1:
+            cls._version = nueva
+
+    @classmethod
+    def actualizar_vinculo(cls, vinculo, eliminado=False):
+        arista = None
+        if not eliminado and vinculo.activo:
+            arista = _arista_vinculo(
+                vinculo.ciudadano_principal_id, vinculo.ciudadano_vinculado_id,
+                vinculo.convive, vinculo.es_contacto_emergencia
+            )
+        cls._aplicar(('V', vinculo.pk), arista)
+
+    @classmethod
+    def actualizar_profesional(cls, profesional, eliminado=False):
+        arista = None
+        if not eliminado and profesional.activo:
+            arista = (('C', profesional.legajo.ciudadano_id), ('U', profesional.usuario_id), PROFESIONAL)
+        cls._aplicar(('P', profesional.pk), arista)
+
+    @classmethod
+    def actualizar_dispositivo(cls, vinculado, eliminado=False):
+        arista = None
+        if not eliminado and vinculado.estado == vinculado.EstadoAdmision.ACTIVO:
+            arista = (('C', vinculado.legajo.ciudadano_id), ('D', vinculado.dispositivo_id), DISPOSITIVO)
+        cls._aplicar(('DV', vinculado.pk), arista)
+
+    @classmethod
+    def _aplicar(cls, origen, arista):
+        """Aplica la arista y publica la versión al confirmar la transacción.
+
+        Así un rollback no deja aristas en el grafo del proceso y los otros
+        workers no recargan datos anteriores al commit.
+        """
+        def aplicar():
+            try:
+                if cls._grafo is not None:
+                    cls._grafo.aplicar(origen, arista)
+                cls._publicar_version()
+            except Exception as e:
+                logger.error(f"Error actualizando grafo de contactos ({origen}): {e}")
+        transaction.on_commit(aplicar)
+
+    @classmethod
+    def invalidar(cls):
+        """Recarga el grafo en todos los workers (cambios hechos sin señales)"""
+        cls.reiniciar()
+        cls._publicar_version()
+
+    @classmethod
+    def reiniciar(cls):
+        """Descarta el grafo en memoria de este proceso"""
+        with cls._lock:
+            cls._grafo = None
+            cls._version = None
@@ -0,0 +1,353 @@
+"""
+Servicio de línea de tiempo de ciudadanos.
+Mantiene la tabla desnormalizada ActividadCiudadano a partir de los modelos
+de origen y la expone con paginación por cursor.
+"""
+
+import base64
+import logging
+from datetime import datetime, time
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    LegajoAtencion, SeguimientoContacto, EvaluacionInicial, PlanIntervencion,
+    Derivacion, EventoCritico, Adjunto, Ciudadano
+)
+from .models_contactos import VinculoFamiliar
+from .models_timeline import ActividadCiudadano
+
+logger = logging.getLogger(__name__)
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
+CIUDADANOS_POR_TRANSACCION = 200
+
+
+def _codigo_legajo(legajo):
+    if not legajo:
+        return 'General'
+    return str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
+
+
+def _nombre_profesional(profesional):
+    if profesional and profesional.usuario:
+        return profesional.usuario.get_full_name() or profesional.usuario.username
+    return 'Sistema'
+
+
+def _fecha_a_datetime(fecha, referencia=None):
+    """Convierte un DateField en datetime; usa la hora de ``referencia`` si coincide el día"""
+    if referencia and timezone.localtime(referencia).date() == fecha:
+        return referencia
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def _entrada(tipo, fecha, ciudadano_id, descripcion, legajo=None, usuario_nombre='Sistema'):
+    return {
+        'tipo': tipo,
+        'fecha': fecha,
+        'ciudadano_id': ciudadano_id,
+        'legajo_id': legajo.id if legajo else None,
+        'legajo_codigo': _codigo_legajo(legajo),
+        'descripcion': descripcion[:300],
+        'usuario_nombre': (usuario_nombre or 'Sistema')[:150],
+    }
+
+
+class TimelineService:
+    """Construye y consulta la línea de tiempo de actividades de un ciudadano"""
+
+    Tipo = ActividadCiudadano.Tipo
+
+    # ------------------------------------------------------------------
+    # Construcción de entradas a partir de los modelos de origen
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def entradas_para(cls, instance):
+        """Devuelve ``(entradas, tipos_obsoletos)`` para una instancia de origen.
+
+        ``tipos_obsoletos`` son tipos que la instancia ya no debe tener en la
+        línea de tiempo (p. ej. CIERRE de un legajo reabierto).
+        """
+        constructor = cls._CONSTRUCTORES.get(type(instance))
+        if constructor is None:
+            return [], []
+        return constructor(instance)
+
+    @classmethod
+    def _desde_legajo(cls, legajo):
+        entradas = [_entrada(
+            cls.Tipo.APERTURA,
+            legajo.creado,
+            legajo.ciudadano_id,
+            f'Acompañamiento abierto en {legajo.dispositivo.nombre if legajo.dispositivo else "Dispositivo no especificado"}',
+            legajo=legajo,
+            usuario_nombre=legajo.responsable.get_full_name() if legajo.responsable else 'Sistema',
+        )]
+        if legajo.fecha_cierre:
+            entradas.append(_entrada(
+                cls.Tipo.CIERRE,
+                _fecha_a_datetime(legajo.fecha_cierre, legajo.modificado),
+                legajo.ciudadano_id,
+                'Acompañamiento cerrado',
+                legajo=legajo,
+            ))
+            return entradas, []
+        return entradas, [cls.Tipo.CIERRE]
+
+    @classmethod
+    def _desde_seguimiento(cls, seg):
+        return [_entrada(
+            cls.Tipo.SEGUIMIENTO,
+            seg.creado,
+            seg.legajo.ciudadano_id,
+            f'{seg.get_tipo_display()}: {seg.descripcion[:100] if seg.descripcion else "Sin descripción"}',
+            legajo=seg.legajo,
+            usuario_nombre=_nombre_profesional(seg.profesional),
+        )], []
+
+    @classmethod
+    def _desde_evaluacion(cls, evaluacion):
+        legajo = evaluacion.legajo
+        return [_entrada(
+            cls.Tipo.EVALUACION,
+            evaluacion.creado,
+            legajo.ciudadano_id,
+            f'Evaluación inicial realizada - Riesgo: {legajo.get_nivel_riesgo_display()}',
+            legajo=legajo,
+        )], []
+
+    @classmethod
+    def _desde_plan(cls, plan):
+        objetivos = ', '.join(
+            str(act.get('accion', '')) for act in (plan.actividades or []) if isinstance(act, dict)
+        )
+        return [_entrada(
+            cls.Tipo.PLAN,
+            plan.creado,
+            plan.legajo.ciudadano_id,
+            f'Plan de intervención creado - Actividades: {objetivos[:100] if objetivos else "Sin actividades"}',
+            legajo=plan.legajo,
+            usuario_nombre=_nombre_profesional(plan.profesional),
+        )], []
+
+    @classmethod
+    def _desde_derivacion(cls, der):
+        return [_entrada(
+            cls.Tipo.DERIVACION,
+            der.creado,
+            der.legajo.ciudadano_id,
+            f'Derivación a {der.destino.nombre if der.destino_id else "destino no especificado"} - Estado: {der.get_estado_display()}',
+            legajo=der.legajo,
+        )], []
+
+    @classmethod
+    def _desde_evento(cls, evento):
+        return [_entrada(
+            cls.Tipo.EVENTO,
+            evento.creado,
+            evento.legajo.ciudadano_id,
+            f'Evento crítico: {evento.get_tipo_display()} - {evento.detalle[:100] if evento.detalle else ""}',
+            legajo=evento.legajo,
+        )], []
+
+    @classmethod
+    def _desde_vinculo(cls, vinculo):
+        return [_entrada(
+            cls.Tipo.VINCULO,
+            vinculo.creado,
+            vinculo.ciudadano_principal_id,
+            f'Vínculo agregado: {vinculo.get_tipo_vinculo_display()} - {vinculo.ciudadano_vinculado.nombre_completo}',
+        )], []
+
+    @classmethod
+    def _desde_adjunto(cls, adjunto):
+        objeto = adjunto.content_object
+        if isinstance(objeto, LegajoAtencion):
+            ciudadano_id, legajo = objeto.ciudadano_id, objeto
+        elif isinstance(objeto, Ciudadano):
+            ciudadano_id, legajo = objeto.id, None
+        else:
+            return [], []
+        return [_entrada(
+            cls.Tipo.ADJUNTO,
+            adjunto.creado,
+            ciudadano_id,
+            f'Archivo adjuntado: {adjunto.etiqueta or adjunto.nombre_visible}',
+            legajo=legajo,
+        )], []
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def sincronizar(cls, instance):
+        """Inserta o actualiza las entradas de la línea de tiempo de ``instance``"""
+        entradas, obsoletos = cls.entradas_para(instance)
+        if not entradas and not obsoletos:
+            return
+        content_type = ContentType.objects.get_for_model(instance)
+        object_id = str(instance.pk)
+        with transaction.atomic():
+            for entrada in entradas:
+                tipo = entrada.pop('tipo')
+                ActividadCiudadano.objects.update_or_create(
+                    content_type=content_type,
+                    object_id=object_id,
+                    tipo=tipo,
+                    defaults=entrada,
+                )
+            if obsoletos:
+                ActividadCiudadano.objects.filter(
+                    content_type=content_type,
+                    object_id=object_id,
+                    tipo__in=obsoletos,
+                ).delete()
+
+    @staticmethod
+    def eliminar(instance):
+        """Elimina las entradas asociadas a un registro de origen borrado"""
+        ActividadCiudadano.objects.filter(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=str(instance.pk),
+        ).delete()
+
+    @classmethod
+    def backfill(cls, ciudadano_id=None, batch_size=1000, stdout=None):
+        """Reconstruye la línea de tiempo desde los modelos de origen.
+
+        Cada lote de ``CIUDADANOS_POR_TRANSACCION`` ciudadanos se borra y se
+        vuelve a insertar en una misma transacción: mientras corre, o si falla
+        a mitad de camino, ninguna línea de tiempo queda vacía o incompleta.
+        Si se indica ``ciudadano_id`` solo se reconstruye ese ciudadano.
+        Devuelve la cantidad de entradas creadas.
+        """
+        lotes = [[ciudadano_id]] if ciudadano_id is not None else cls._lotes_ciudadanos()
+        total = procesados = 0
+        for ids in lotes:
+            with transaction.atomic():
+                total += cls._reconstruir_ciudadanos(ids, batch_size)
+            procesados += len(ids)
+            if stdout:
+                stdout.write(f'{procesados} ciudadanos: {total} entradas acumuladas')
+        return total
+
+    @staticmethod
+    def _lotes_ciudadanos():
+        ultimo = None
+        while True:
+            ciudadanos = Ciudadano.objects.order_by('pk')
+            if ultimo is not None:
+                ciudadanos = ciudadanos.filter(pk__gt=ultimo)
+            ids = list(ciudadanos.values_list('pk', flat=True)[:CIUDADANOS_POR_TRANSACCION])
+            if not ids:
+                return
+            yield ids
+            ultimo = ids[-1]
+
+    @classmethod
+    def _reconstruir_ciudadanos(cls, ids, batch_size):
+        fuentes = [
+            (LegajoAtencion.objects.select_related('dispositivo', 'responsable'), 'ciudadano_id'),
+            (SeguimientoContacto.objects.select_related('legajo', 'profesional__usuario'), 'legajo__ciudadano_id'),
+            (EvaluacionInicial.objects.select_related('legajo'), 'legajo__ciudadano_id'),
+            (PlanIntervencion.objects.select_related('legajo', 'profesional__usuario'), 'legajo__ciudadano_id'),
+            (Derivacion.objects.select_related('legajo', 'destino'), 'legajo__ciudadano_id'),
+            (EventoCritico.objects.select_related('legajo'), 'legajo__ciudadano_id'),
+            (VinculoFamiliar.objects.select_related('ciudadano_vinculado'), 'ciudadano_principal_id'),
+        ]
+
+        ActividadCiudadano.objects.filter(ciudadano_id__in=ids).delete()
+
+        total = 0
+        for queryset, campo_ciudadano in fuentes:
+            total += cls._backfill_queryset(queryset.filter(**{f'{campo_ciudadano}__in': ids}), batch_size)
+
+        # Los adjuntos usan una relación genérica: se resuelven de a uno
+        legajo_ids = LegajoAtencion.objects.filter(ciudadano_id__in=ids).values_list('id', flat=True)
+        adjuntos = Adjunto.objects.select_related('content_type').filter(
+            content_type=ContentType.objects.get_for_model(LegajoAtencion),
+            object_id__in=legajo_ids,
+        )
+        total += cls._backfill_queryset(adjuntos, batch_size)
+        return total
+
+    @classmethod
+    def _backfill_queryset(cls, queryset, batch_size):
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        lote = []
+        total = 0
+        for instance in queryset.iterator(chunk_size=batch_size):
+            entradas, _ = cls.entradas_para(instance)
+            for entrada in entradas:
+                lote.append(ActividadCiudadano(
+                    content_type=content_type,
+                    object_id=str(instance.pk),
+                    **entrada,
+                ))
+            if len(lote) >= batch_size:
+                ActividadCiudadano.objects.bulk_create(lote, ignore_conflicts=True)
+                total += len(lote)
+                lote = []
+        if lote:
+            ActividadCiudadano.objects.bulk_create(lote, ignore_conflicts=True)
+            total += len(lote)
+        return total
+
+    # ------------------------------------------------------------------
+    # Lectura con paginación por cursor
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def codificar_cursor(actividad):
+        valor = f'{actividad.fecha.isoformat()}|{actividad.id}'
+        return base64.urlsafe_b64encode(valor.encode()).decode()
+
+    @staticmethod
+    def decodificar_cursor(cursor):
+        """Devuelve ``(fecha, id)`` o ``None`` si el cursor es inválido"""
+        try:
+            fecha, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(fecha), int(pk)
+        except (ValueError, TypeError, UnicodeDecodeError):
+            return None
+
+    @classmethod
+    def listar(cls, ciudadano_id, cursor=None, limite=LIMITE_POR_DEFECTO):
+        """Página de la línea de tiempo ordenada por fecha descendente.
+
+        Resuelve la página con una única consulta sobre el índice
+        (ciudadano, -fecha, -id). Devuelve ``(actividades, siguiente_cursor)``.
+        """
+        limite = max(1, min(limite, LIMITE_MAXIMO))
+        queryset = ActividadCiudadano.objects.filter(ciudadano_id=ciudadano_id)
+
+        posicion = cls.decodificar_cursor(cursor) if cursor else None
+        if posicion:
+            fecha, pk = posicion
+            queryset = queryset.filter(Q(fecha__lt=fecha) | Q(fecha=fecha, id__lt=pk))
+
+        actividades = list(queryset.order_by('-fecha', '-id')[:limite + 1])
+        siguiente = None
+        if len(actividades) > limite:
+            actividades = actividades[:limite]
+            siguiente = cls.codificar_cursor(actividades[-1])
+        return actividades, siguiente
+
+
+TimelineService._CONSTRUCTORES = {
+    LegajoAtencion: TimelineService._desde_legajo,
+    SeguimientoContacto: TimelineService._desde_seguimiento,
+    EvaluacionInicial: TimelineService._desde_evaluacion,
+    PlanIntervencion: TimelineService._desde_plan,
+    Derivacion: TimelineService._desde_derivacion,
+    EventoCritico: TimelineService._desde_evento,
+    VinculoFamiliar: TimelineService._desde_vinculo,
+    Adjunto: TimelineService._desde_adjunto,
+}
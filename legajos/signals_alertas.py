@@ -1,12 +1,18 @@
+import logging
+
+from django.db import transaction
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 
-from .models import EventoCritico, SeguimientoContacto, LegajoAtencion
+from .models import EventoCritico, LegajoAtencion
+from .models_contactos import HistorialContacto
 from .services_alertas import AlertasService
 from conversaciones.models import Mensaje, Conversacion
 
+logger = logging.getLogger(__name__)
+
 
 @receiver(post_save, sender=EventoCritico)
 def alerta_evento_critico(sender, instance, created, **kwargs):
@@ -19,12 +25,16 @@ def alerta_evento_critico(sender, instance, created, **kwargs):
         )
 
 
-@receiver(post_save, sender=SeguimientoContacto)
-def verificar_seguimiento_vencido(sender, instance, created, **kwargs):
-    """Verifica si hay seguimientos vencidos al crear uno nuevo"""
-    if created:
-        # Generar alerta si es necesario basado en otros criterios
-        pass
+@receiver(post_save, sender=HistorialContacto)
+def agendar_proximo_contacto(sender, instance, created, **kwargs):
+    """Mantiene el ítem de agenda del próximo contacto; los vencidos los alerta la agenda"""
+    def sincronizar():
+        from .services_agenda import sincronizar as sincronizar_agenda
+        try:
+            sincronizar_agenda(instance, creado=created)
+        except Exception as e:
+            logger.error(f"Error actualizando la agenda del contacto {instance.pk}: {e}")
+    transaction.on_commit(sincronizar)
 
 
 @receiver(post_save, sender=Mensaje)
@@ -0,0 +1,33 @@
+"""
+Versiones de los validadores condicionales (ver core.respuestas_condicionales)
+para datos que dependen de otros modelos: contadores anotados y métricas.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.respuestas_condicionales import incrementar_version
+
+# Modelo -> agregados cuyas respuestas cambian con él
+AGREGADOS_POR_MODELO = {
+    'legajos.LegajoAtencion': ('legajos',),  # legajos_count de ciudadanos
+    'legajos.SeguimientoContacto': ('legajos',),
+    'legajos.EventoCritico': ('legajos',),
+    'legajos.HistorialContacto': ('contactos',),
+    'legajos.VinculoFamiliar': ('contactos',),
+    'legajos.DispositivoVinculado': ('contactos',),
+}
+
+
+def _receptor(agregados):
+    def incrementar(sender, **kwargs):
+        def aplicar():
+            for agregado in agregados:
+                incrementar_version(agregado)
+        transaction.on_commit(aplicar)
+    return incrementar
+
+
+for _modelo, _agregados in AGREGADOS_POR_MODELO.items():
+    _incrementar = _receptor(_agregados)
+    post_save.connect(_incrementar, sender=_modelo, weak=False, dispatch_uid=f'condicional_save_{_modelo}')
+    post_delete.connect(_incrementar, sender=_modelo, weak=False, dispatch_uid=f'condicional_delete_{_modelo}')
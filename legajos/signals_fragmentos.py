@@ -0,0 +1,120 @@
+import logging
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+
+from core.fragment_cache import incrementar_version
+from core.models import Institucion
+from .models import (
+    Ciudadano, LegajoAtencion, SeguimientoContacto, EvaluacionInicial,
+    PlanIntervencion, Derivacion, EventoCritico, InscriptoActividad,
+    RegistroAsistencia, PlanFortalecimiento
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _dependientes(instance):
+    """Objetos cuyos fragmentos muestran datos de la instancia"""
+    if isinstance(instance, LegajoAtencion):
+        return [(LegajoAtencion, instance.pk), (Ciudadano, instance.ciudadano_id)]
+    if isinstance(instance, InscriptoActividad):
+        return [(Ciudadano, instance.ciudadano_id)]
+    if isinstance(instance, RegistroAsistencia):
+        return [(Ciudadano, instance.inscripto.ciudadano_id)]
+    # Modelos que cuelgan de un legajo
+    return [(LegajoAtencion, instance.legajo_id), (Ciudadano, instance.legajo.ciudadano_id)]
+
+
+MODELOS_FRAGMENTOS = [
+    LegajoAtencion, SeguimientoContacto, EvaluacionInicial, PlanIntervencion,
+    Derivacion, EventoCritico, InscriptoActividad, RegistroAsistencia,
+]
+
+
+def invalidar_fragmentos(sender, instance, raw=False, **kwargs):
+    """Incrementa la versión de los fragmentos de legajo/ciudadano afectados"""
+    if raw:
+        return
+    try:
+        for modelo, pk in _dependientes(instance):
+            incrementar_version(modelo, pk)
+    except Exception as e:
+        logger.error(f"Error invalidando fragmentos ({sender.__name__} {instance.pk}): {e}")
+
+
+for modelo in MODELOS_FRAGMENTOS:
+    post_save.connect(
+        invalidar_fragmentos,
+        sender=modelo,
+        dispatch_uid=f"fragmentos_save_{modelo.__name__}",
+    )
+    post_delete.connect(
+        invalidar_fragmentos,
+        sender=modelo,
+        dispatch_uid=f"fragmentos_delete_{modelo.__name__}",
+    )
+
+
+# --- Nombres de otros modelos que muestran los fragmentos ---
+
+def _legajos_con(**filtro):
+    dependientes = set()
+    for pk, ciudadano_id in LegajoAtencion.objects.filter(**filtro).values_list('pk', 'ciudadano_id').iterator():
+        dependientes.add((LegajoAtencion, pk))
+        dependientes.add((Ciudadano, ciudadano_id))
+    return dependientes
+
+
+def _inscriptos_en(actividad_id):
+    ciudadanos = InscriptoActividad.objects.filter(actividad_id=actividad_id).values_list('ciudadano_id', flat=True)
+    return {(Ciudadano, ciudadano_id) for ciudadano_id in ciudadanos.distinct()}
+
+
+# modelo -> (campos que se renderizan, objetos cuyos fragmentos los muestran)
+NOMBRES_RENDERIZADOS = {
+    User: (('first_name', 'last_name', 'username'), lambda pk: _legajos_con(responsable_id=pk)),
+    Institucion: (('nombre',), lambda pk: _legajos_con(dispositivo_id=pk)),
+    PlanFortalecimiento: (('nombre',), _inscriptos_en),
+}
+
+
+def recordar_nombres(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda los valores anteriores para saber en post_save si cambió algo visible"""
+    campos, _ = NOMBRES_RENDERIZADOS[sender]
+    instance._nombres_fragmentos = None
+    if raw or instance.pk is None or (update_fields is not None and not set(update_fields) & set(campos)):
+        return
+    instance._nombres_fragmentos = sender._base_manager.filter(pk=instance.pk).values_list(*campos).first()
+
+
+def invalidar_por_nombre(sender, instance, created=False, raw=False, **kwargs):
+    anteriores = getattr(instance, '_nombres_fragmentos', None)
+    if raw or created or anteriores is None:
+        return
+    campos, dependientes = NOMBRES_RENDERIZADOS[sender]
+    if tuple(getattr(instance, campo) for campo in campos) == anteriores:
+        return
+    pk = instance.pk
+
+    def invalidar():
+        try:
+            for modelo, obj_pk in dependientes(pk):
+                incrementar_version(modelo, obj_pk)
+        except Exception as e:
+            logger.error(f"Error invalidando fragmentos por cambio de nombre ({sender.__name__} {pk}): {e}")
+    transaction.on_commit(invalidar)
+
+
+for modelo in NOMBRES_RENDERIZADOS:
+    pre_save.connect(
+        recordar_nombres,
+        sender=modelo,
+        dispatch_uid=f"fragmentos_nombres_pre_{modelo.__name__}",
+    )
+    post_save.connect(
+        invalidar_por_nombre,
+        sender=modelo,
+        dispatch_uid=f"fragmentos_nombres_{modelo.__name__}",
+    )
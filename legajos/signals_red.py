@@ -0,0 +1,39 @@
+import logging
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models_contactos import VinculoFamiliar, ProfesionalTratante, DispositivoVinculado
+from .services_grafo import RedContactosService
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=VinculoFamiliar)
+@receiver(post_delete, sender=VinculoFamiliar)
+def actualizar_grafo_vinculo(sender, instance, **kwargs):
+    """Actualiza la arista del vínculo en el grafo de la red de contactos"""
+    try:
+        RedContactosService.actualizar_vinculo(instance, eliminado=kwargs.get('signal') is post_delete)
+    except Exception as e:
+        logger.error(f"Error actualizando grafo de contactos (vínculo {instance.pk}): {e}")
+
+
+@receiver(post_save, sender=ProfesionalTratante)
+@receiver(post_delete, sender=ProfesionalTratante)
+def actualizar_grafo_profesional(sender, instance, **kwargs):
+    """Actualiza la arista ciudadano-profesional en el grafo"""
+    try:
+        RedContactosService.actualizar_profesional(instance, eliminado=kwargs.get('signal') is post_delete)
+    except Exception as e:
+        logger.error(f"Error actualizando grafo de contactos (profesional {instance.pk}): {e}")
+
+
+@receiver(post_save, sender=DispositivoVinculado)
+@receiver(post_delete, sender=DispositivoVinculado)
+def actualizar_grafo_dispositivo(sender, instance, **kwargs):
+    """Actualiza la arista ciudadano-dispositivo en el grafo"""
+    try:
+        RedContactosService.actualizar_dispositivo(instance, eliminado=kwargs.get('signal') is post_delete)
+    except Exception as e:
+        logger.error(f"Error actualizando grafo de contactos (dispositivo {instance.pk}): {e}")
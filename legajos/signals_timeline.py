@@ -0,0 +1,49 @@
+import logging
+
+from django.db.models.signals import post_save, post_delete
+
+from .models import (
+    LegajoAtencion, SeguimientoContacto, EvaluacionInicial, PlanIntervencion,
+    Derivacion, EventoCritico, Adjunto
+)
+from .models_contactos import VinculoFamiliar
+from .services_timeline import TimelineService
+
+logger = logging.getLogger(__name__)
+
+MODELOS_TIMELINE = [
+    LegajoAtencion, SeguimientoContacto, EvaluacionInicial, PlanIntervencion,
+    Derivacion, EventoCritico, VinculoFamiliar, Adjunto,
+]
+
+
+def sincronizar_actividad_ciudadano(sender, instance, raw=False, **kwargs):
+    """Mantiene actualizada la línea de tiempo del ciudadano"""
+    if raw:
+        return
+    try:
+        TimelineService.sincronizar(instance)
+    except Exception as e:
+        # La línea de tiempo se puede reconstruir con backfill_actividades
+        logger.error(f"Error sincronizando línea de tiempo ({sender.__name__} {instance.pk}): {e}")
+
+
+def eliminar_actividad_ciudadano(sender, instance, **kwargs):
+    """Quita de la línea de tiempo los registros eliminados"""
+    try:
+        TimelineService.eliminar(instance)
+    except Exception as e:
+        logger.error(f"Error eliminando actividad de línea de tiempo ({sender.__name__} {instance.pk}): {e}")
+
+
+for modelo in MODELOS_TIMELINE:
+    post_save.connect(
+        sincronizar_actividad_ciudadano,
+        sender=modelo,
+        dispatch_uid=f"timeline_save_{modelo.__name__}",
+    )
+    post_delete.connect(
+        eliminar_actividad_ciudadano,
+        sender=modelo,
+        dispatch_uid=f"timeline_delete_{modelo.__name__}",
+    )
@@ -4,6 +4,8 @@ from . import views_dashboard_simple as views_simple
 from . import views_simple_contactos as views_contactos_simple
 from . import views_alertas
 from . import views_cursos
+from . import views_red_contactos
+from . import views_operaciones
 
 app_name = 'legajos'
 
@@ -69,6 +71,11 @@ urlpatterns = [
     # Red de Contactos
     path('<uuid:legajo_id>/red-contactos/', views_contactos_simple.red_contactos_simple, name='red_contactos'),
     
+    # API Grafo de Red de Contactos
+    path('ciudadanos/<int:ciudadano_id>/red/alcance/', views_red_contactos.red_alcance_api, name='red_alcance'),
+    path('ciudadanos/<int:ciudadano_id>/red/hogar/', views_red_contactos.red_hogar_api, name='red_hogar'),
+    path('ciudadanos/<int:ciudadano_id>/red/compartidos/', views_red_contactos.red_compartidos_api, name='red_compartidos'),
+    
     # API Actividades
     path('ciudadanos/<int:ciudadano_id>/actividades/', views_contactos_simple.actividades_ciudadano_api, name='actividades_ciudadano'),
     
@@ -79,6 +86,7 @@ urlpatterns = [
     path('ciudadanos/<int:ciudadano_id>/archivos/', views_contactos_simple.archivos_ciudadano_api, name='archivos_ciudadano'),
     path('ciudadanos/<int:ciudadano_id>/subir-archivos/', views_contactos_simple.subir_archivos_ciudadano, name='subir_archivos_ciudadano'),
     path('archivos/<int:archivo_id>/eliminar/', views_contactos_simple.eliminar_archivo, name='eliminar_archivo'),
+    path('archivos/<int:archivo_id>/descargar/', views_contactos_simple.descargar_archivo, name='descargar_archivo'),
     
     # API Alertas
     path('ciudadanos/<int:ciudadano_id>/alertas/', views_contactos_simple.alertas_ciudadano_api, name='alertas_ciudadano'),
@@ -103,6 +111,11 @@ urlpatterns = [
     path('alertas/preview/', views_alertas.alertas_preview_ajax, name='alertas_preview_ajax'),
     path('alertas/debug/', views_alertas.debug_alertas, name='debug_alertas'),
     path('alertas/test/', views_alertas.test_alertas_page, name='test_alertas'),
+    path('agenda/semana/', views_alertas.agenda_semana_api, name='agenda_semana'),
+    
+    # Operaciones masivas
+    path('operaciones-masivas/', views_operaciones.operacion_masiva_crear, name='operacion_masiva_crear'),
+    path('operaciones-masivas/<int:operacion_id>/', views_operaciones.operacion_masiva_estado, name='operacion_masiva_estado'),
     
     # Instituciones
     path('instituciones/', views.InstitucionListView.as_view(), name='instituciones'),
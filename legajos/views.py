@@ -10,6 +10,7 @@ from django.core.exceptions import ValidationError
 from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from core.cache_decorators import cache_view, cache_queryset, invalidate_cache_pattern
+from core.permisos import grupos_usuario
 import csv
 import json
 from datetime import datetime
@@ -896,7 +897,7 @@ class CambiarResponsableView(LoginRequiredMixin, View):
             legajo = get_object_or_404(LegajoAtencion, pk=legajo_id)
             
             # Verificar permisos (solo administradores o el responsable actual)
-            if not (request.user.groups.filter(name='Administrador').exists() or 
+            if not ('Administrador' in grupos_usuario(request.user) or 
                    legajo.responsable == request.user):
                 return JsonResponse({'success': False, 'error': 'No tiene permisos para cambiar el responsable'})
             
@@ -904,7 +905,7 @@ class CambiarResponsableView(LoginRequiredMixin, View):
             nuevo_responsable = get_object_or_404(User, pk=nuevo_responsable_id)
             
             # Verificar que el nuevo responsable tenga el rol adecuado
-            if not nuevo_responsable.groups.filter(name='Ciudadanos').exists():
+            if 'Ciudadanos' not in grupos_usuario(nuevo_responsable):
                 return JsonResponse({'success': False, 'error': 'El usuario seleccionado no tiene el rol adecuado'})
             
             responsable_anterior = legajo.responsable
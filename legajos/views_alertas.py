@@ -1,9 +1,15 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from .models import AlertaCiudadano
+from .models_agenda import ItemAgenda
+from .services_agenda import agenda_semana
 from .services_alertas import AlertasService
 from .services_filtros_usuario import FiltrosUsuarioService
+from core.permisos import GRUPOS_CONVERSACIONES, grupos_usuario
+from core.respuestas_condicionales import condicional, validador_queryset
 
 
 @login_required
@@ -26,7 +32,7 @@ def alertas_dashboard(request):
     
     # Alertas de conversaciones si el usuario tiene permisos
     alertas_conversaciones = []
-    if request.user.groups.filter(name__in=['Conversaciones', 'OperadorCharla']).exists():
+    if not grupos_usuario(request.user).isdisjoint(GRUPOS_CONVERSACIONES):
         from conversaciones.models import HistorialAlertaConversacion
         alertas_conversaciones = HistorialAlertaConversacion.objects.filter(
             operador=request.user
@@ -119,7 +125,7 @@ def debug_alertas(request):
     legajos_count = LegajoAtencion.objects.count()
     
     # Información del usuario
-    grupos_usuario = list(request.user.groups.values_list('name', flat=True))
+    grupos = sorted(grupos_usuario(request.user))
     es_superuser = request.user.is_superuser
     try:
         profile = request.user.profile
@@ -135,7 +141,7 @@ def debug_alertas(request):
     <ul>
         <li><strong>Usuario:</strong> {request.user.username}</li>
         <li><strong>Superusuario:</strong> {es_superuser}</li>
-        <li><strong>Grupos:</strong> {', '.join(grupos_usuario) if grupos_usuario else 'Ninguno'}</li>
+        <li><strong>Grupos:</strong> {', '.join(grupos) if grupos else 'Ninguno'}</li>
         <li><strong>Usuario Provincial:</strong> {es_provincial}</li>
         <li><strong>Provincia:</strong> {provincia or 'No asignada'}</li>
     </ul>
@@ -195,4 +201,42 @@ def debug_alertas(request):
 @login_required
 def test_alertas_page(request):
     """Página de prueba interactiva para el sistema de alertas"""
-    return render(request, 'legajos/test_alertas.html')
\ No newline at end of file
+    return render(request, 'legajos/test_alertas.html')
+
+def _validador_agenda(request):
+    return validador_queryset(
+        ItemAgenda.objects.filter(profesional=request.user),
+        extra=(timezone.localdate(), request.GET.get('desde', '')),
+    )
+
+
+@login_required
+@condicional(_validador_agenda)
+def agenda_semana_api(request):
+    """Próximos contactos del profesional para la semana y vencidos anteriores"""
+    try:
+        desde = parse_date(request.GET.get('desde', '')) or timezone.localdate()
+    except ValueError:
+        # Bien formada pero inexistente (2024-13-45)
+        desde = timezone.localdate()
+    semana, atrasados = agenda_semana(request.user, desde)
+
+    def serializar(item):
+        return {
+            'id': item.id,
+            'vence': item.vence.isoformat(),
+            'estado': item.estado,
+            'legajo_id': str(item.legajo_id),
+            'ciudadano': item.legajo.ciudadano.nombre_completo,
+            'motivo': item.contacto.motivo,
+            'proximos_pasos': item.contacto.proximos_pasos,
+        }
+
+    dias = {}
+    for item in semana:
+        dias.setdefault(item.vence.isoformat(), []).append(serializar(item))
+    return JsonResponse({
+        'desde': desde.isoformat(),
+        'dias': dias,
+        'vencidos': [serializar(item) for item in atrasados],
+    })
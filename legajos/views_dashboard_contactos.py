@@ -1,7 +1,10 @@
+import logging
+
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.db.models import Count, Q, Avg
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models_contactos import (
@@ -9,6 +12,18 @@ from .models_contactos import (
     DispositivoVinculado, ContactoEmergencia
 )
 from .models import LegajoAtencion
+from core.respuestas_condicionales import condicional, validador_queryset
+from core.series_tiempo import vector_diario
+from .series import CONTACTOS
+
+logger = logging.getLogger(__name__)
+
+
+def _validador_metricas(request):
+    # Las ventanas son relativas al día; vínculos y dispositivos suben la versión 'contactos'
+    return validador_queryset(
+        HistorialContacto.objects.all(), extra=(timezone.now().date(),), agregados=('contactos',),
+    )
 
 
 @login_required
@@ -18,6 +33,7 @@ def dashboard_contactos(request):
 
 
 @login_required
+@condicional(_validador_metricas)
 def metricas_contactos_api(request):
     """API para métricas del dashboard"""
     # Fechas para filtros
@@ -72,16 +88,22 @@ def metricas_contactos_api(request):
     )
     
     # Tendencia semanal (últimos 7 días)
-    tendencia_semanal = []
-    for i in range(7):
-        fecha = hoy - timedelta(days=i)
-        contactos_dia = HistorialContacto.objects.filter(
-            fecha_contacto__date=fecha
-        ).count()
-        tendencia_semanal.append({
-            'fecha': fecha.strftime('%Y-%m-%d'),
-            'contactos': contactos_dia
-        })
+    dias = [hoy - timedelta(days=i) for i in range(6, -1, -1)]
+    try:
+        conteos = vector_diario(CONTACTOS.metrica, dias[0], hoy)
+    except Exception as e:
+        logger.warning(f"Serie de contactos no disponible, se agrega desde la base: {e}")
+        por_dia = dict(
+            HistorialContacto.objects.filter(fecha_contacto__date__gte=dias[0], fecha_contacto__date__lte=hoy)
+            .annotate(dia=TruncDate('fecha_contacto'))
+            .values('dia')
+            .annotate(total=Count('id'))
+            .values_list('dia', 'total')
+        )
+        conteos = [por_dia.get(dia, 0) for dia in dias]
+    tendencia_semanal = [
+        {'fecha': dia.strftime('%Y-%m-%d'), 'contactos': total} for dia, total in zip(dias, conteos)
+    ]
     
     return JsonResponse({
         'metricas_generales': {
@@ -95,7 +117,7 @@ def metricas_contactos_api(request):
         'contactos_por_estado': contactos_por_estado,
         'profesionales_activos': profesionales_activos,
         'dispositivos_activos': dispositivos_activos,
-        'tendencia_semanal': list(reversed(tendencia_semanal))
+        'tendencia_semanal': tendencia_semanal
     })
 
 
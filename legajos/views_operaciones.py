@@ -0,0 +1,75 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+
+from core import operaciones_masivas
+from core.models_auditoria_extendida import OperacionMasiva
+from core.permisos import tiene_grupo
+
+from .operaciones_masivas import CAMBIAR_RESPONSABLE, CERRAR_LEGAJOS, DESACTIVAR_CIUDADANOS
+
+# Acción -> grupos requeridos (vacío: cualquier usuario; la acción valida por fila)
+ACCIONES_PERMITIDAS = {
+    CAMBIAR_RESPONSABLE: (),
+    CERRAR_LEGAJOS: (),
+    DESACTIVAR_CIUDADANOS: ('Administrador',),
+}
+MAX_OBJETIVOS = 20000
+
+
+def _ip_cliente(request):
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0]
+    return request.META.get('REMOTE_ADDR')
+
+
+@login_required
+@require_POST
+def operacion_masiva_crear(request):
+    """Encola una operación masiva; se ejecuta por lotes fuera del request"""
+    accion = request.POST.get('accion')
+    ids = [pk for pk in request.POST.getlist('ids') if pk]
+    if accion not in ACCIONES_PERMITIDAS:
+        return JsonResponse({'success': False, 'error': 'Acción no válida'}, status=400)
+    grupos = ACCIONES_PERMITIDAS[accion]
+    if grupos and not tiene_grupo(request.user, *grupos):
+        return JsonResponse({'success': False, 'error': 'No tiene permisos para esta operación'}, status=403)
+    if not ids or len(ids) > MAX_OBJETIVOS:
+        return JsonResponse({'success': False, 'error': f'Debe indicar entre 1 y {MAX_OBJETIVOS} registros'}, status=400)
+
+    parametros = {}
+    if accion == CAMBIAR_RESPONSABLE:
+        parametros['responsable_id'] = request.POST.get('responsable_id')
+    elif accion == CERRAR_LEGAJOS:
+        parametros['motivo'] = request.POST.get('motivo', '')
+
+    operacion = operaciones_masivas.encolar(
+        accion, ids, usuario=request.user, parametros=parametros, ip_address=_ip_cliente(request),
+    )
+    return JsonResponse({
+        'success': True,
+        'operacion_id': operacion.pk,
+        'estado_url': reverse('legajos:operacion_masiva_estado', args=[operacion.pk]),
+    }, status=202)
+
+
+@login_required
+@require_GET
+def operacion_masiva_estado(request, operacion_id):
+    """Progreso de una operación masiva del usuario"""
+    filtros = {} if tiene_grupo(request.user, 'Administrador') else {'usuario': request.user}
+    operacion = get_object_or_404(OperacionMasiva.objects.defer('objetivos'), pk=operacion_id, **filtros)
+    return JsonResponse({
+        'operacion_id': operacion.pk,
+        'accion': operacion.accion,
+        'estado': operacion.estado,
+        'total': operacion.cantidad_registros,
+        'procesados': operacion.procesados,
+        'exitosos': operacion.registros_exitosos,
+        'fallidos': operacion.registros_fallidos,
+        'progreso': operacion.progreso,
+        'fecha_fin': operacion.fecha_fin.isoformat() if operacion.fecha_fin else None,
+    })
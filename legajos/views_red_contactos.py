@@ -10,6 +10,20 @@ from .models_contactos import (
     ContactoEmergencia
 )
 from core.models import DispositivoRed
+from core.respuestas_condicionales import condicional, validador_queryset
+
+
+def _validador_vinculos(request, legajo_id):
+    ciudadano_id = LegajoAtencion.objects.filter(id=legajo_id).values_list('ciudadano_id', flat=True).first()
+    if ciudadano_id is None:
+        return None
+    vinculos = VinculoFamiliar.objects.filter(ciudadano_principal_id=ciudadano_id, activo=True)
+    return validador_queryset(vinculos, 'modificado', 'ciudadano_vinculado__modificado')
+
+
+def _validador_profesionales(request, legajo_id):
+    profesionales = ProfesionalTratante.objects.filter(legajo_id=legajo_id, activo=True)
+    return validador_queryset(profesionales, 'modificado', 'dispositivo__modificado')
 
 
 @login_required
@@ -22,6 +36,7 @@ def red_contactos_view(request, legajo_id):
 
 
 @login_required
+@condicional(_validador_vinculos)
 def vinculos_api(request, legajo_id):
     """API para obtener vínculos familiares"""
     legajo = get_object_or_404(LegajoAtencion, id=legajo_id)
@@ -55,6 +70,7 @@ def vinculos_api(request, legajo_id):
 
 
 @login_required
+@condicional(_validador_profesionales)
 def profesionales_api(request, legajo_id):
     """API para obtener profesionales tratantes"""
     legajo = get_object_or_404(LegajoAtencion, id=legajo_id)
@@ -299,4 +315,110 @@ def crear_contacto_emergencia(request, legajo_id):
         return JsonResponse({
             'success': False,
             'error': str(e)
-        })
\ No newline at end of file
+        })
+
+def _etiquetas_nodos(claves):
+    """Resuelve nombres para nodos del grafo (una consulta por tipo de nodo)"""
+    ids = {'C': set(), 'U': set(), 'D': set()}
+    for tipo, pk in claves:
+        ids[tipo].add(pk)
+    
+    etiquetas = {}
+    if ids['C']:
+        for c in Ciudadano.objects.filter(id__in=ids['C']).values('id', 'nombre', 'apellido', 'dni'):
+            etiquetas[('C', c['id'])] = {'nombre': f"{c['apellido']}, {c['nombre']}", 'dni': c['dni']}
+    if ids['U']:
+        for u in User.objects.filter(id__in=ids['U']).values('id', 'username', 'first_name', 'last_name'):
+            nombre = f"{u['first_name']} {u['last_name']}".strip() or u['username']
+            etiquetas[('U', u['id'])] = {'nombre': nombre}
+    if ids['D']:
+        for d in DispositivoRed.objects.filter(id__in=ids['D']).values('id', 'nombre'):
+            etiquetas[('D', d['id'])] = {'nombre': d['nombre']}
+    return etiquetas
+
+
+def _nodo_json(clave, etiquetas, **extra):
+    tipos = {'C': 'ciudadano', 'U': 'profesional', 'D': 'dispositivo'}
+    data = {'tipo': tipos[clave[0]], 'id': clave[1]}
+    data.update(etiquetas.get(clave, {}))
+    data.update(extra)
+    return data
+
+
+@login_required
+def red_alcance_api(request, ciudadano_id):
+    """API: personas, profesionales y dispositivos conectados dentro de N saltos"""
+    from .services_grafo import RedContactosService, mascara_desde_nombres, nombres_desde_mascara
+    
+    try:
+        saltos = max(1, min(int(request.GET.get('saltos', 2)), 3))
+    except (TypeError, ValueError):
+        saltos = 2
+    mascara = mascara_desde_nombres(request.GET.get('tipos'))
+    
+    grafo = RedContactosService.obtener_grafo()
+    alcance = grafo.bfs(('C', ciudadano_id), max_saltos=saltos, mascara=mascara)
+    etiquetas = _etiquetas_nodos([clave for clave, _, _, _ in alcance])
+    
+    data = [
+        _nodo_json(
+            clave, etiquetas,
+            distancia=distancia,
+            via={'tipo': padre[0], 'id': padre[1]},
+            relacion=nombres_desde_mascara(flags)
+        )
+        for clave, distancia, padre, flags in alcance
+    ]
+    return JsonResponse({'ciudadano_id': ciudadano_id, 'saltos': saltos, 'conectados': data})
+
+
+@login_required
+def red_hogar_api(request, ciudadano_id):
+    """API: grupo conviviente (componente conexa por vínculos de convivencia)"""
+    from .services_grafo import RedContactosService, mascara_desde_nombres, CONVIVE
+    
+    mascara = mascara_desde_nombres(request.GET.get('tipos'), defecto=CONVIVE)
+    grafo = RedContactosService.obtener_grafo()
+    miembros = grafo.componente(('C', ciudadano_id), mascara=mascara)
+    etiquetas = _etiquetas_nodos(miembros)
+    
+    return JsonResponse({
+        'ciudadano_id': ciudadano_id,
+        'miembros': [_nodo_json(clave, etiquetas) for clave in miembros],
+    })
+
+
+@login_required
+def red_compartidos_api(request, ciudadano_id):
+    """API: vecinos compartidos con otro ciudadano (?con=<id>) o contactos de emergencia compartidos"""
+    from .services_grafo import RedContactosService, mascara_desde_nombres, EMERGENCIA
+    
+    grafo = RedContactosService.obtener_grafo()
+    otro_id = request.GET.get('con')
+    
+    if otro_id:
+        try:
+            otro_id = int(otro_id)
+        except ValueError:
+            return JsonResponse({'error': 'Parámetro "con" inválido'}, status=400)
+        mascara = mascara_desde_nombres(request.GET.get('tipos'))
+        compartidos = grafo.vecinos_compartidos(('C', ciudadano_id), ('C', otro_id), mascara=mascara)
+        etiquetas = _etiquetas_nodos(compartidos)
+        return JsonResponse({
+            'ciudadano_id': ciudadano_id,
+            'con': otro_id,
+            'compartidos': [_nodo_json(clave, etiquetas) for clave in compartidos],
+        })
+    
+    mascara = mascara_desde_nombres(request.GET.get('tipos'), defecto=EMERGENCIA)
+    por_ciudadano = grafo.compartidos_via(('C', ciudadano_id), mascara=mascara)
+    claves = set(por_ciudadano)
+    for intermedios in por_ciudadano.values():
+        claves.update(intermedios)
+    etiquetas = _etiquetas_nodos(claves)
+    
+    data = [
+        _nodo_json(clave, etiquetas, compartidos=[_nodo_json(i, etiquetas) for i in intermedios])
+        for clave, intermedios in por_ciudadano.items()
+    ]
+    return JsonResponse({'ciudadano_id': ciudadano_id, 'ciudadanos': data})
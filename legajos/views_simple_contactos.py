@@ -1,5 +1,6 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import HttpResponseForbidden, JsonResponse
+from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from .models import LegajoAtencion, Ciudadano
 from datetime import datetime
@@ -41,128 +42,32 @@ def historial_contactos_simple(request, legajo_id):
     return render(request, 'legajos/historial_contactos_simple.html', context)
 
 def actividades_ciudadano_api(request, ciudadano_id):
-    """API para obtener todas las actividades de un ciudadano"""
+    """API para obtener todas las actividades de un ciudadano.
+
+    Lee la línea de tiempo desnormalizada (ActividadCiudadano) con paginación
+    por cursor: ``?cursor=<next_cursor>&limit=50``.
+    """
+    from .services_timeline import TimelineService, LIMITE_POR_DEFECTO
+
     try:
-        ciudadano = get_object_or_404(Ciudadano, id=ciudadano_id)
-        legajos = LegajoAtencion.objects.filter(ciudadano=ciudadano).select_related('dispositivo', 'responsable')
-        
-        actividades = []
-        
-        # Actividades básicas de legajos
-        for legajo in legajos:
-            # Apertura de acompañamiento
-            if legajo.fecha_apertura:
-                actividades.append({
-                    'fecha_hora': legajo.fecha_apertura.isoformat(),
-                    'tipo': 'APERTURA',
-                    'descripcion': f'Acompañamiento abierto en {legajo.dispositivo.nombre if legajo.dispositivo else "Dispositivo no especificado"}',
-                    'usuario_nombre': legajo.responsable.get_full_name() if legajo.responsable else 'Sistema',
-                    'legajo_id': str(legajo.id),
-                    'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
-                })
-            
-            # Cierre de acompañamiento
-            if hasattr(legajo, 'fecha_cierre') and legajo.fecha_cierre:
-                actividades.append({
-                    'fecha_hora': legajo.fecha_cierre.isoformat(),
-                    'tipo': 'CIERRE',
-                    'descripcion': 'Acompañamiento cerrado',
-                    'usuario_nombre': 'Sistema',
-                    'legajo_id': str(legajo.id),
-                    'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
-                })
-            
-            # Seguimientos
-            from .models import SeguimientoContacto
-            seguimientos = SeguimientoContacto.objects.filter(legajo=legajo).select_related('profesional__usuario')
-            for seg in seguimientos:
-                actividades.append({
-                    'fecha_hora': seg.creado.isoformat(),
-                    'tipo': 'SEGUIMIENTO',
-                    'descripcion': f'{seg.get_tipo_display()}: {seg.descripcion[:100] if seg.descripcion else "Sin descripción"}',
-                    'usuario_nombre': seg.profesional.usuario.get_full_name() if seg.profesional and seg.profesional.usuario else 'Sistema',
-                    'legajo_id': str(legajo.id),
-                    'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
-                })
-            
-            # Evaluaciones
-            from .models import EvaluacionInicial
-            try:
-                if hasattr(legajo, 'evaluacion'):
-                    eval = legajo.evaluacion
-                    actividades.append({
-                        'fecha_hora': eval.creado.isoformat(),
-                        'tipo': 'EVALUACION',
-                        'descripcion': f'Evaluación inicial realizada - Riesgo: {eval.nivel_riesgo if hasattr(eval, "nivel_riesgo") else "No especificado"}',
-                        'usuario_nombre': 'Sistema',
-                        'legajo_id': str(legajo.id),
-                        'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
-                    })
-            except:
-                pass
-            
-            # Planes de intervención
-            from .models import PlanIntervencion
-            planes = PlanIntervencion.objects.filter(legajo=legajo).select_related('profesional__usuario')
-            for plan in planes:
-                actividades.append({
-                    'fecha_hora': plan.creado.isoformat(),
-                    'tipo': 'PLAN',
-                    'descripcion': f'Plan de intervención creado - Objetivos: {plan.objetivos[:100] if plan.objetivos else "Sin objetivos"}',
-                    'usuario_nombre': plan.profesional.usuario.get_full_name() if plan.profesional and plan.profesional.usuario else 'Sistema',
-                    'legajo_id': str(legajo.id),
-                    'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
-                })
-            
-            # Derivaciones
-            from .models import Derivacion
-            derivaciones = Derivacion.objects.filter(legajo=legajo).select_related('destino')
-            for der in derivaciones:
-                actividades.append({
-                    'fecha_hora': der.creado.isoformat(),
-                    'tipo': 'DERIVACION',
-                    'descripcion': f'Derivación a {der.destino.nombre if der.destino else "destino no especificado"} - Estado: {der.get_estado_display()}',
-                    'usuario_nombre': 'Sistema',
-                    'legajo_id': str(legajo.id),
-                    'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
-                })
-            
-            # Eventos críticos
-            from .models import EventoCritico
-            eventos = EventoCritico.objects.filter(legajo=legajo)
-            for evento in eventos:
-                actividades.append({
-                    'fecha_hora': evento.creado.isoformat(),
-                    'tipo': 'EVENTO',
-                    'descripcion': f'Evento crítico: {evento.get_tipo_display()} - {evento.descripcion[:100] if evento.descripcion else ""}',
-                    'usuario_nombre': 'Sistema',
-                    'legajo_id': str(legajo.id),
-                    'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id)
-                })
-        
-        # Vínculos familiares
         try:
-            vinculos = VinculoFamiliar.objects.filter(ciudadano_principal=ciudadano)
-            for vinculo in vinculos:
-                actividades.append({
-                    'fecha_hora': vinculo.creado.isoformat() if hasattr(vinculo, 'creado') else datetime.now().isoformat(),
-                    'tipo': 'VINCULO',
-                    'descripcion': f'Vínculo agregado: {vinculo.get_tipo_vinculo_display() if hasattr(vinculo, "get_tipo_vinculo_display") else vinculo.tipo_vinculo}',
-                    'usuario_nombre': 'Sistema',
-                    'legajo_id': '-',
-                    'legajo_codigo': 'General'
-                })
-        except Exception as e:
-            print(f"Error cargando vínculos: {e}")
-        
-        # Ordenar por fecha descendente
-        actividades.sort(key=lambda x: x['fecha_hora'] or '', reverse=True)
-        
+            limite = int(request.GET.get('limit', LIMITE_POR_DEFECTO))
+        except (TypeError, ValueError):
+            limite = LIMITE_POR_DEFECTO
+
+        actividades, siguiente = TimelineService.listar(
+            ciudadano_id,
+            cursor=request.GET.get('cursor'),
+            limite=limite,
+        )
+        resultados = [actividad.as_dict() for actividad in actividades]
+
         return JsonResponse({
-            'results': actividades[:50],  # Limitar a 50 registros
-            'count': len(actividades)
+            'results': resultados,
+            'count': len(resultados),
+            'next_cursor': siguiente,
         })
-        
+
     except Exception as e:
         print(f"Error en actividades_ciudadano_api: {e}")
         import traceback
@@ -170,6 +75,7 @@ def actividades_ciudadano_api(request, ciudadano_id):
         return JsonResponse({
             'results': [],
             'count': 0,
+            'next_cursor': None,
             'error': str(e)
         })
 
@@ -317,10 +223,10 @@ def archivos_ciudadano_api(request, ciudadano_id):
                 # Archivo del ciudadano
                 archivos_data.append({
                     'id': archivo.id,
-                    'nombre': archivo.archivo.name.split('/')[-1],
+                    'nombre': archivo.nombre_visible,
                     'etiqueta': archivo.etiqueta,
-                    'url': archivo.archivo.url,
-                    'tamano': archivo.archivo.size,
+                    'url': _url_descarga(archivo, request.user),
+                    'tamano': archivo.tamano if archivo.tamano is not None else archivo.archivo.size,
                     'fecha_subida': archivo.creado.isoformat(),
                     'legajo_id': '-',
                     'legajo_codigo': 'Ciudadano',
@@ -332,10 +238,10 @@ def archivos_ciudadano_api(request, ciudadano_id):
                     legajo = LegajoAtencion.objects.get(id=archivo.object_id)
                     archivos_data.append({
                         'id': archivo.id,
-                        'nombre': archivo.archivo.name.split('/')[-1],
+                        'nombre': archivo.nombre_visible,
                         'etiqueta': archivo.etiqueta,
-                        'url': archivo.archivo.url,
-                        'tamano': archivo.archivo.size,
+                        'url': _url_descarga(archivo, request.user),
+                        'tamano': archivo.tamano if archivo.tamano is not None else archivo.archivo.size,
                         'fecha_subida': archivo.creado.isoformat(),
                         'legajo_id': str(legajo.id),
                         'legajo_codigo': str(legajo.codigo)[:12] + '...' if legajo.codigo else str(legajo.id),
@@ -356,6 +262,33 @@ def archivos_ciudadano_api(request, ciudadano_id):
             'error': str(e)
         })
 
+def _url_descarga(adjunto, usuario):
+    """Enlace firmado y de corta duración para descargar el adjunto"""
+    from django.urls import reverse
+    from core.descargas import firmar
+    
+    token = firmar('adjunto', adjunto.id, usuario.pk)
+    return f"{reverse('legajos:descargar_archivo', args=[adjunto.id])}?t={token}"
+
+@login_required
+def descargar_archivo(request, archivo_id):
+    """Autoriza y audita la descarga; el archivo lo envía nginx (X-Accel-Redirect)"""
+    from core.descargas import respuesta_archivo, verificar
+    from .models import Adjunto
+    
+    if verificar(request.GET.get('t', ''), 'adjunto', request.user.pk) != str(archivo_id):
+        return HttpResponseForbidden('Enlace de descarga inválido o vencido')
+    
+    adjunto = get_object_or_404(Adjunto, id=archivo_id)
+    return respuesta_archivo(
+        request,
+        adjunto.archivo,
+        adjunto.nombre_visible,
+        modelo_origen='Adjunto',
+        objeto_id=adjunto.pk,
+        adjunto='descargar' in request.GET,
+    )
+
 def eliminar_archivo(request, archivo_id):
     """Vista para eliminar un archivo"""
     if request.method == 'DELETE':
@@ -4,8 +4,11 @@ from django.contrib.auth.models import User, Group
 from django.contrib import messages
 from django.views.generic import TemplateView
 from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_protect, csrf_exempt
-from core.models import Institucion, Provincia, Municipio, Localidad
+from django.views.decorators.http import condition
+from core import catalogos
+from core.models import Institucion
 from core.forms import InstitucionForm
 
 
@@ -99,13 +102,17 @@ def consultar_tramite(request):
     return render(request, 'portal/consultar_tramite.html')
 
 
+@cache_control(public=True, max_age=catalogos.HTTP_MAX_AGE)
+@condition(etag_func=lambda request: catalogos.etag('m', request.GET.get('provincia_id', '')))
 def get_municipios(request):
-    provincia_id = request.GET.get('provincia_id')
-    municipios = Municipio.objects.filter(provincia_id=provincia_id).select_related('provincia').values('id', 'nombre')
-    return JsonResponse(list(municipios), safe=False)
+    provincia_id = catalogos.id_entero(request.GET.get('provincia_id'))
+    municipios = catalogos.obtener_catalogos().municipios_de(provincia_id)
+    return JsonResponse([opcion._asdict() for opcion in municipios], safe=False)
 
 
+@cache_control(public=True, max_age=catalogos.HTTP_MAX_AGE)
+@condition(etag_func=lambda request: catalogos.etag('l', request.GET.get('municipio_id', '')))
 def get_localidades(request):
-    municipio_id = request.GET.get('municipio_id')
-    localidades = Localidad.objects.filter(municipio_id=municipio_id).select_related('municipio').values('id', 'nombre')
-    return JsonResponse(list(localidades), safe=False)
\ No newline at end of file
+    municipio_id = catalogos.id_entero(request.GET.get('municipio_id'))
+    localidades = catalogos.obtener_catalogos().localidades_de(municipio_id)
+    return JsonResponse([opcion._asdict() for opcion in localidades], safe=False)
@@ -3,11 +3,12 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.http import JsonResponse
 from core.models import Institucion
+from core.permisos import tiene_grupo
 from legajos.models import LegajoAtencion
 
 
 def es_staff(user):
-    return user.is_superuser or user.is_staff or user.groups.filter(name__in=['Administrador', 'Supervisor']).exists()
+    return user.is_staff or tiene_grupo(user, 'Administrador', 'Supervisor')
 
 
 @login_required
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User, Group
 
+from core.catalogos import asignar_opciones, obtener_catalogos
 from core.models import Provincia
 from .models import Profile
 
@@ -55,6 +56,7 @@ class UserCreationForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         args, kwargs = _normalize_groups_args(args, kwargs)
         super().__init__(*args, **kwargs)
+        asignar_opciones(self.fields["provincia"], obtener_catalogos().provincias)
 
     password = forms.CharField(
         widget=forms.PasswordInput(attrs={
@@ -255,6 +257,7 @@ class CustomUserChangeForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         args, kwargs = _normalize_groups_args(args, kwargs)
         super().__init__(*args, **kwargs)
+        asignar_opciones(self.fields["provincia"], obtener_catalogos().provincias)
         self._original_password_hash = self.instance.password
         self.fields["password"].initial = ""
 
@@ -1,9 +1,10 @@
-import csv
 from pathlib import Path
 
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 
+from users.services_importacion import TAMANO_LOTE, ImportadorUsuarios
+
 
 class Command(BaseCommand):
     """Create or update users from a CSV and copy groups from a reference user."""
@@ -22,10 +23,28 @@ class Command(BaseCommand):
             default=368,
             help="ID del usuario cuyos grupos se copiarán (por defecto 368).",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=TAMANO_LOTE,
+            help=f"Usuarios por lote (por defecto {TAMANO_LOTE}).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Procesos para hashear contraseñas (por defecto, uno por núcleo).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo informa qué usuarios se crearían o actualizarían, sin escribir.",
+        )
 
     def handle(self, *args, **options):
         csv_path = Path(options["csv_path"])
         reference_user_id = options["reference_user_id"]
+        dry_run = options["dry_run"]
 
         if not csv_path.exists():
             raise CommandError(f"El archivo '{csv_path}' no existe.")
@@ -39,77 +58,40 @@ class Command(BaseCommand):
                 f"No se encontró el usuario de referencia con id={reference_user_id}."
             ) from exc
 
-        reference_groups = list(reference_user.groups.all())
-
-        created_count = 0
-        updated_count = 0
-
-        with csv_path.open(newline="", encoding="utf-8-sig") as csv_file:
-            reader = csv.DictReader(csv_file)
-            expected_columns = {
-                "Usuario",
-                "Email",
-                "Nombre completo",
-                "Apellido",
-                "Rol",
-                "Contraseña",
-            }
-            headers = set(reader.fieldnames or [])
-            missing_columns = expected_columns - headers
-            if missing_columns:
-                missing = ", ".join(sorted(missing_columns))
-                raise CommandError(
-                    f"El CSV no contiene las columnas requeridas: {missing}"
-                )
-
-            for row in reader:
-                username = (row.get("Usuario") or "").strip()
-                if not username:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            "Se encontró una fila sin valor en 'Usuario'; se omite."
-                        )
-                    )
-                    continue
-
-                email = (row.get("Email") or "").strip()
-                first_name = (row.get("Nombre completo") or "").strip()
-                last_name = (row.get("Apellido") or "").strip()
-                rol = (row.get("Rol") or "").strip()
-                raw_password = (row.get("Contraseña") or "").strip()
-
-                user, created = user_model.objects.get_or_create(
-                    username=username, defaults={"email": email}
-                )
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
-                    if email:
-                        user.email = email
-
-                user.first_name = first_name
-                user.last_name = last_name
-                if raw_password:
-                    user.set_password(raw_password)
-                user.save()
+        reference_group_ids = list(reference_user.groups.values_list("id", flat=True))
 
-                profile = getattr(user, "profile", None)
-                if profile:
-                    profile.rol = rol
-                    profile.save(update_fields=["rol"])
-
-                user.groups.set(reference_groups)
-
-                action = "creado" if created else "actualizado"
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Usuario '{username}' {action} y grupos replicados."
-                    )
+        importador = ImportadorUsuarios(
+            reference_group_ids,
+            tamano_lote=options["chunk_size"],
+            workers=options["workers"],
+            dry_run=dry_run,
+        )
+        try:
+            resultado = importador.importar(csv_path)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for linea, motivo in resultado.omitidos:
+            self.stdout.write(self.style.WARNING(f"Línea {linea}: {motivo}; se omite."))
+
+        if dry_run:
+            self.stdout.write(f"Usuarios a crear ({resultado.creados}):")
+            for username in resultado.usuarios_nuevos:
+                self.stdout.write(f"  + {username}")
+            self.stdout.write(f"Usuarios a actualizar ({resultado.actualizados}):")
+            for username in resultado.usuarios_existentes:
+                self.stdout.write(f"  ~ {username}")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Simulación finalizada. Se replicarían {len(reference_group_ids)} grupos; "
+                    f"filas omitidas: {len(resultado.omitidos)}. No se escribió nada."
                 )
+            )
+            return
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Proceso finalizado. Usuarios creados: {created_count}, actualizados: {updated_count}."
+                f"Proceso finalizado. Usuarios creados: {resultado.creados}, "
+                f"actualizados: {resultado.actualizados}, omitidos: {len(resultado.omitidos)}."
             )
         )
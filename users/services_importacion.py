@@ -0,0 +1,223 @@
+"""
+Importación masiva de usuarios desde CSV.
+
+Lee el archivo en streaming, hashea las contraseñas en un pool de procesos
+(PBKDF2 es CPU puro: un proceso por núcleo) y persiste cada lote con
+bulk_create/bulk_update, incluidos perfiles y la tabla intermedia de grupos.
+"""
+import csv
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+
+from core.permisos import invalidar_permisos
+from users.models import Profile
+
+logger = logging.getLogger("django")
+
+COLUMNAS_REQUERIDAS = {
+    "Usuario",
+    "Email",
+    "Nombre completo",
+    "Apellido",
+    "Rol",
+    "Contraseña",
+}
+TAMANO_LOTE = 500
+
+
+def _hashear(raw_password):
+    # Se ejecuta en los procesos del pool
+    return make_password(raw_password)
+
+
+def _inicializar_worker():
+    # Con "spawn" el proceso hijo arranca sin Django configurado
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+
+@dataclass
+class ResultadoImportacion:
+    creados: int = 0
+    actualizados: int = 0
+    omitidos: list = field(default_factory=list)  # (línea, motivo)
+    usuarios_nuevos: list = field(default_factory=list)
+    usuarios_existentes: list = field(default_factory=list)
+
+    @property
+    def procesados(self):
+        return self.creados + self.actualizados
+
+
+class ImportadorUsuarios:
+    """Crea o actualiza usuarios por lotes y les asigna los grupos indicados"""
+
+    def __init__(self, grupos_ids, tamano_lote=TAMANO_LOTE, workers=None, dry_run=False):
+        self.grupos_ids = set(grupos_ids)
+        self.tamano_lote = tamano_lote
+        self.workers = workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self._pool = None
+
+    # --- Lectura ---
+
+    @staticmethod
+    def validar_columnas(reader):
+        faltantes = COLUMNAS_REQUERIDAS - set(reader.fieldnames or [])
+        if faltantes:
+            raise ValueError(
+                f"El CSV no contiene las columnas requeridas: {', '.join(sorted(faltantes))}"
+            )
+
+    def _lotes(self, reader, resultado):
+        """Filas normalizadas agrupadas por lote; un usuario repetido conserva la última fila"""
+        lote = {}
+        for fila in reader:
+            linea = reader.line_num
+            username = (fila.get("Usuario") or "").strip()
+            if not username:
+                resultado.omitidos.append((linea, "Sin valor en 'Usuario'"))
+                continue
+            if username in lote:
+                resultado.omitidos.append((lote[username]["linea"], f"'{username}' repetido en la línea {linea}"))
+            lote[username] = {
+                "linea": linea,
+                "email": (fila.get("Email") or "").strip(),
+                "first_name": (fila.get("Nombre completo") or "").strip(),
+                "last_name": (fila.get("Apellido") or "").strip(),
+                "rol": (fila.get("Rol") or "").strip(),
+                "password": (fila.get("Contraseña") or "").strip(),
+            }
+            if len(lote) >= self.tamano_lote:
+                yield lote
+                lote = {}
+        if lote:
+            yield lote
+
+    # --- Pipeline ---
+
+    def importar(self, csv_path):
+        resultado = ResultadoImportacion()
+        with csv_path.open(newline="", encoding="utf-8-sig") as csv_file:
+            reader = csv.DictReader(csv_file)
+            self.validar_columnas(reader)
+            try:
+                for lote in self._lotes(reader, resultado):
+                    self._procesar_lote(lote, resultado)
+            finally:
+                self._cerrar_pool()
+        return resultado
+
+    def _procesar_lote(self, lote, resultado):
+        existentes = User.objects.filter(username__in=list(lote)).only(
+            "id", "username", "email", "first_name", "last_name", "password"
+        ).in_bulk(field_name="username")
+        nuevos = [u for u in lote if u not in existentes]
+
+        if self.dry_run:
+            resultado.creados += len(nuevos)
+            resultado.actualizados += len(existentes)
+            resultado.usuarios_nuevos.extend(nuevos)
+            resultado.usuarios_existentes.extend(existentes)
+            return
+
+        hashes = self._hashear_lote(lote)
+
+        crear = []
+        for username in nuevos:
+            datos = lote[username]
+            crear.append(User(
+                username=username,
+                email=datos["email"],
+                first_name=datos["first_name"],
+                last_name=datos["last_name"],
+                password=hashes.get(username) or make_password(None),
+            ))
+        actualizar = []
+        for username, user in existentes.items():
+            datos = lote[username]
+            if datos["email"]:
+                user.email = datos["email"]
+            user.first_name = datos["first_name"]
+            user.last_name = datos["last_name"]
+            if username in hashes:
+                user.password = hashes[username]
+            actualizar.append(user)
+
+        with transaction.atomic():
+            User.objects.bulk_create(crear, batch_size=self.tamano_lote)
+            User.objects.bulk_update(
+                actualizar, ["email", "first_name", "last_name", "password"], batch_size=self.tamano_lote
+            )
+            # MySQL no devuelve los ids de bulk_create: se releen por username
+            ids = dict(User.objects.filter(username__in=list(lote)).values_list("username", "id"))
+            self._sincronizar_perfiles(lote, ids)
+            self._sincronizar_grupos(list(ids.values()))
+
+        invalidar_permisos(*ids.values())
+        resultado.creados += len(crear)
+        resultado.actualizados += len(actualizar)
+        logger.info(f"Importación de usuarios: lote de {len(lote)} ({len(crear)} nuevos)")
+
+    def _hashear_lote(self, lote):
+        con_password = [(u, d["password"]) for u, d in lote.items() if d["password"]]
+        if not con_password:
+            return {}
+        usernames, passwords = zip(*con_password)
+        if self.workers <= 1:
+            hashes = map(_hashear, passwords)
+        else:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashes = self._obtener_pool().map(_hashear, passwords, chunksize=chunksize)
+        return dict(zip(usernames, hashes))
+
+    def _obtener_pool(self):
+        if self._pool is None:
+            # Los hijos no deben heredar sockets de base de datos abiertos
+            connections.close_all()
+            metodos = multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context("fork" if "fork" in metodos else "spawn")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=contexto,
+                initializer=None if contexto.get_start_method() == "fork" else _inicializar_worker,
+            )
+        return self._pool
+
+    def _cerrar_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _sincronizar_perfiles(self, lote, ids):
+        perfiles = Profile.objects.filter(user_id__in=list(ids.values())).in_bulk(field_name="user_id")
+        actualizar = []
+        crear = []
+        for username, user_id in ids.items():
+            rol = lote[username]["rol"]
+            perfil = perfiles.get(user_id)
+            if perfil is None:
+                crear.append(Profile(user_id=user_id, rol=rol))
+            elif perfil.rol != rol:
+                perfil.rol = rol
+                actualizar.append(perfil)
+        Profile.objects.bulk_create(crear, batch_size=self.tamano_lote)
+        Profile.objects.bulk_update(actualizar, ["rol"], batch_size=self.tamano_lote)
+
+    def _sincronizar_grupos(self, user_ids):
+        """Deja a los usuarios exactamente con los grupos indicados (equivalente a groups.set)"""
+        through = User.groups.through
+        through.objects.filter(user_id__in=user_ids).exclude(group_id__in=self.grupos_ids).delete()
+        through.objects.bulk_create(
+            [through(user_id=user_id, group_id=grupo_id) for user_id in user_ids for grupo_id in self.grupos_ids],
+            batch_size=self.tamano_lote * max(1, len(self.grupos_ids)),
+            ignore_conflicts=True,
+        )
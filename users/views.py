@@ -5,11 +5,12 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from .forms import CustomUserChangeForm, UserCreationForm
 from .services import UsuariosService
+from core.permisos import tiene_grupo
 
 
 class AdminRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
     def test_func(self):
-        return self.request.user.is_superuser or self.request.user.groups.filter(name='Administrador').exists()
+        return tiene_grupo(self.request.user, 'Administrador')
 
 
 class UsuariosLoginView(LoginView):